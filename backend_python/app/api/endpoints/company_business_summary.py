@@ -2,9 +2,17 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 # from services.content_generator import generate_company_summary
 import os
-import requests
+import asyncio
+import time
 import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from app.core.cache import StatsTTLCache
+from app.core.config import Config
+from app.core.content_cache import PAGE_TEXT, content_cache, make_entry
+from app.core.http_client import fetch
+from app.services.search_client import SearchAPIError, result_links, search_client
 CX_ID = os.getenv("CX_ID")
 cx = CX_ID
 
@@ -19,76 +27,121 @@ api_key = GOOGLE_SEARCH
 router = APIRouter()
 
 
-def extract_content1(query, num=6):
+SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Upgrade-Insecure-Requests": "1",
+}
 
-    # Get Google search links
-    links = company_google_search_links1(query, api_key, cx, num=num)
+# What research_company returns when it found nothing to summarize
+NO_LINKS_FOUND = "No links found for the query."
+NO_PAGES_SCRAPED = "Failed to scrape any of the links."
+RESEARCH_FAILURES = (NO_LINKS_FOUND, NO_PAGES_SCRAPED)
 
-    if not links:
-        return "No links found for the query."
+# company domain -> [(url, text)] scraped for its last complete research run
+research_cache = StatsTTLCache(maxsize=Config.COMPANY_RESEARCH_CACHE_MAXSIZE, ttl=Config.COMPANY_RESEARCH_CACHE_TTL)
 
-    # Extract content from each link
-    related_pages = []
-    for link in links:
-        content = scrape_page_content(link)
-        if content:  # Only include links that were successfully scraped
-            related_pages.append((link, content))
 
-    if not related_pages:
-        return "Failed to scrape any of the links."
+def company_domain(query: str) -> str:
+    """Cache key for a company: its bare domain when ``query`` is a URL."""
+    query = query.strip().lower()
+    host = urlparse(query if "://" in query else f"//{query}").hostname or ""
+    if "." in host and " " not in query:
+        return host[4:] if host.startswith("www.") else host
+    return " ".join(query.split())
 
+
+def format_pages(query: str, related_pages: List[Tuple[str, str]]) -> str:
     # Format the result as requested
     result_text = "Extracted Pages:\n"
     print(f"Company's URL: {query}\n")
     for idx, (url, content) in enumerate(related_pages, 1):
         result_text += f"{idx}. {url}\n"
         result_text += f"Extracted Content: {content[:13000]}...\n\n"
-
     return result_text
 
-def company_google_search_links1(query, api_key, cx, num=5):
-    links = []
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,
-        "cx": cx,
-        "num": num
-    }
 
+async def research_company(
+    query, num=6, deadline: float = Config.COMPANY_RESEARCH_DEADLINE, refresh: bool = False
+):
+    """
+    Search for the company and scrape every result concurrently. Whatever
+    finished within ``deadline`` seconds (search included) is formatted for
+    ``company_overview1`` and the rest is dropped.
+    Complete runs are cached per company domain, so a repeat summary of the
+    same company skips the search and the scraping; ``refresh`` scrapes
+    again regardless.
+    """
+    key = (company_domain(query), num)
+    related_pages = None if refresh else research_cache.get(key)
+    if related_pages is not None:
+        return format_pages(query, related_pages)
+
+    started = time.monotonic()
     try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
+        links = result_links(await asyncio.wait_for(
+            search_client.asearch(query, api_key, cx, num=num), deadline
+        ))
+    except (SearchAPIError, asyncio.TimeoutError) as e:
+        logger.error(f"An error occurred during the search: {e}")
+        links = []
 
-        for item in data.get("items", []):
-            link = item.get("link")
-            if link and not link.lower().endswith(".pdf"):  # Exclude PDF links
-                links.append(link)
+    if not links:
+        return NO_LINKS_FOUND
+
+    tasks = [asyncio.create_task(ascrape_page_content(link)) for link in links]
+    remaining = max(deadline - (time.monotonic() - started), 0)
+    done, pending = await asyncio.wait(tasks, timeout=remaining)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(
+            f"Company research for {query} hit its {deadline:g}s deadline, "
+            f"using {len(done)} of {len(tasks)} pages"
+        )
+
+    # Only include links that were successfully scraped, in search order
+    related_pages = [
+        (link, task.result())
+        for link, task in zip(links, tasks)
+        if task in done and task.result()
+    ]
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"An error occurred during the search: {e}")
+    if not related_pages:
+        return NO_PAGES_SCRAPED
+
+    if not pending:
+        research_cache.set(key, related_pages)
+    return format_pages(query, related_pages)
 
-    return links
 
-def scrape_page_content(url):
+async def ascrape_page_content(url: str) -> Optional[str]:
+    """Visible text of a page, via the content cache and the shared HTTP client."""
+    cached = await content_cache.aget(PAGE_TEXT, url)
+    if content_cache.is_fresh(cached):
+        return cached['text']
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
-        response = requests.get(url, headers=headers, timeout=20, verify=False)
-        response.raise_for_status()  # Raise an error for HTTP issues
-        soup = BeautifulSoup(response.text, "html.parser")
+        headers = {**SCRAPE_HEADERS, **content_cache.conditional_headers(cached)}
+        response = await fetch(
+            'GET', url, verify=False, headers=headers,
+            timeout=Config.COMPANY_RESEARCH_PAGE_TIMEOUT, follow_redirects=True,
+        )
+        if response.status_code == 304 and cached:
+            await content_cache.atouch(cached)
+            return cached['text']
+        response.raise_for_status()
         # Extract all visible text from the page
-        text = soup.get_text(separator=" ", strip=True)
+        text = await asyncio.to_thread(
+            lambda: BeautifulSoup(response.text, "html.parser").get_text(separator=" ", strip=True)
+        )
+        await content_cache.aput(make_entry(PAGE_TEXT, url, text=text, headers=response.headers))
         return text
     except Exception as e:
-        print(f"Failed to scrape {url}: {e}")
+        logger.warning(f"Failed to scrape {url}: {e}")
         return None
-    
\ No newline at end of file
+
+
+def get_company_research_stats() -> Dict[str, object]:
+    return research_cache.stats()
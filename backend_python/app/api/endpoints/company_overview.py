@@ -2,20 +2,13 @@ from fastapi import APIRouter
 
 router = APIRouter()
 import os
-from langchain_openai import ChatOpenAI
-import google.generativeai as genai
-from openai import OpenAI
 import json
+from app.core.llm_gateway import llm_gateway
+from app.api.endpoints.company_business_summary import RESEARCH_FAILURES
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
-def company_overview1(result):
-    llm = ChatOpenAI(
-        model="gpt-4.1",
-        temperature=0,
-        api_key=OPENAI_API_KEY
-    )
-
+async def company_overview1(result, force_refresh: bool = False):
     messages = [
         {
             "role": "system",
@@ -93,16 +86,21 @@ def company_overview1(result):
         }
     ]
 
-    response = llm.invoke(messages)
+    # A failed research run carries nothing company specific, so caching
+    # the answer would hand it to every company whose research fails
+    response = await llm_gateway.openai_chat(
+        messages, model="gpt-4.1", temperature=0,
+        cache=result not in RESEARCH_FAILURES, force_refresh=force_refresh,
+    )
     
     try:
         # Parse the JSON response
-        json_response = json.loads(response.content)
+        json_response = json.loads(response)
         return json_response
     except json.JSONDecodeError as e:
         # Fallback in case the LLM doesn't return valid JSON
         return {
-            "company_details": response.content,
+            "company_details": response,
             "company_name": "Unable to extract",
             "owner_bio": "Unable to extract",
             "target_audience": "Information not available"
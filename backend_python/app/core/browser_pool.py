@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import psutil
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+]
+
+
+@dataclass
+class _PooledBrowser:
+    browser: Browser
+    pages: int = 0
+    active: int = 0
+    retiring: bool = False
+
+
+def _browser_memory_mb() -> float:
+    """Resident memory of the Chromium processes under this process, in MB."""
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            name = child.name().lower()
+            if 'chrom' in name or 'headless_shell' in name:
+                total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm headless Chromium instances.
+
+    Each scrape gets a fresh, isolated context on the least busy browser.
+    A browser is retired once it has served ``max_pages`` contexts or when
+    the browsers together use more than ``max_memory_mb``; it is closed as
+    soon as its last open context is released and a new one is launched on
+    demand.
+    """
+
+    def __init__(
+        self,
+        size: int = Config.BROWSER_POOL_SIZE,
+        contexts_per_browser: int = Config.BROWSER_POOL_CONTEXTS_PER_BROWSER,
+        max_pages: int = Config.BROWSER_POOL_MAX_PAGES,
+        max_memory_mb: float = Config.BROWSER_POOL_MAX_MEMORY_MB,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._slots = asyncio.Semaphore(size * contexts_per_browser)
+        self._lock = asyncio.Lock()
+        self.leases = 0
+        self.launched = 0
+        self.recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def start(self):
+        """Launch Playwright and fill the pool with warm browsers."""
+        async with self._lock:
+            await self._fill()
+
+    async def _fill(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        # Drop browsers that crashed or were disconnected
+        self._browsers = [b for b in self._browsers if b.browser.is_connected() or b.active]
+        while len([b for b in self._browsers if not b.retiring]) < self.size:
+            browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            self._browsers.append(_PooledBrowser(browser=browser))
+            self.launched += 1
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            await self._fill()
+            candidates = [b for b in self._browsers if not b.retiring and b.browser.is_connected()]
+            entry = min(candidates, key=lambda b: b.active)
+            entry.active += 1
+            return entry
+
+    async def _release(self, entry: _PooledBrowser):
+        entry.active -= 1
+        entry.pages += 1
+        if not entry.retiring:
+            if entry.pages >= self.max_pages:
+                entry.retiring = True
+            elif self.max_memory_mb and _browser_memory_mb() > self.max_memory_mb:
+                logger.warning(f"Browser pool over {self.max_memory_mb} MB, recycling a browser")
+                entry.retiring = True
+        if entry.retiring and entry.active == 0:
+            async with self._lock:
+                if entry in self._browsers:
+                    self._browsers.remove(entry)
+            try:
+                await entry.browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing recycled browser: {str(e)}")
+            self.recycled += 1
+
+    @asynccontextmanager
+    async def new_context(self, **context_options: Any):
+        """Yield a fresh browser context; it is closed when the block exits."""
+        started = time.perf_counter()
+        async with self._slots:
+            entry = await self._checkout()
+            waited = time.perf_counter() - started
+            self.leases += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            context: Optional[BrowserContext] = None
+            try:
+                context = await entry.browser.new_context(**context_options)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing browser context: {str(e)}")
+                await self._release(entry)
+
+    async def close(self):
+        """Close every browser and stop Playwright. Called on application shutdown."""
+        async with self._lock:
+            for entry in self._browsers:
+                try:
+                    await entry.browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing browser: {str(e)}")
+            self._browsers = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        logger.info("Browser pool closed.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'browsers': len(self._browsers),
+            'active_contexts': sum(b.active for b in self._browsers),
+            'leases': self.leases,
+            'launched': self.launched,
+            'recycled': self.recycled,
+            'avg_wait_ms': round(self._wait_total / self.leases * 1000, 2) if self.leases else 0.0,
+            'max_wait_ms': round(self._wait_max * 1000, 2),
+            'memory_mb': round(_browser_memory_mb(), 1) if self._playwright is not None else 0.0,
+        }
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,184 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Optional
+
+from cachetools import LRUCache, TTLCache
+
+from app.core.database import get_database, get_sync_database
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class StatsTTLCache:
+    """In-memory TTL cache that counts hits and misses."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'maxsize': self._cache.maxsize,
+                'ttl': self._cache.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    # pymongo returns naive UTC datetimes unless tz_aware is set
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class MongoBackedCache:
+    """
+    In-memory LRU in front of a MongoDB collection whose TTL index drops
+    entries ``ttl`` seconds after their ``ttl_field``. After a MongoDB error
+    the collection is skipped for ``backoff`` seconds and only memory is used.
+    """
+
+    def __init__(self, name: str, collection: str, maxsize: int, ttl_field: str, ttl: int, backoff: float):
+        self.name = name
+        self.collection = collection
+        self.ttl_field = ttl_field
+        self.ttl = ttl
+        self.backoff = backoff
+        self._front = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._index_ready = False
+        self._backing_down_until: Optional[datetime] = None
+        self.store_errors = 0
+
+    # --- in-memory front and backing store health ---------------------------
+
+    def _backing_available(self) -> bool:
+        return self._backing_down_until is None or utcnow() >= self._backing_down_until
+
+    def _backing_failed(self, action: str, error: Exception):
+        self._backing_down_until = utcnow() + timedelta(seconds=self.backoff)
+        logger.warning(f"{self.name} {action} failed, using memory only for now: {error}")
+
+    def _store_failed(self, error: Exception):
+        with self._lock:
+            self.store_errors += 1
+        self._backing_failed('write', error)
+
+    def _front_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._front.get(key)
+
+    def _front_put(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._front[entry['_id']] = entry
+
+    # --- async access -------------------------------------------------------
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._front_get(key)
+        if entry is None and self._backing_available():
+            try:
+                entry = await get_database()[self.collection].find_one({'_id': key})
+            except Exception as e:
+                self._backing_failed('read', e)
+                return None
+            if entry is not None:
+                self._front_put(entry)
+        return entry
+
+    async def _store(self, entry: Dict[str, Any]):
+        self._front_put(entry)
+        if not self._backing_available():
+            return
+        try:
+            collection = get_database()[self.collection]
+            if not self._index_ready:
+                await collection.create_index(self.ttl_field, expireAfterSeconds=self.ttl)
+                self._index_ready = True
+            await collection.replace_one({'_id': entry['_id']}, entry, upsert=True)
+        except Exception as e:
+            self._store_failed(e)
+
+    async def _refresh(self, entry: Dict[str, Any]):
+        """Persist a new ``ttl_field`` value of an entry already stored."""
+        self._front_put(entry)
+        if not self._backing_available():
+            return
+        try:
+            await get_database()[self.collection].update_one(
+                {'_id': entry['_id']}, {'$set': {self.ttl_field: entry[self.ttl_field]}}
+            )
+        except Exception as e:
+            self._backing_failed('touch', e)
+
+    # --- sync access (blocking: worker threads only) -------------------------
+
+    def _load_sync(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._front_get(key)
+        if entry is None and self._backing_available():
+            try:
+                entry = get_sync_database()[self.collection].find_one({'_id': key})
+            except Exception as e:
+                self._backing_failed('read', e)
+                return None
+            if entry is not None:
+                self._front_put(entry)
+        return entry
+
+    def _store_sync(self, entry: Dict[str, Any]):
+        self._front_put(entry)
+        if not self._backing_available():
+            return
+        try:
+            collection = get_sync_database()[self.collection]
+            if not self._index_ready:
+                collection.create_index(self.ttl_field, expireAfterSeconds=self.ttl)
+                self._index_ready = True
+            collection.replace_one({'_id': entry['_id']}, entry, upsert=True)
+        except Exception as e:
+            self._store_failed(e)
+
+    def _refresh_sync(self, entry: Dict[str, Any]):
+        self._front_put(entry)
+        if not self._backing_available():
+            return
+        try:
+            get_sync_database()[self.collection].update_one(
+                {'_id': entry['_id']}, {'$set': {self.ttl_field: entry[self.ttl_field]}}
+            )
+        except Exception as e:
+            self._backing_failed('touch', e)
+
@@ -7,8 +7,132 @@ class Config:
     """Configuration settings for the application."""
     
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
     CUSTOM_GOOGLE_SEARCH = os.getenv('CUSTOM_GOOGLE_SEARCH')
     CX_ID = os.getenv('CX_ID')
+
+    # Shared outbound HTTP client pool
+    HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'true').lower() == 'true'
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '200'))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '50'))
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', '10'))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+
+    # PageSpeed Insights result cache (seconds)
+    PAGESPEED_CACHE_TTL = int(os.getenv('PAGESPEED_CACHE_TTL', '3600'))
+    PAGESPEED_CACHE_MAXSIZE = int(os.getenv('PAGESPEED_CACHE_MAXSIZE', '512'))
+
+    # Sitemap discovery
+    SITEMAP_MAX_CONCURRENCY_PER_HOST = int(os.getenv('SITEMAP_MAX_CONCURRENCY_PER_HOST', '8'))
+    SITEMAP_MAX_DEPTH = int(os.getenv('SITEMAP_MAX_DEPTH', '5'))
+    SITEMAP_FETCH_TIMEOUT = float(os.getenv('SITEMAP_FETCH_TIMEOUT', '30'))
+    SITEMAP_DISCOVERY_TIMEOUT = float(os.getenv('SITEMAP_DISCOVERY_TIMEOUT', '300'))
+
+    # Worker pool for /sitemap meta analysis
+    URL_ANALYSIS_WORKERS = int(os.getenv('URL_ANALYSIS_WORKERS', '20'))
+
+    # Headless Chromium pool used for scraping
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+    BROWSER_POOL_CONTEXTS_PER_BROWSER = int(os.getenv('BROWSER_POOL_CONTEXTS_PER_BROWSER', '4'))
+    BROWSER_POOL_MAX_PAGES = int(os.getenv('BROWSER_POOL_MAX_PAGES', '200'))
+    BROWSER_POOL_MAX_MEMORY_MB = float(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '2048'))
+
+    # Reference scraping: pages with fewer extracted words over plain HTTP
+    # are rendered in the browser instead
+    SCRAPER_MIN_WORDS = int(os.getenv('SCRAPER_MIN_WORDS', '150'))
+    SCRAPER_HTTP_TIMEOUT = float(os.getenv('SCRAPER_HTTP_TIMEOUT', '15'))
+
+    # Scraped content cache: served without a request while fresh, then
+    # revalidated with conditional GETs; MongoDB drops entries after max age
+    CONTENT_CACHE_MAXSIZE = int(os.getenv('CONTENT_CACHE_MAXSIZE', '2000'))
+    CONTENT_CACHE_FRESH_TTL = int(os.getenv('CONTENT_CACHE_FRESH_TTL', '3600'))
+    CONTENT_CACHE_MAX_AGE = int(os.getenv('CONTENT_CACHE_MAX_AGE', str(7 * 24 * 3600)))
+    CONTENT_CACHE_BACKOFF = int(os.getenv('CONTENT_CACHE_BACKOFF', '60'))
+
+    # Google Custom Search result cache and quota accounting
+    GOOGLE_SEARCH_CACHE_TTL = int(os.getenv('GOOGLE_SEARCH_CACHE_TTL', '21600'))
+    GOOGLE_SEARCH_CACHE_MAXSIZE = int(os.getenv('GOOGLE_SEARCH_CACHE_MAXSIZE', '1024'))
+    GOOGLE_SEARCH_DAILY_QUOTA = int(os.getenv('GOOGLE_SEARCH_DAILY_QUOTA', '10000'))
+
+    # LLM gateway: per-provider request timeouts (seconds) and concurrent
+    # calls, and retries on 429/5xx
+    LLM_TIMEOUT_OPENAI = float(os.getenv('LLM_TIMEOUT_OPENAI', '240'))
+    LLM_TIMEOUT_GEMINI = float(os.getenv('LLM_TIMEOUT_GEMINI', '240'))
+    LLM_TIMEOUT_CLAUDE = float(os.getenv('LLM_TIMEOUT_CLAUDE', '240'))
+    LLM_CONCURRENCY_OPENAI = int(os.getenv('LLM_CONCURRENCY_OPENAI', '16'))
+    LLM_CONCURRENCY_GEMINI = int(os.getenv('LLM_CONCURRENCY_GEMINI', '8'))
+    LLM_CONCURRENCY_CLAUDE = int(os.getenv('LLM_CONCURRENCY_CLAUDE', '8'))
+    LLM_MAX_ATTEMPTS = max(int(os.getenv('LLM_MAX_ATTEMPTS', '4')), 1)
+    LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '1'))
+    LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '30'))
+
+    # Content-addressed LLM response cache (MongoDB + in-memory LRU); MongoDB
+    # is skipped for LLM_CACHE_BACKOFF seconds after an error
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))
+    LLM_CACHE_MAXSIZE = int(os.getenv('LLM_CACHE_MAXSIZE', '1000'))
+    LLM_CACHE_BACKOFF = int(os.getenv('LLM_CACHE_BACKOFF', '60'))
+
+    # Target audience generation: per-provider timeouts and the default
+    # latency budget for both together (seconds)
+    TARGET_AUDIENCE_TIMEOUT_OPENAI = float(os.getenv('TARGET_AUDIENCE_TIMEOUT_OPENAI', '20'))
+    TARGET_AUDIENCE_TIMEOUT_GEMINI = float(os.getenv('TARGET_AUDIENCE_TIMEOUT_GEMINI', '20'))
+    TARGET_AUDIENCE_BUDGET = float(os.getenv('TARGET_AUDIENCE_BUDGET', '25'))
+
+    # Company research for /company-business-summary: overall deadline and
+    # per-page timeout (seconds), and the per-domain cache of scraped pages
+    COMPANY_RESEARCH_DEADLINE = float(os.getenv('COMPANY_RESEARCH_DEADLINE', '25'))
+    COMPANY_RESEARCH_PAGE_TIMEOUT = float(os.getenv('COMPANY_RESEARCH_PAGE_TIMEOUT', '20'))
+    COMPANY_RESEARCH_CACHE_TTL = int(os.getenv('COMPANY_RESEARCH_CACHE_TTL', '86400'))
+    COMPANY_RESEARCH_CACHE_MAXSIZE = int(os.getenv('COMPANY_RESEARCH_CACHE_MAXSIZE', '512'))
+
+    # Bulk inner-page audit: concurrent page fetches and the number of
+    # processes parsing the fetched HTML (0 parses on threads instead)
+    AUDIT_INNER_FETCH_CONCURRENCY = int(os.getenv('AUDIT_INNER_FETCH_CONCURRENCY', '5'))
+    ANALYSIS_POOL_WORKERS = int(os.getenv('ANALYSIS_POOL_WORKERS', str(os.cpu_count() or 1)))
+
+    # Persisted audit jobs: inner pages checkpointed per batch, and the lease
+    # (seconds) after which another process may resume an abandoned job
+    AUDIT_JOB_BATCH_SIZE = int(os.getenv('AUDIT_JOB_BATCH_SIZE', '100'))
+    AUDIT_JOB_LEASE = int(os.getenv('AUDIT_JOB_LEASE', '120'))
+
+    # Scheduled audits: poll interval (seconds), concurrent runs per instance,
+    # queued runs allowed in the database, and the minimum spacing (seconds)
+    # between scheduled runs against the same domain
+    AUDIT_SCHEDULER_ENABLED = os.getenv('AUDIT_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    AUDIT_SCHEDULER_INTERVAL = int(os.getenv('AUDIT_SCHEDULER_INTERVAL', '30'))
+    AUDIT_SCHEDULER_WORKERS = int(os.getenv('AUDIT_SCHEDULER_WORKERS', '2'))
+    AUDIT_SCHEDULER_QUEUE_SIZE = int(os.getenv('AUDIT_SCHEDULER_QUEUE_SIZE', '20'))
+    AUDIT_SCHEDULER_DOMAIN_INTERVAL = int(os.getenv('AUDIT_SCHEDULER_DOMAIN_INTERVAL', '300'))
+
+    # Background webhook delivery to the Node backend
+    WEBHOOK_QUEUE_MAXSIZE = int(os.getenv('WEBHOOK_QUEUE_MAXSIZE', '1000'))
+    WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '4'))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '5'))
+    WEBHOOK_BACKOFF_BASE = float(os.getenv('WEBHOOK_BACKOFF_BASE', '1'))
+    WEBHOOK_BACKOFF_MAX = float(os.getenv('WEBHOOK_BACKOFF_MAX', '60'))
+    WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '10'))
+    WEBHOOK_DRAIN_TIMEOUT = float(os.getenv('WEBHOOK_DRAIN_TIMEOUT', '10'))
+
+    # /get-titles: concurrent OpenAI calls, and keywords per structured-output
+    # call (1 disables batching)
+    TITLE_GENERATION_CONCURRENCY = int(os.getenv('TITLE_GENERATION_CONCURRENCY', '8'))
+    TITLE_BATCH_SIZE = int(os.getenv('TITLE_BATCH_SIZE', '1'))
+    TITLE_GENERATION_TIMEOUT = float(os.getenv('TITLE_GENERATION_TIMEOUT', '60'))
+
+    # Per-project MinHash LSH index of article titles (bands x rows hashes)
+    TITLE_INDEX_BANDS = int(os.getenv('TITLE_INDEX_BANDS', '32'))
+    TITLE_INDEX_ROWS = int(os.getenv('TITLE_INDEX_ROWS', '3'))
+    TITLE_INDEX_MAX_PROJECTS = int(os.getenv('TITLE_INDEX_MAX_PROJECTS', '64'))
+    # Seconds after which a project's index is rebuilt from scratch regardless
+    TITLE_INDEX_RELOAD_INTERVAL = int(os.getenv('TITLE_INDEX_RELOAD_INTERVAL', '3600'))
+
+    # Read-through caches of project and title prompt documents (seconds)
+    PROJECT_CACHE_TTL = int(os.getenv('PROJECT_CACHE_TTL', '60'))
+    PROJECT_CACHE_MAXSIZE = int(os.getenv('PROJECT_CACHE_MAXSIZE', '256'))
+    PROMPT_CACHE_TTL = int(os.getenv('PROMPT_CACHE_TTL', '600'))
+    PROMPT_CACHE_MAXSIZE = int(os.getenv('PROMPT_CACHE_MAXSIZE', '512'))
     
     @staticmethod
     def validate():
@@ -0,0 +1,139 @@
+"""
+Shared cache of scraped page content.
+
+Entries live in a MongoDB collection with an in-memory LRU in front of it and
+are keyed by ``(namespace, url)``; the namespace identifies the extraction
+that produced the text, so different extractors never share an entry. Each
+entry keeps the response's ETag/Last-Modified validators: entries younger
+than ``CONTENT_CACHE_FRESH_TTL`` are served without any request, older ones
+are revalidated with a conditional GET and only re-scraped when the page
+changed.
+"""
+from datetime import timedelta
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.cache import MongoBackedCache, as_utc, utcnow
+from app.core.config import Config
+
+COLLECTION = 'scraped_content_cache'
+
+# Namespaces used by the scrapers
+PAGE_TEXT = 'page_text'
+REFERENCE_TEXT = 'reference_text'
+AUDIT_PAGE_META = 'audit_page_meta'
+
+
+def make_entry(
+    namespace: str,
+    url: str,
+    text: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Build a cache entry, taking validators from the response headers."""
+    headers = headers or {}
+    return {
+        '_id': f"{namespace}:{url}",
+        'namespace': namespace,
+        'url': url,
+        'text': text,
+        'word_count': len(text.split()) if text else 0,
+        'data': data,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'fetched_at': utcnow(),
+    }
+
+
+class ContentCache(MongoBackedCache):
+    """In-memory LRU in front of a MongoDB collection, with sync and async access."""
+
+    def __init__(
+        self,
+        maxsize: int = Config.CONTENT_CACHE_MAXSIZE,
+        fresh_ttl: float = Config.CONTENT_CACHE_FRESH_TTL,
+        max_age: int = Config.CONTENT_CACHE_MAX_AGE,
+    ):
+        super().__init__(
+            "Content cache", COLLECTION, maxsize, ttl_field='fetched_at', ttl=max_age,
+            backoff=Config.CONTENT_CACHE_BACKOFF,
+        )
+        self.fresh_ttl = fresh_ttl
+        self.max_age = max_age
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    # --- freshness and validators -------------------------------------------
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        if not entry:
+            return False
+        fresh = utcnow() - as_utc(entry['fetched_at']) < timedelta(seconds=self.fresh_ttl)
+        if fresh:
+            with self._lock:
+                self.fresh_hits += 1
+        return fresh
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating ``entry``."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _record_store(self):
+        with self._lock:
+            self.misses += 1
+
+    def _record_touch(self, entry: Dict[str, Any]):
+        entry['fetched_at'] = utcnow()
+        with self._lock:
+            self.revalidated += 1
+
+    # --- async access -------------------------------------------------------
+
+    async def aget(self, namespace: str, url: str) -> Optional[Dict[str, Any]]:
+        return await self._load(f"{namespace}:{url}")
+
+    async def aput(self, entry: Dict[str, Any]):
+        """Store a freshly scraped entry (counted as a miss)."""
+        self._record_store()
+        await self._store(entry)
+
+    async def atouch(self, entry: Dict[str, Any]):
+        """Mark ``entry`` as just revalidated (the server answered 304)."""
+        self._record_touch(entry)
+        await self._refresh(entry)
+
+    # --- sync access (blocking: worker threads only) -------------------------
+
+    def get(self, namespace: str, url: str) -> Optional[Dict[str, Any]]:
+        return self._load_sync(f"{namespace}:{url}")
+
+    def put(self, entry: Dict[str, Any]):
+        self._record_store()
+        self._store_sync(entry)
+
+    def touch(self, entry: Dict[str, Any]):
+        self._record_touch(entry)
+        self._refresh_sync(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.fresh_hits + self.revalidated + self.misses
+            return {
+                'front_size': len(self._front),
+                'front_maxsize': self._front.maxsize,
+                'fresh_hits': self.fresh_hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'store_errors': self.store_errors,
+                'hit_ratio': round((self.fresh_hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+            }
+
+
+content_cache = ContentCache()
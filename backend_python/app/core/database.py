@@ -27,6 +27,11 @@ else:
 client = None
 database = None
 
+# Sync client for blocking code; async callers must run that code in a
+# worker thread (asyncio.to_thread), never on the event loop
+sync_client = None
+sync_database = None
+
 def init_db():
     """Initialize the MongoDB connection and test it."""
     global client, database
@@ -51,13 +56,25 @@ def get_database():
         init_db()
     return database
 
+def get_sync_database():
+    """Get a pymongo database for synchronous callers running off the event loop."""
+    global sync_client, sync_database
+    if sync_database is None:
+        sync_client = MongoClient(MONGO_URL)
+        sync_database = sync_client[DB_NAME]
+    return sync_database
+
 def get_db():
     """Provide database instance for dependency injection."""
     return get_database()
 
 def close_db():
     """Close the MongoDB connection."""
-    global client
+    global client, sync_client, sync_database
     if client:
         client.close()
-        logger.info("MongoDB connection closed.")
\ No newline at end of file
+        logger.info("MongoDB connection closed.")
+    if sync_client:
+        sync_client.close()
+        sync_client = None
+        sync_database = None
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# One pooled client per TLS verification mode. httpx only lets us choose
+# certificate verification per client, and most audit checks run with
+# verification disabled.
+_clients: Dict[bool, httpx.AsyncClient] = {}
+
+# host -> [semaphore, number of coroutines holding or waiting on it]
+_host_slots: Dict[str, List] = {}
+
+# Hop-by-hop headers are managed by the connection pool itself and are
+# rejected outright on HTTP/2 connections.
+_HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'upgrade'}
+
+
+def get_async_client(verify: bool = True) -> httpx.AsyncClient:
+    """Return the shared keep-alive client, creating it on first use."""
+    client = _clients.get(verify)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=Config.HTTP2_ENABLED,
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=Config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(10.0),
+        )
+        _clients[verify] = client
+    return client
+
+
+@asynccontextmanager
+async def host_slot(url: str):
+    """Limit the number of concurrent requests made to a single host."""
+    host = urlparse(url).netloc.lower()
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = [asyncio.Semaphore(Config.HTTP_MAX_CONNECTIONS_PER_HOST), 0]
+        _host_slots[host] = slot
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0:
+            _host_slots.pop(host, None)
+
+
+def _clean_headers(headers):
+    if not headers:
+        return headers
+    return {k: v for k, v in headers.items() if k.lower() not in _HOP_BY_HOP_HEADERS}
+
+
+async def fetch(method: str, url: str, verify: bool = True, headers=None, **kwargs) -> httpx.Response:
+    """Send a request on the shared client, respecting the per-host limit."""
+    async with host_slot(url):
+        return await get_async_client(verify).request(
+            method, url, headers=_clean_headers(headers), **kwargs
+        )
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, verify: bool = True, headers=None, **kwargs):
+    """Open a streamed response on the shared client, respecting the per-host limit."""
+    async with host_slot(url):
+        async with get_async_client(verify).stream(
+            method, url, headers=_clean_headers(headers), **kwargs
+        ) as response:
+            yield response
+
+
+async def close_async_clients():
+    """Close every shared client. Called on application shutdown."""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+    logger.info("Shared HTTP clients closed.")
@@ -0,0 +1,85 @@
+"""
+Content-addressed cache of LLM responses.
+
+A response is keyed by a SHA-256 of the provider, the model and the full
+request body (messages, temperature and any other options), so identical
+requests share one answer whichever endpoint made them. Entries live in a
+MongoDB collection, expired by a TTL index after ``LLM_CACHE_TTL`` seconds,
+with an in-memory LRU in front of it. Each entry keeps the number of tokens
+the original call used, so hits are reported as tokens saved.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from app.core.cache import MongoBackedCache, as_utc, utcnow
+from app.core.config import Config
+
+COLLECTION = 'llm_response_cache'
+
+
+class LLMResponseCache(MongoBackedCache):
+    """In-memory LRU in front of a MongoDB collection of LLM responses."""
+
+    def __init__(self, maxsize: int = Config.LLM_CACHE_MAXSIZE, ttl: int = Config.LLM_CACHE_TTL):
+        super().__init__(
+            "LLM response cache", COLLECTION, maxsize, ttl_field='created_at', ttl=ttl,
+            backoff=Config.LLM_CACHE_BACKOFF,
+        )
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def key(provider: str, model: str, body: Dict[str, Any]) -> str:
+        payload = json.dumps([provider, model, body], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return utcnow() - as_utc(entry['created_at']) >= timedelta(seconds=self.ttl)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached entry for ``key``, counted as a hit or a miss."""
+        entry = await self._load(key)
+        with self._lock:
+            # The TTL index only sweeps about once a minute
+            if entry is None or self._expired(entry):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry.get('tokens') or 0
+        return entry
+
+    async def put(self, key: str, provider: str, model: str, text: str, tokens: int):
+        await self._store({
+            '_id': key,
+            'provider': provider,
+            'model': model,
+            'text': text,
+            'tokens': tokens,
+            'created_at': utcnow(),
+        })
+
+    def record_refresh(self):
+        """Count a lookup skipped because the caller asked for a fresh answer."""
+        with self._lock:
+            self.refreshes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'front_size': len(self._front),
+                'front_maxsize': self._front.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'forced_refreshes': self.refreshes,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'tokens_saved': self.tokens_saved,
+                'store_errors': self.store_errors,
+            }
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,286 @@
+"""
+Async gateway for every OpenAI, Gemini and Claude call.
+
+Each provider gets one pooled keep-alive HTTP client, its own request
+timeout and a semaphore capping how many of its calls run at once. Rate
+limits (429), overloads and 5xx responses are retried with backoff; a
+``Retry-After`` header from the provider takes precedence over the computed
+delay.
+
+Callers can opt in to the content-addressed response cache
+(:mod:`app.core.llm_cache`) per call with ``cache=True``; ``force_refresh``
+skips the cached answer and stores the new one.
+
+Messages use the OpenAI chat format (``{"role", "content"}`` with system,
+user and assistant roles) for every provider; the gateway converts them to
+the Gemini and Claude request shapes.
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import Config
+from app.core.llm_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+OPENAI = "openai"
+GEMINI = "gemini"
+CLAUDE = "claude"
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+CLAUDE_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# 529 is Anthropic's "overloaded"
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """Raised when a provider call fails for good."""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, if it has one."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+class _Provider:
+    def __init__(self, name: str, concurrency: int, timeout: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.client: Optional[httpx.AsyncClient] = None
+        self.limit = asyncio.Semaphore(concurrency)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.latency_total = 0.0
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                http2=Config.HTTP2_ENABLED,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+            )
+        return self.client
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.calls - self.in_flight
+        return {
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'calls': self.calls,
+            'retries': self.retries,
+            'failures': self.failures,
+            'avg_latency_ms': round(self.latency_total / done * 1000, 1) if done > 0 else 0.0,
+        }
+
+
+class LLMGateway:
+    """Shared async client for the LLM providers."""
+
+    def __init__(self, max_attempts: int = Config.LLM_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._providers = {
+            OPENAI: _Provider(OPENAI, Config.LLM_CONCURRENCY_OPENAI, Config.LLM_TIMEOUT_OPENAI),
+            GEMINI: _Provider(GEMINI, Config.LLM_CONCURRENCY_GEMINI, Config.LLM_TIMEOUT_GEMINI),
+            CLAUDE: _Provider(CLAUDE, Config.LLM_CONCURRENCY_CLAUDE, Config.LLM_TIMEOUT_CLAUDE),
+        }
+
+    async def _post(
+        self, provider: _Provider, url: str, body: Dict[str, Any], headers: Dict[str, str],
+        params: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        provider.calls += 1
+        provider.in_flight += 1
+        started = time.perf_counter()
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                delay = None
+                # The slot is held for the request only, never while backing off
+                async with provider.limit:
+                    try:
+                        response = await provider.get_client().post(
+                            url, json=body, headers=headers, params=params,
+                            timeout=timeout or provider.timeout,
+                        )
+                    except httpx.TransportError as e:
+                        error, status = f"{type(e).__name__}: {e}", None
+                    else:
+                        status = response.status_code
+                        if status == 200:
+                            try:
+                                return response.json()
+                            except ValueError:
+                                error = f"Invalid JSON in response: {response.text[:300]}"
+                                break
+                        error = f"HTTP {status}: {response.text[:300]}"
+                        if status not in RETRY_STATUSES:
+                            break
+                        delay = _retry_after(response)
+
+                if attempt == self.max_attempts:
+                    break
+                if delay is None:
+                    delay = random.uniform(0, min(Config.LLM_RETRY_MAX_DELAY, Config.LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+                delay = min(delay, Config.LLM_RETRY_MAX_DELAY)
+                provider.retries += 1
+                logger.warning(f"{provider.name} call failed ({error}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+            provider.failures += 1
+            raise LLMError(provider.name, error, status)
+        finally:
+            provider.in_flight -= 1
+            provider.latency_total += time.perf_counter() - started
+
+    async def _complete(
+        self, provider: _Provider, model: str, url: str, body: Dict[str, Any], headers: Dict[str, str],
+        parse: Callable[[Dict[str, Any]], Tuple[str, int]], params: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None, cache: bool = False, force_refresh: bool = False,
+    ) -> str:
+        """
+        POST ``body`` and return the text ``parse`` extracts from the answer.
+        With ``cache`` the response cache is consulted first, unless
+        ``force_refresh`` asks for a new answer (which then replaces the
+        cached one).
+        """
+        key = None
+        if cache and Config.LLM_CACHE_ENABLED:
+            key = llm_cache.key(provider.name, model, body)
+            if force_refresh:
+                llm_cache.record_refresh()
+            else:
+                entry = await llm_cache.get(key)
+                if entry is not None:
+                    return entry['text']
+        data = await self._post(provider, url, body, headers, params=params, timeout=timeout)
+        text, tokens = parse(data)
+        if key and text:
+            await llm_cache.put(key, provider.name, model, text, tokens)
+        return text
+
+    async def openai_chat(
+        self, messages: Messages, model: str, temperature: Optional[float] = None,
+        timeout: Optional[float] = None, cache: bool = False, force_refresh: bool = False,
+        **options: Any,
+    ) -> str:
+        """Chat completion; extra ``options`` (e.g. response_format) go in the request body."""
+        body: Dict[str, Any] = {"model": model, "messages": messages, **options}
+        if temperature is not None:
+            body["temperature"] = temperature
+
+        def parse(data: Dict[str, Any]) -> Tuple[str, int]:
+            try:
+                content = data["choices"][0]["message"]["content"] or ""
+            except (KeyError, IndexError, TypeError):
+                raise LLMError(OPENAI, f"Unexpected response: {str(data)[:300]}")
+            return content, (data.get("usage") or {}).get("total_tokens", 0)
+
+        return await self._complete(
+            self._providers[OPENAI], model, OPENAI_URL, body,
+            {"Authorization": f"Bearer {Config.OPENAI_API_KEY}"}, parse,
+            timeout=timeout, cache=cache, force_refresh=force_refresh,
+        )
+
+    async def gemini_generate(
+        self, messages: Messages, model: str, temperature: Optional[float] = None,
+        timeout: Optional[float] = None, cache: bool = False, force_refresh: bool = False,
+    ) -> str:
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        body: Dict[str, Any] = {
+            "contents": [
+                {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages if m["role"] != "system"
+            ]
+        }
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        if temperature is not None:
+            body["generationConfig"] = {"temperature": temperature}
+
+        def parse(data: Dict[str, Any]) -> Tuple[str, int]:
+            try:
+                parts = data["candidates"][0]["content"]["parts"]
+            except (KeyError, IndexError, TypeError):
+                reason = data.get("promptFeedback", {}).get("blockReason") if isinstance(data, dict) else None
+                raise LLMError(GEMINI, f"No content in response{f' (blocked: {reason})' if reason else ''}")
+            text = "".join(part.get("text", "") for part in parts)
+            return text, (data.get("usageMetadata") or {}).get("totalTokenCount", 0)
+
+        return await self._complete(
+            self._providers[GEMINI], model, GEMINI_URL.format(model=model), body, {}, parse,
+            params={"key": Config.GEMINI_API_KEY}, timeout=timeout, cache=cache, force_refresh=force_refresh,
+        )
+
+    async def claude_message(
+        self, messages: Messages, model: str, max_tokens: int = 2048,
+        temperature: Optional[float] = None, timeout: Optional[float] = None,
+        cache: bool = False, force_refresh: bool = False,
+    ) -> str:
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        body: Dict[str, Any] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [m for m in messages if m["role"] != "system"],
+        }
+        if system:
+            body["system"] = system
+        if temperature is not None:
+            body["temperature"] = temperature
+
+        def parse(data: Dict[str, Any]) -> Tuple[str, int]:
+            text = "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+            usage = data.get("usage") or {}
+            return text, usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+        return await self._complete(
+            self._providers[CLAUDE], model, CLAUDE_URL, body,
+            {"x-api-key": Config.CLAUDE_API_KEY or "", "anthropic-version": ANTHROPIC_VERSION}, parse,
+            timeout=timeout, cache=cache, force_refresh=force_refresh,
+        )
+
+    async def close(self):
+        """Close the provider clients. Called on application shutdown."""
+        for provider in self._providers.values():
+            if provider.client is not None:
+                await provider.client.aclose()
+                provider.client = None
+        logger.info("LLM gateway clients closed.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: provider.stats() for name, provider in self._providers.items()}
+
+
+llm_gateway = LLMGateway()
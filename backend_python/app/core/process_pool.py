@@ -0,0 +1,99 @@
+"""
+Process pool for CPU-bound work such as parsing audited HTML.
+
+Threads can't parse pages in parallel because of the GIL, so the bulk
+inner-page audit hands each page's raw bytes to a pool of worker processes
+and gets a compact result record back. Workers are started lazily with the
+``spawn`` method, which is safe next to the event loop's threads, and stay
+warm for the next audit. With ``ANALYSIS_POOL_WORKERS=0`` the work runs on
+the default thread pool instead.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPool:
+    """Lazily started process pool with call and latency counters."""
+
+    def __init__(self, workers: int = Config.ANALYSIS_POOL_WORKERS):
+        self.workers = max(workers, 0)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self.in_flight = 0
+        self.busy_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run ``func(*args)`` in a worker process. ``func`` must be a
+        module-level function and its arguments and result picklable. If a
+        worker dies the pool is replaced and the call retried once.
+        """
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            if not self.workers:
+                return await asyncio.to_thread(func, *args)
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                self._restart(executor)
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.busy_total += time.perf_counter() - started
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        # Every call in flight on the broken pool lands here; only the first
+        # replaces it, later ones must not shut down the pool it started
+        if self._executor is not broken:
+            return
+        logger.warning("Analysis worker process died, restarting the pool")
+        self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+
+    async def close(self):
+        """Stop the worker processes. Called on application shutdown."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+            logger.info("Analysis process pool closed.")
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.calls - self.in_flight
+        return {
+            'workers': self.workers,
+            'started': self._executor is not None,
+            'calls': self.calls,
+            'in_flight': self.in_flight,
+            'failures': self.failures,
+            'restarts': self.restarts,
+            'avg_latency_ms': round(self.busy_total / done * 1000, 2) if done > 0 else 0.0,
+        }
+
+
+analysis_pool = ProcessPool()
@@ -0,0 +1,201 @@
+"""
+Background delivery of webhooks to the Node backend.
+
+Endpoints enqueue a webhook and return straight away; a small pool of
+workers posts it on the shared async HTTP client. Network errors, 429s and
+5xx responses are retried with exponential backoff and full jitter.
+Webhooks that still fail, are rejected with another 4xx, or do not fit in
+the queue are written to a MongoDB dead-letter collection so they can be
+replayed.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import httpx
+
+from app.core.config import Config
+from app.core.database import get_database
+from app.core.http_client import fetch
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_COLLECTION = 'webhook_dead_letters'
+
+# Number of recent deliveries kept for the latency figures
+_LATENCY_WINDOW = 1000
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class WebhookDispatcher:
+    """Bounded queue of outgoing webhooks drained by background workers."""
+
+    def __init__(
+        self,
+        maxsize: int = Config.WEBHOOK_QUEUE_MAXSIZE,
+        workers: int = Config.WEBHOOK_WORKERS,
+        max_attempts: int = Config.WEBHOOK_MAX_ATTEMPTS,
+        backoff_base: float = Config.WEBHOOK_BACKOFF_BASE,
+        backoff_max: float = Config.WEBHOOK_BACKOFF_MAX,
+        timeout: float = Config.WEBHOOK_TIMEOUT,
+    ):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self.enqueued = 0
+        self.delivered = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the workers. Safe to call more than once."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{n}")
+            for n in range(self.workers)
+        ]
+
+    def enqueue(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Queue a webhook for delivery without waiting for it. Returns False if
+        the queue is full, in which case the webhook is dead-lettered.
+        """
+        self.start()
+        job = {
+            'url': url,
+            'payload': payload,
+            'headers': headers or {},
+            'enqueued_at': time.monotonic(),
+            'attempts': 0,
+        }
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error(f"Webhook queue full ({self.maxsize}), dead-lettering webhook to {url}")
+            task = asyncio.create_task(self._dead_letter(job, 'queue full'))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                # Stopped mid-delivery at shutdown
+                await self._dead_letter(job, 'shutdown')
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error delivering webhook to {job['url']}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: Dict[str, Any]):
+        error = None
+        while job['attempts'] < self.max_attempts:
+            job['attempts'] += 1
+            try:
+                response = await fetch(
+                    'POST', job['url'], json=job['payload'], headers=job['headers'], timeout=self.timeout
+                )
+                if response.status_code < 400:
+                    self.delivered += 1
+                    self._latencies.append(time.monotonic() - job['enqueued_at'])
+                    return
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if not _retryable(response.status_code):
+                    break
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if job['attempts'] < self.max_attempts:
+                self.retries += 1
+                delay = backoff_delay(job['attempts'], self.backoff_base, self.backoff_max)
+                logger.warning(
+                    f"Webhook to {job['url']} failed ({error}), retry {job['attempts']} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        logger.error(f"Webhook to {job['url']} failed after {job['attempts']} attempt(s): {error}")
+        await self._dead_letter(job, error)
+
+    async def _dead_letter(self, job: Dict[str, Any], error: Optional[str]):
+        self.dead_lettered += 1
+        document = {
+            'url': job['url'],
+            'payload': job['payload'],
+            'attempts': job['attempts'],
+            'error': error,
+            'failed_at': datetime.now(timezone.utc),
+        }
+        try:
+            await get_database()[DEAD_LETTER_COLLECTION].insert_one(document)
+        except Exception as e:
+            logger.error(f"Could not store dead-lettered webhook to {job['url']}: {e}")
+
+    async def close(self, drain_timeout: float = Config.WEBHOOK_DRAIN_TIMEOUT):
+        """
+        Give queued webhooks ``drain_timeout`` seconds to go out, then stop the
+        workers and dead-letter whatever is left. Called on application shutdown.
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook queue not drained within {drain_timeout}s")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            await self._dead_letter(self._queue.get_nowait(), 'shutdown')
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        logger.info("Webhook dispatcher stopped.")
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'queue_maxsize': self.maxsize,
+            'workers': len(self._tasks),
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'retries': self.retries,
+            'dead_lettered': self.dead_lettered,
+            'dropped': self.dropped,
+            'avg_latency_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            'p95_latency_ms': round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else 0.0,
+            'max_latency_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+
+
+webhook_dispatcher = WebhookDispatcher()
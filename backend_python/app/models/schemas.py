@@ -32,11 +32,16 @@ class Sitemap(BaseModel):
 
 class CompanyDetails(BaseModel):
     company_details: str
+    title: Optional[str] = None
 
 class FindTitle(BaseModel):
     ProjectId: str
     title: str
 
+class CacheInvalidation(BaseModel):
+    kind: str  # project, prompt_type, system_prompt or all
+    id: Optional[str] = None
+
 class URLInput(BaseModel):
     url: str
 
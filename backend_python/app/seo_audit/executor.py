@@ -0,0 +1,89 @@
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Subtask:
+    """A single audit check and the checks whose results it needs."""
+    key: str
+    message: str
+    func: Callable[..., Any]
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def validate_subtasks(subtasks: List[Subtask]) -> None:
+    """Raise ValueError on duplicate keys, unknown dependencies or cycles."""
+    keys = [task.key for task in subtasks]
+    if len(keys) != len(set(keys)):
+        raise ValueError(f"Duplicate subtask keys: {keys}")
+
+    known = set(keys)
+    for task in subtasks:
+        missing = [dep for dep in task.depends_on if dep not in known]
+        if missing:
+            raise ValueError(f"Subtask '{task.key}' depends on unknown subtasks: {missing}")
+
+    # Kahn's algorithm: if we cannot order every node, there is a cycle
+    remaining = {task.key: set(task.depends_on) for task in subtasks}
+    while remaining:
+        ready = [key for key, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between subtasks: {sorted(remaining)}")
+        for key in ready:
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def _call(func: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    result = func(**kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_subtasks(subtasks: List[Subtask]) -> AsyncIterator[Tuple[Subtask, Any]]:
+    """
+    Run subtasks concurrently, starting each one as soon as all of its
+    dependencies have finished. Dependency results are passed to ``func`` as
+    keyword arguments named after the dependency keys. ``func`` may return an
+    awaitable; blocking work should be wrapped with ``asyncio.to_thread``.
+
+    Yields ``(subtask, result)`` pairs in completion order. A subtask that
+    raises yields ``{'error': str(exc)}`` instead of aborting the whole run.
+    Subtasks still running when the consumer stops iterating are cancelled.
+    """
+    validate_subtasks(subtasks)
+    pending: Dict[str, Subtask] = {task.key: task for task in subtasks}
+    results: Dict[str, Any] = {}
+    running: Dict[asyncio.Future, Subtask] = {}
+
+    def start_ready():
+        for key, task in list(pending.items()):
+            if all(dep in results for dep in task.depends_on):
+                kwargs = {dep: results[dep] for dep in task.depends_on}
+                running[asyncio.ensure_future(_call(task.func, kwargs))] = task
+                del pending[key]
+
+    try:
+        start_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Audit subtask '{task.key}' failed: {e}")
+                    result = {'error': str(e)}
+                results[task.key] = result
+                yield task, result
+            start_ready()
+    finally:
+        for future in running:
+            future.cancel()
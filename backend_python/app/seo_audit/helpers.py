@@ -1,12 +1,18 @@
 import sys
 import re
-import requests
+import ssl
+import asyncio
+import httpx
 import time
 import json
-import xml.etree.ElementTree as ET
-from requests.exceptions import RequestException
-from requests.exceptions import SSLError
 from urllib.parse import urlparse, urljoin, quote
+from app.core.cache import StatsTTLCache
+from app.core.content_cache import AUDIT_PAGE_META, content_cache, make_entry
+from app.core.config import Config
+from app.core.http_client import fetch, stream
+from app.core.process_pool import analysis_pool
+from app.seo_audit.page_model import parse_page
+from app.services.sitemap_stream import SitemapParseError, response_entries
 
 # HTTP headers to use for all requests
 HEADERS = {
@@ -17,9 +23,6 @@ HEADERS = {
     'Cache-Control': 'no-cache',
 }
 
-# Global session for all requests
-SESSION = requests.Session()
-
 def get_user_id():
     """Return a fixed user_id for demo purposes (no authentication)."""
     return 1
@@ -70,30 +73,74 @@ def normalize_url(url: str) -> str:
 
 
 # Function to get page content
-def get_page_content(url, follow_redirects=True, verify_ssl=True):
+async def get_page_content(url, follow_redirects=True, verify_ssl=True):
     try:
         print(f"[DEBUG] get_page_content: url={url}", file=sys.stderr)
         print(f"[DEBUG] get_page_content: headers={HEADERS}", file=sys.stderr)
         print(f"[DEBUG] get_page_content: follow_redirects={follow_redirects}, verify_ssl={verify_ssl}", file=sys.stderr)
-        response = SESSION.get(
+        response = await fetch(
+            'GET',
             url,
+            verify=verify_ssl,
             headers=HEADERS,
             timeout=10,
-            allow_redirects=follow_redirects,
-            verify=verify_ssl
+            follow_redirects=follow_redirects,
         )
         print(f"[DEBUG] get_page_content: status_code={response.status_code}, final_url={response.url}", file=sys.stderr)
-        return response.text, response.status_code, response.url
-    except requests.RequestException as e:
+        return response.text, response.status_code, str(response.url)
+    except httpx.HTTPError as e:
         print(f"[ERROR] get_page_content: exception={e}", file=sys.stderr)
         return None, str(e), None
-    
+
+
+def _parse_inner_page_meta(content, url, encoding=None):
+    """
+    Compact meta record of an inner page. Runs in the analysis process pool,
+    so it takes the raw response bytes and returns only plain data.
+    """
+    page = parse_page(content, encoding)
+    meta = analyze_meta_tags(page)
+    links = analyze_links(page, url).get("internal_links", [])
+    return {
+        'title': meta.get('title'),
+        'title_length': meta.get('title_length'),
+        'meta_description': meta.get('meta_description'),
+        'meta_description_length': meta.get('meta_description_length'),
+        'internal_links': [li.get('url') for li in links if isinstance(li, dict) and li.get('url')],
+    }
+
+
+async def get_inner_page_meta(url):
+    """
+    Title, meta description and internal links of an inner page, or None if
+    it could not be fetched. Results come from the shared content cache while
+    fresh; stale entries are revalidated with a conditional GET.
+    """
+    cached = await content_cache.aget(AUDIT_PAGE_META, url)
+    if content_cache.is_fresh(cached):
+        return cached['data']
+    headers = {**HEADERS, **content_cache.conditional_headers(cached)}
+    try:
+        response = await fetch('GET', url, verify=True, headers=headers, timeout=10, follow_redirects=True)
+    except httpx.HTTPError as e:
+        print(f"[ERROR] get_inner_page_meta: url={url}, exception={e}", file=sys.stderr)
+        return None
+    if response.status_code == 304 and cached:
+        await content_cache.atouch(cached)
+        return cached['data']
+    if not response.content:
+        return None
+    data = await analysis_pool.run(_parse_inner_page_meta, response.content, url, response.charset_encoding)
+    if response.status_code == 200:
+        await content_cache.aput(make_entry(AUDIT_PAGE_META, url, headers=response.headers, data=data))
+    return data
+
 
 # Function to analyze meta tags
-def analyze_meta_tags(soup):
+def analyze_meta_tags(page):
     results = {
-        'title': soup.title.string if soup.title else None,
-        'title_length': len(soup.title.string) if soup.title and soup.title.string else 0,
+        'title': page.title,
+        'title_length': len(page.title) if page.title else 0,
         'meta_description': None,
         'meta_description_length': 0,
         'has_viewport': False,
@@ -105,7 +152,7 @@ def analyze_meta_tags(soup):
         'hreflang_tags': []
     }
     
-    for meta in soup.find_all('meta'):
+    for meta in page.metas:
         if meta.get('name', '').lower() == 'description':
             results['meta_description'] = meta.get('content', '')
             results['meta_description_length'] = len(meta.get('content', ''))
@@ -115,11 +162,12 @@ def analyze_meta_tags(soup):
             results['has_robots'] = True
             results['robots_content'] = meta.get('content', '')
     
-    for link in soup.find_all('link'):
-        if link.get('rel') and 'canonical' in link.get('rel'):
+    for link in page.link_tags:
+        rel = link.get('rel', '').split()
+        if 'canonical' in rel:
             results['has_canonical'] = True
             results['canonical_url'] = link.get('href')
-        elif link.get('rel') and 'alternate' in link.get('rel') and link.get('hreflang'):
+        elif 'alternate' in rel and link.get('hreflang'):
             results['has_hreflang'] = True
             results['hreflang_tags'].append({
                 'hreflang': link.get('hreflang'),
@@ -130,28 +178,15 @@ def analyze_meta_tags(soup):
 
 
 # Function to analyze headings
-def analyze_headings(soup):
-    headings = {
-        'h1': [],
-        'h2': [],
-        'h3': [],
-        'h4': [],
-        'h5': [],
-        'h6': []
-    }
-    
-    for level in range(1, 7):
-        for heading in soup.find_all(f'h{level}'):
-            if heading.text.strip():
-                headings[f'h{level}'].append(heading.text.strip())
-    
-    return headings
+def analyze_headings(page):
+    # Non-empty heading texts by level, in document order
+    return {level: list(texts) for level, texts in page.headings.items()}
 
 
 # Function to analyze images
-def analyze_images(soup, base_url):
+def analyze_images(page, base_url):
     images = []
-    for img in soup.find_all('img'):
+    for img in page.images:
         src = img.get('src', '')
         if not src:
             # Skip images with missing or empty src
@@ -168,9 +203,9 @@ def analyze_images(soup, base_url):
 
 
 # Function to analyze content
-def analyze_content(soup):
-    # Get all text content
-    text_content = soup.get_text(separator=' ', strip=True)
+def analyze_content(page):
+    # Visible text, collected while the page was parsed
+    text_content = page.text
     words = re.findall(r'\b\w+\b', text_content.lower())
     
     # Count words
@@ -192,13 +227,13 @@ def analyze_content(soup):
 
 
 # Function to analyze links
-def analyze_links(soup, base_url):
+def analyze_links(page, base_url):
     internal_links = []
     external_links = []
     base_domain = urlparse(base_url).netloc
     
-    for a in soup.find_all('a', href=True):
-        href = a.get('href')
+    for a in page.anchors:
+        href = a.href
         if href.startswith('#') or not href:  # Skip anchor links and empty hrefs
             continue
             
@@ -209,19 +244,19 @@ def analyze_links(soup, base_url):
             full_url = href
             
         link_domain = urlparse(full_url).netloc
-        link_text = a.text.strip() or "[No Text]"
+        link_text = a.text or "[No Text]"
         
         if link_domain == base_domain:
             internal_links.append({
                 'url': full_url,
                 'text': link_text,
-                'nofollow': 'nofollow' in a.get('rel', [])
+                'nofollow': 'nofollow' in a.rel
             })
         else:
             external_links.append({
                 'url': full_url,
                 'text': link_text,
-                'nofollow': 'nofollow' in a.get('rel', [])
+                'nofollow': 'nofollow' in a.rel
             })
     
     return {
@@ -231,7 +266,7 @@ def analyze_links(soup, base_url):
 
         
 # Function to parse robots.txt and check for search engine accessibility
-def check_robots_txt(base_url):
+async def check_robots_txt(base_url):
     robots_url = urljoin(base_url, '/robots.txt')
     
     # Define search engine user agents to check
@@ -251,7 +286,7 @@ def check_robots_txt(base_url):
         # Use Googlebot user agent to fetch robots.txt
         googlebot_headers = HEADERS.copy()
         
-        response = requests.get(robots_url, headers=googlebot_headers, timeout=5, verify=False)
+        response = await fetch('GET', robots_url, verify=False, headers=googlebot_headers, timeout=5, follow_redirects=True)
         
         if response.status_code == 200:
             content = response.text
@@ -348,13 +383,13 @@ def check_robots_txt(base_url):
             }
             
         return {'exists': False}
-    except requests.RequestException:
+    except httpx.HTTPError:
         return {'exists': False}
 
 
 
 # Function to check WWW resolve
-def check_www_resolve(url):
+async def check_www_resolve(url):
     parsed_url = urlparse(url)
     scheme = parsed_url.scheme
     domain = parsed_url.netloc
@@ -369,37 +404,41 @@ def check_www_resolve(url):
     
     # Check both URLs
     try:
-        www_response = requests.head(www_url, headers=HEADERS, timeout=5, allow_redirects=True, verify=False)
-        non_www_response = requests.head(non_www_url, headers=HEADERS, timeout=5, allow_redirects=True, verify=False)
-        resolves_to_same = www_response.url == non_www_response.url
+        www_response, non_www_response = await asyncio.gather(
+            fetch('HEAD', www_url, verify=False, headers=HEADERS, timeout=5, follow_redirects=True),
+            fetch('HEAD', non_www_url, verify=False, headers=HEADERS, timeout=5, follow_redirects=True),
+        )
+        www_final_url = str(www_response.url)
+        non_www_final_url = str(non_www_response.url)
+        resolves_to_same = www_final_url == non_www_final_url
         # Determine preferred_url
         preferred_url = None
         if resolves_to_same:
-            preferred_url = www_response.url
+            preferred_url = www_final_url
         else:
             # Prefer the one with status 200, else www
             if www_response.status_code == 200:
-                preferred_url = www_response.url
+                preferred_url = www_final_url
             elif non_www_response.status_code == 200:
-                preferred_url = non_www_response.url
+                preferred_url = non_www_final_url
             else:
-                preferred_url = www_response.url
+                preferred_url = www_final_url
         # Determine if either redirects
         redirects = (
-            (www_response.url != www_url) or (non_www_response.url != non_www_url)
+            (www_final_url != www_url) or (non_www_final_url != non_www_url)
         )
         return {
             'www_url': www_url,
             'www_status': www_response.status_code,
-            'www_final_url': www_response.url,
+            'www_final_url': www_final_url,
             'non_www_url': non_www_url,
             'non_www_status': non_www_response.status_code,
-            'non_www_final_url': non_www_response.url,
+            'non_www_final_url': non_www_final_url,
             'resolves_to_same': resolves_to_same,
             'preferred_url': preferred_url,
             'redirects': redirects
         }
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {
             'www_url': www_url,
             'non_www_url': non_www_url,
@@ -408,21 +447,20 @@ def check_www_resolve(url):
 
 
 # Function to check redirect chains
-def check_redirect_chain(url):
+async def check_redirect_chain(url):
     try:
-        # Initialize session to track history
-        session = requests.Session()
-        response = session.get(url, headers=HEADERS, timeout=10)
+        # The response keeps every intermediate hop in its history
+        response = await fetch('GET', url, headers=HEADERS, timeout=10, follow_redirects=True)
         
         # Get history from the response
         redirect_history = [{
-            'url': h.url,
+            'url': str(h.url),
             'status_code': h.status_code
         } for h in response.history]
         
         # Add the final destination
         redirect_history.append({
-            'url': response.url,
+            'url': str(response.url),
             'status_code': response.status_code
         })
         
@@ -431,7 +469,7 @@ def check_redirect_chain(url):
             'chain': redirect_history,
             'has_chain': len(redirect_history) > 1
         }
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {
             'error': str(e),
             'has_chain': False
@@ -477,19 +515,19 @@ def check_analytics(html_content):
 
 
 # Function to check for custom 404 page
-def check_custom_404(base_url):
+async def check_custom_404(base_url):
     # Generate a random URL that is unlikely to exist
     random_path = f"/this-page-does-not-exist-{int(time.time())}"
     not_found_url = urljoin(base_url, random_path)
     
     try:
-        response = requests.get(not_found_url, headers=HEADERS, timeout=5, verify=False)
+        response = await fetch('GET', not_found_url, verify=False, headers=HEADERS, timeout=5, follow_redirects=True)
         return {
             'status_code': response.status_code,
             'has_custom_404': response.status_code == 404 and len(response.text) > 500,
             'is_soft_404': response.status_code == 200 and "not found" in response.text.lower()
         }
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {
             'error': str(e),
             'has_custom_404': False
@@ -497,7 +535,18 @@ def check_custom_404(base_url):
     
 
 # Function to check HTTPS and SSL
-def check_https(url):
+def _caused_by_ssl(error):
+    """True if an httpx connect error was raised by the TLS handshake."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, ssl.SSLError):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+async def check_https(url):
     parsed_url = urlparse(url)
     is_https = parsed_url.scheme == 'https'
     
@@ -505,10 +554,14 @@ def check_https(url):
     ssl_info = {}
     if is_https:
         try:
-            response = requests.get(url, headers=HEADERS, timeout=5, verify=False)
+            response = await fetch('GET', url, verify=False, headers=HEADERS, timeout=5, follow_redirects=True)
             ssl_info['valid_certificate'] = True
-        except SSLError as e:
-            ssl_info['valid_certificate'] = False
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if _caused_by_ssl(e):
+                ssl_info['valid_certificate'] = False
+            else:
+                # DNS failures and refused connections say nothing about the certificate
+                ssl_info['reachable'] = False
             ssl_info['error'] = str(e)
     
     # Check if HTTP redirects to HTTPS
@@ -517,9 +570,9 @@ def check_https(url):
     if is_https:
         http_url = f"http://{parsed_url.netloc}{parsed_url.path}"
         try:
-            response = requests.get(http_url, headers=HEADERS, timeout=5, allow_redirects=True, verify=False)
-            redirect_to_https = response.url.startswith('https://')
-        except requests.RequestException:
+            response = await fetch('GET', http_url, verify=False, headers=HEADERS, timeout=5, follow_redirects=True)
+            redirect_to_https = str(response.url).startswith('https://')
+        except httpx.HTTPError:
             pass
     
     return {
@@ -530,55 +583,84 @@ def check_https(url):
     }
 
 
-# Helper function to process sitemap response
-def process_sitemap_response(response):
+# Helper function to process a streamed sitemap response
+async def process_sitemap_response(response):
+    """Parse an open streamed response without buffering the whole body."""
+    url_list = []
+    sitemap_list = []
     try:
-        root = ET.fromstring(response.content)
-        namespaces = {'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        print(f"[DEBUG] process_sitemap_response: root tag={root.tag}", file=sys.stderr)
-        # Extract URL entries
-        url_elems = root.findall('.//sm:url', namespaces) or root.findall('.//url')
-        print(f"[DEBUG] process_sitemap_response: found {len(url_elems)} <url> elements", file=sys.stderr)
-        url_list = []
-        for ue in url_elems:
-            loc = ue.find('sm:loc', namespaces)
-            if loc is None:
-                loc = ue.find('loc')
-            if loc is not None and loc.text:
-                url_list.append(loc.text.strip())
-        # Extract sitemap index entries
-        sitemap_elems = root.findall('.//sm:sitemap', namespaces) or root.findall('.//sitemap')
-        print(f"[DEBUG] process_sitemap_response: found {len(sitemap_elems)} <sitemap> elements", file=sys.stderr)
-        sitemap_list = []
-        for se in sitemap_elems:
-            loc = se.find('sm:loc', namespaces)
-            if loc is None:
-                loc = se.find('loc')
-            if loc is not None and loc.text:
-                sitemap_list.append(loc.text.strip())
-        is_index = len(sitemap_list) > 0
-        print(f"[DEBUG] process_sitemap_response: is_index={is_index}, sitemap_list_sample={sitemap_list[:3]}", file=sys.stderr)
-        return {
-            'exists': True,
-            'is_valid_xml': True,
-            'url_count': len(url_list),
-            'sitemap_count': len(sitemap_list),
-            'is_index': is_index,
-            'url_list': url_list,
-            'sitemap_list': sitemap_list
-        }
-    except ET.ParseError:
+        async for kind, loc in response_entries(response):
+            if kind == 'url':
+                url_list.append(loc)
+            else:
+                sitemap_list.append(loc)
+    except SitemapParseError:
         return {
             'exists': True,
             'is_valid_xml': False
         }
+    except httpx.HTTPError:
+        raise
     except Exception:  # Catch any other issues parsing the content
         return {'exists': False, 'error': 'Content is not valid XML'}
+    print(f"[DEBUG] process_sitemap_response: found {len(url_list)} <url> elements", file=sys.stderr)
+    print(f"[DEBUG] process_sitemap_response: found {len(sitemap_list)} <sitemap> elements", file=sys.stderr)
+    is_index = len(sitemap_list) > 0
+    print(f"[DEBUG] process_sitemap_response: is_index={is_index}, sitemap_list_sample={sitemap_list[:3]}", file=sys.stderr)
+    return {
+        'exists': True,
+        'is_valid_xml': True,
+        'url_count': len(url_list),
+        'sitemap_count': len(sitemap_list),
+        'is_index': is_index,
+        'url_list': url_list,
+        'sitemap_list': sitemap_list
+    }
+
+
+async def _fetch_sitemap(sitemap_url, fetch_log):
+    """
+    Fetch and parse one sitemap. Returns the parsed result, or None when the
+    server did not answer with 200/202. Network errors propagate.
+    """
+    sitemap_headers = HEADERS.copy()
+    sitemap_headers['Cache-Control'] = 'no-cache'
+    sitemap_headers['Accept-Encoding'] = 'gzip, deflate, br'
+    async with stream('GET', sitemap_url, verify=False, headers=sitemap_headers, timeout=15, follow_redirects=True) as response:
+        fetch_log.append({'url': sitemap_url, 'status': response.status_code})
+        print(f"[DEBUG] Sitemap status for {sitemap_url}: {response.status_code}", file=sys.stderr)
+        if response.status_code not in (200, 202):
+            return None
+        if response.status_code == 202:
+            print(f"[WARNING] Sitemap pattern {sitemap_url} returned 202, attempting to parse anyway", file=sys.stderr)
+        return await process_sitemap_response(response)
+
+
+async def _collect_child_sitemap_urls(sitemap_list, fetch_log):
+    """Gather page URLs from every child sitemap of a sitemap index."""
+    print(f"[DEBUG] Found {len(sitemap_list)} child sitemaps in index. Sample: {sitemap_list[:3]}", file=sys.stderr)
+    urls = []
+    for child_sitemap_url in sitemap_list:
+        try:
+            child = await _fetch_sitemap(child_sitemap_url, fetch_log)
+        except httpx.HTTPError as e:
+            fetch_log.append({'url': child_sitemap_url, 'error': str(e)})
+            print(f"[ERROR] Exception fetching child sitemap {child_sitemap_url}: {e}", file=sys.stderr)
+            continue
+        if child is None:
+            print(f"[WARNING] Failed to fetch child sitemap {child_sitemap_url}", file=sys.stderr)
+            continue
+        if not child.get('is_valid_xml', False):
+            fetch_log.append({'url': child_sitemap_url, 'error': 'XML parse error'})
+            continue
+        child_urls = child.get('url_list', [])
+        print(f"[DEBUG] Found {len(child_urls)} URLs in child sitemap {child_sitemap_url}. Sample: {child_urls[:3]}", file=sys.stderr)
+        urls.extend(child_urls)
+    return urls
 
 
 # Function to check for sitemap.xml and other common sitemap patterns
-def check_sitemap(base_url):
-    import sys
+async def check_sitemap(base_url):
     print(f"[DEBUG] check_sitemap: base_url={base_url}", file=sys.stderr)
     # List of common sitemap patterns to check
     sitemap_patterns = [
@@ -591,136 +673,52 @@ def check_sitemap(base_url):
         '/sitemap1.xml',          # Numbered sitemaps
     ]
     fetch_log = []
-    # Also check for sitemap URL in robots.txt
+    # Candidate sitemaps in priority order: robots.txt declarations first
+    candidates = []
     try:
         robots_url = urljoin(base_url, '/robots.txt')
         print(f"[DEBUG] Fetching robots.txt: {robots_url}", file=sys.stderr)
         robots_headers = HEADERS.copy()
         robots_headers['Cache-Control'] = 'no-cache'
-        robots_response = requests.get(robots_url, headers=robots_headers, timeout=10, verify=False)
+        robots_response = await fetch('GET', robots_url, verify=False, headers=robots_headers, timeout=10, follow_redirects=True)
         fetch_log.append({'url': robots_url, 'status': robots_response.status_code})
         print(f"[DEBUG] robots.txt status: {robots_response.status_code}", file=sys.stderr)
         if robots_response.status_code == 200 or robots_response.status_code == 202:
             if robots_response.status_code == 202:
                 print(f"[WARNING] robots.txt returned 202, attempting to parse anyway", file=sys.stderr)
-            import re
-            sitemap_urls_in_robots = []
             for line in robots_response.text.split('\n'):
                 match = re.match(r'^\s*sitemap\s*:\s*(.+)$', line, re.IGNORECASE)
                 if match:
                     sitemap_url = match.group(1).strip()
                     print(f"[DEBUG] Found sitemap in robots.txt: {sitemap_url}", file=sys.stderr)
-                    sitemap_urls_in_robots.append(sitemap_url)
-            # Try sitemaps specified in robots.txt first
-            for sitemap_url in sitemap_urls_in_robots:
-                try:
-                    print(f"[DEBUG] Fetching sitemap from robots.txt: {sitemap_url}", file=sys.stderr)
-                    sitemap_headers = HEADERS.copy()
-                    sitemap_headers['Cache-Control'] = 'no-cache'
-                    response = requests.get(sitemap_url, headers=sitemap_headers, timeout=15, verify=False)
-                    fetch_log.append({'url': sitemap_url, 'status': response.status_code})
-                    print(f"[DEBUG] Sitemap status: {response.status_code}", file=sys.stderr)
-                    if response.status_code == 200 or response.status_code == 202:
-                        if response.status_code == 202:
-                            print(f"[WARNING] Sitemap pattern {sitemap_url} returned 202, attempting to parse anyway", file=sys.stderr)
-                        try:
-                            result = process_sitemap_response(response)
-                        except Exception as e:
-                            fetch_log.append({'url': sitemap_url, 'error': f'XML parse error: {e}'})
-                            return {'exists': False, 'error': f'XML parse error: {e}', 'fetch_log': fetch_log}
-                        # If it's a sitemap index, fetch child sitemaps to gather URLs
-                        if result.get('is_index'):
-                            print(f"[DEBUG] Entering sitemap index processing for {sitemap_url}", file=sys.stderr)
-                            raw_sitemap_list = result.get('sitemap_list', [])
-                            sitemap_list = raw_sitemap_list if isinstance(raw_sitemap_list, list) else []
-                            print(f"[DEBUG] Found {len(sitemap_list)} child sitemaps in index. Sample: {sitemap_list[:3]}", file=sys.stderr)
-                            urls = []
-                            for child_sitemap_url in sitemap_list:
-                                try:
-                                    print(f"[DEBUG] Fetching child sitemap: {child_sitemap_url}", file=sys.stderr)
-                                    child_headers = HEADERS.copy()
-                                    child_headers['Cache-Control'] = 'no-cache'
-                                    child_response = requests.get(child_sitemap_url, headers=child_headers, timeout=15, verify=False)
-                                    fetch_log.append({'url': child_sitemap_url, 'status': child_response.status_code})
-                                    print(f"[DEBUG] Child sitemap status: {child_response.status_code}", file=sys.stderr)
-                                    if child_response.status_code == 200 or child_response.status_code == 202:
-                                        if child_response.status_code == 202:
-                                            print(f"[WARNING] Sitemap pattern {child_sitemap_url} returned 202, attempting to parse anyway", file=sys.stderr)
-                                        raw_child_urls = process_sitemap_response(child_response).get('url_list', [])
-                                        child_urls = raw_child_urls if isinstance(raw_child_urls, list) else []
-                                        print(f"[DEBUG] Found {len(child_urls)} URLs in child sitemap {child_sitemap_url}. Sample: {child_urls[:3]}", file=sys.stderr)
-                                        urls.extend(child_urls)
-                                    else:
-                                        print(f"[WARNING] Failed to fetch child sitemap {child_sitemap_url}: status {child_response.status_code}", file=sys.stderr)
-                                except Exception as e:
-                                    print(f"[ERROR] Exception fetching child sitemap {child_sitemap_url}: {e}", file=sys.stderr)
-                            result['url_list'] = urls if isinstance(urls, list) else []
-                            print(f"[DEBUG] After processing sitemap index: found {len(urls)} URLs. Sample: {urls[:5]}", file=sys.stderr)
-                            if not urls:
-                                print(f"[WARNING] No URLs found in sitemap index {sitemap_url}", file=sys.stderr)
-                        result['found_at'] = sitemap_url
-                        result['found_via'] = 'robots.txt'
-                        result['fetch_log'] = fetch_log
-                        return result
-                except requests.RequestException as e:
-                    fetch_log.append({'url': sitemap_url, 'error': str(e)})
-                    print(f"[DEBUG] Error fetching sitemap from robots.txt: {e}", file=sys.stderr)
-                    continue
-    except requests.RequestException as e:
+                    candidates.append((sitemap_url, 'robots.txt'))
+    except httpx.HTTPError as e:
         fetch_log.append({'url': robots_url, 'error': str(e)})
         print(f"[DEBUG] Error fetching robots.txt: {e}", file=sys.stderr)
         pass  # Continue with pattern matching if robots.txt check fails
-    # Check each pattern
-    for pattern in sitemap_patterns:
-        sitemap_url = urljoin(base_url, pattern)
+    candidates.extend((urljoin(base_url, pattern), 'direct_check') for pattern in sitemap_patterns)
+
+    for sitemap_url, found_via in candidates:
         try:
-            print(f"[DEBUG] Fetching sitemap pattern: {sitemap_url}", file=sys.stderr)
-            sitemap_headers = HEADERS.copy()
-            sitemap_headers['Cache-Control'] = 'no-cache'
-            response = requests.get(sitemap_url, headers=sitemap_headers, timeout=15, verify=False)
-            fetch_log.append({'url': sitemap_url, 'status': response.status_code})
-            print(f"[DEBUG] Sitemap pattern status: {response.status_code}", file=sys.stderr)
-            if response.status_code == 200 or response.status_code == 202:
-                if response.status_code == 202:
-                    print(f"[WARNING] Sitemap pattern {sitemap_url} returned 202, attempting to parse anyway", file=sys.stderr)
-                try:
-                    result = process_sitemap_response(response)
-                except Exception as e:
-                    fetch_log.append({'url': sitemap_url, 'error': f'XML parse error: {e}'})
-                    return {'exists': False, 'error': f'XML parse error: {e}', 'fetch_log': fetch_log}
-                # If it's a sitemap index, fetch child sitemaps to gather URLs
-                if result.get('is_index'):
-                    urls = []
-                    for child_sitemap in result.get('sitemap_list', []):
-                        try:
-                            print(f"[DEBUG] Fetching child sitemap: {child_sitemap}", file=sys.stderr)
-                            child_headers = HEADERS.copy()
-                            child_headers['Cache-Control'] = 'no-cache'
-                            r2 = requests.get(child_sitemap, headers=child_headers, timeout=15, verify=False)
-                            fetch_log.append({'url': child_sitemap, 'status': r2.status_code})
-                            print(f"[DEBUG] Child sitemap status: {r2.status_code}", file=sys.stderr)
-                            if r2.status_code == 200 or r2.status_code == 202:
-                                if r2.status_code == 202:
-                                    print(f"[WARNING] Sitemap pattern {child_sitemap} returned 202, attempting to parse anyway", file=sys.stderr)
-                                try:
-                                    sub = process_sitemap_response(r2)
-                                    urls.extend(sub.get('url_list', []))
-                                except Exception as e:
-                                    fetch_log.append({'url': child_sitemap, 'error': f'XML parse error: {e}'})
-                                    continue
-                        except requests.RequestException as e:
-                            fetch_log.append({'url': child_sitemap, 'error': str(e)})
-                            print(f"[DEBUG] Error fetching child sitemap: {e}", file=sys.stderr)
-                            continue
-                    result['url_list'] = urls
-                result['found_at'] = sitemap_url
-                result['found_via'] = 'direct_check'
-                result['fetch_log'] = fetch_log
-                return result
-        except requests.RequestException as e:
+            result = await _fetch_sitemap(sitemap_url, fetch_log)
+        except httpx.HTTPError as e:
             fetch_log.append({'url': sitemap_url, 'error': str(e)})
-            print(f"[DEBUG] Error fetching sitemap pattern: {e}", file=sys.stderr)
+            print(f"[DEBUG] Error fetching sitemap {sitemap_url}: {e}", file=sys.stderr)
+            continue
+        if result is None:
             continue
+        # If it's a sitemap index, fetch child sitemaps to gather URLs
+        if result.get('is_index'):
+            print(f"[DEBUG] Entering sitemap index processing for {sitemap_url}", file=sys.stderr)
+            urls = await _collect_child_sitemap_urls(result.get('sitemap_list', []), fetch_log)
+            result['url_list'] = urls
+            print(f"[DEBUG] After processing sitemap index: found {len(urls)} URLs. Sample: {urls[:5]}", file=sys.stderr)
+            if not urls:
+                print(f"[WARNING] No URLs found in sitemap index {sitemap_url}", file=sys.stderr)
+        result['found_at'] = sitemap_url
+        result['found_via'] = found_via
+        result['fetch_log'] = fetch_log
+        return result
     # If we get here, no sitemap was found
     print(f"[DEBUG] No sitemap found for {base_url}", file=sys.stderr)
     return {'exists': False, 'checked_patterns': sitemap_patterns, 'fetch_log': fetch_log}
@@ -728,7 +726,7 @@ def check_sitemap(base_url):
 
 
 # Function to detect schema markup
-def check_schema_markup(html_content, soup):
+def check_schema_markup(html_content, page):
     results = {
         'has_schema': False,
         'schema_types': [],
@@ -738,7 +736,7 @@ def check_schema_markup(html_content, soup):
     }
     
     # Check for JSON-LD
-    json_ld_scripts = soup.find_all('script', {'type': 'application/ld+json'})
+    json_ld_scripts = page.json_ld
     if json_ld_scripts:
         results['has_schema'] = True
         results['json_ld_count'] = len(json_ld_scripts)
@@ -746,7 +744,7 @@ def check_schema_markup(html_content, soup):
         # Extract schema types
         for script in json_ld_scripts:
             try:
-                data = json.loads(script.string.strip() if script.string else "{}")
+                data = json.loads(script.strip() if script else "{}")
                 # Handle @type at the root level
                 if '@type' in data:
                     results['schema_types'].append(data['@type'])
@@ -765,26 +763,25 @@ def check_schema_markup(html_content, soup):
                 pass
     
     # Check for Microdata
-    microdata_elements = soup.find_all(itemscope=True)
-    if microdata_elements:
+    microdata_types = page.microdata_types
+    if microdata_types:
         results['has_schema'] = True
-        results['microdata_count'] = len(microdata_elements)
+        results['microdata_count'] = len(microdata_types)
         
         # Extract schema types from microdata
-        for element in microdata_elements:
-            if element.get('itemtype'):
-                schema_type = element.get('itemtype').split('/')[-1]
+        for itemtype in microdata_types:
+            if itemtype:
+                schema_type = itemtype.split('/')[-1]
                 results['schema_types'].append(schema_type)
     
     # Check for RDFa
-    rdfa_elements = soup.find_all(attrs={"typeof": True})
-    if rdfa_elements:
+    rdfa_types = page.rdfa_types
+    if rdfa_types:
         results['has_schema'] = True
-        results['rdfa_count'] = len(rdfa_elements)
+        results['rdfa_count'] = len(rdfa_types)
         
         # Extract schema types from RDFa
-        for element in rdfa_elements:
-            typeof_value = element.get('typeof')
+        for typeof_value in rdfa_types:
             if typeof_value:
                 # RDFa typeof can contain multiple space-separated types
                 if ' ' in typeof_value:
@@ -821,7 +818,7 @@ def check_schema_markup(html_content, soup):
 
 
 # Function to check if site is accessible to search engines
-def check_search_engine_accessibility(url, robots_result, meta_tags):
+async def check_search_engine_accessibility(url, robots_result, meta_tags):
     # Check if robots.txt blocks search engines
     blocked_by_robots_txt = robots_result.get('blocks_search_engines', False) if robots_result.get('exists', False) else False
     blocked_engines = robots_result.get('blocked_engines', []) if robots_result.get('exists', False) else []
@@ -838,10 +835,10 @@ def check_search_engine_accessibility(url, robots_result, meta_tags):
         googlebot_headers = HEADERS.copy()
         googlebot_headers['User-Agent'] = 'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)'
         
-        response = requests.head(url, headers=googlebot_headers, timeout=5, verify=False)
+        response = await fetch('HEAD', url, verify=False, headers=googlebot_headers, timeout=5)
         x_robots_tag = response.headers.get('X-Robots-Tag', '')
         blocked_by_header = 'noindex' in x_robots_tag.lower() or 'none' in x_robots_tag.lower()
-    except requests.RequestException:
+    except httpx.HTTPError:
         blocked_by_header = False
     
     return {
@@ -854,113 +851,136 @@ def check_search_engine_accessibility(url, robots_result, meta_tags):
     }
 
 
+# PageSpeed results are cached per (url, strategy, categories) so re-audits
+# within the TTL window skip the API call and do not use quota
+PAGESPEED_API_BASE = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+PAGESPEED_CATEGORIES = ('performance', 'accessibility', 'best-practices', 'seo')
+PAGESPEED_CACHE = StatsTTLCache(
+    maxsize=Config.PAGESPEED_CACHE_MAXSIZE,
+    ttl=Config.PAGESPEED_CACHE_TTL,
+)
+
+
+def get_pagespeed_cache_stats():
+    """Return hit/miss counters for the PageSpeed result cache."""
+    return PAGESPEED_CACHE.stats()
+
+
+def _parse_pagespeed_scores(data):
+    lighthouse = data.get('lighthouseResult', {})
+    categories = lighthouse.get('categories', {})
+    audits = lighthouse.get('audits', {})
+    return {
+        'success': True,
+        'performance_score': categories.get('performance', {}).get('score', 0) * 100,
+        'accessibility_score': categories.get('accessibility', {}).get('score', 0) * 100,
+        'best_practices_score': categories.get('best-practices', {}).get('score', 0) * 100,
+        'seo_score': categories.get('seo', {}).get('score', 0) * 100,
+        'first_contentful_paint': audits.get('first-contentful-paint', {}).get('displayValue', 'N/A'),
+        'speed_index': audits.get('speed-index', {}).get('displayValue', 'N/A'),
+        'largest_contentful_paint': audits.get('largest-contentful-paint', {}).get('displayValue', 'N/A'),
+        'time_to_interactive': audits.get('interactive', {}).get('displayValue', 'N/A'),
+        'total_blocking_time': audits.get('total-blocking-time', {}).get('displayValue', 'N/A'),
+        'cumulative_layout_shift': audits.get('cumulative-layout-shift', {}).get('displayValue', 'N/A'),
+    }
+
+
+def _parse_pagespeed_opportunities(data):
+    opportunities = []
+    for audit_id, audit in data.get('lighthouseResult', {}).get('audits', {}).items():
+        if audit.get('details', {}).get('type') == 'opportunity':
+            opportunities.append({
+                'title': audit.get('title', ''),
+                'description': audit.get('description', ''),
+                'score': audit.get('score', 0),
+                'display_value': audit.get('displayValue', 'N/A')
+            })
+    return opportunities
+
+
+async def fetch_pagespeed_strategy(url, strategy, api_key=None, timeout=600, categories=PAGESPEED_CATEGORIES):
+    """
+    Run PageSpeed Insights for one strategy ('mobile' or 'desktop').
+
+    Returns ``(status_code, parsed)`` where ``parsed`` holds the extracted
+    scores and opportunities, or ``None`` when the API did not return 200.
+    Only successful results are cached.
+    """
+    cache_key = (url, strategy, tuple(categories))
+    cached = PAGESPEED_CACHE.get(cache_key)
+    if cached is not None:
+        return 200, cached
+
+    # Encode URL for API request
+    encoded_url = quote(url, safe='')
+    params = f"url={encoded_url}&strategy={strategy}" + "".join(f"&category={c}" for c in categories)
+    api_url = f"{PAGESPEED_API_BASE}?{params}"
+    if api_key:
+        api_url = f"{api_url}&key={api_key}"
+
+    response = await fetch('GET', api_url, verify=False, timeout=timeout)
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    parsed = {
+        'results': _parse_pagespeed_scores(data),
+        'opportunities': _parse_pagespeed_opportunities(data),
+    }
+    PAGESPEED_CACHE.set(cache_key, parsed)
+    return 200, parsed
+
+
 # Function to check Google PageSpeed Insights
-def check_pagespeed(url, api_key=None, run_pagespeed=True, timeout=600):  # Increased timeout to 60 seconds
+async def check_pagespeed(url, api_key=None, run_pagespeed=True, timeout=600):
     if not run_pagespeed:
         return {'success': False, 'error': 'PageSpeed analysis disabled'}
     
     try:
-        # Encode URL for API request
-        encoded_url = quote(url, safe='')
-        
-        # Build API URL with key if provided
-        api_base = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
-        params = f"url={encoded_url}&strategy=mobile&category=performance&category=accessibility&category=best-practices&category=seo"
-        
-        if api_key:
-            api_url = f"{api_base}?{params}&key={api_key}"
-        else:
-            api_url = f"{api_base}?{params}"
-        
-        # Try to fetch mobile results with increased timeout
-        response = requests.get(api_url, timeout=timeout, verify=False)
+        # Mobile and desktop are independent, so request both at once
+        mobile, desktop = await asyncio.gather(
+            fetch_pagespeed_strategy(url, 'mobile', api_key=api_key, timeout=timeout),
+            fetch_pagespeed_strategy(url, 'desktop', api_key=api_key, timeout=timeout),
+            return_exceptions=True,
+        )
+        if isinstance(mobile, BaseException):
+            raise mobile
+        status_code, mobile_data = mobile
         
         # Handle rate limiting specifically
-        if response.status_code == 429:
+        if status_code == 429:
             return {
                 'success': False, 
                 'error': "API Rate Limit Exceeded", 
                 'resolution': "Consider adding a Google PageSpeed API key in the settings or try again later."
             }
         
-        # Process successful response
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract mobile results
-            mobile_results = {
-                'success': True,
-                'performance_score': data.get('lighthouseResult', {}).get('categories', {}).get('performance', {}).get('score', 0) * 100,
-                'accessibility_score': data.get('lighthouseResult', {}).get('categories', {}).get('accessibility', {}).get('score', 0) * 100,
-                'best_practices_score': data.get('lighthouseResult', {}).get('categories', {}).get('best-practices', {}).get('score', 0) * 100,
-                'seo_score': data.get('lighthouseResult', {}).get('categories', {}).get('seo', {}).get('score', 0) * 100,
-                'first_contentful_paint': data.get('lighthouseResult', {}).get('audits', {}).get('first-contentful-paint', {}).get('displayValue', 'N/A'),
-                'speed_index': data.get('lighthouseResult', {}).get('audits', {}).get('speed-index', {}).get('displayValue', 'N/A'),
-                'largest_contentful_paint': data.get('lighthouseResult', {}).get('audits', {}).get('largest-contentful-paint', {}).get('displayValue', 'N/A'),
-                'time_to_interactive': data.get('lighthouseResult', {}).get('audits', {}).get('interactive', {}).get('displayValue', 'N/A'),
-                'total_blocking_time': data.get('lighthouseResult', {}).get('audits', {}).get('total-blocking-time', {}).get('displayValue', 'N/A'),
-                'cumulative_layout_shift': data.get('lighthouseResult', {}).get('audits', {}).get('cumulative-layout-shift', {}).get('displayValue', 'N/A'),
-            }
-            
-            # Get desktop results (only if mobile was successful)
-            desktop_results = {'success': False}
-            try:
-                # Build desktop API URL
-                desktop_params = f"url={encoded_url}&strategy=desktop&category=performance&category=accessibility&category=best-practices&category=seo"
-                if api_key:
-                    desktop_api_url = f"{api_base}?{desktop_params}&key={api_key}"
-                else:
-                    desktop_api_url = f"{api_base}?{desktop_params}"
-                    
-                desktop_response = requests.get(desktop_api_url, timeout=timeout, verify=False)  # Use the same timeout value
-                if desktop_response.status_code == 200:
-                    desktop_data = desktop_response.json()
-                    desktop_results = {
-                        'success': True,
-                        'performance_score': desktop_data.get('lighthouseResult', {}).get('categories', {}).get('performance', {}).get('score', 0) * 100,
-                        'accessibility_score': desktop_data.get('lighthouseResult', {}).get('categories', {}).get('accessibility', {}).get('score', 0) * 100,
-                        'best_practices_score': desktop_data.get('lighthouseResult', {}).get('categories', {}).get('best-practices', {}).get('score', 0) * 100,
-                        'seo_score': desktop_data.get('lighthouseResult', {}).get('categories', {}).get('seo', {}).get('score', 0) * 100,
-                        'first_contentful_paint': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('first-contentful-paint', {}).get('displayValue', 'N/A'),
-                        'speed_index': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('speed-index', {}).get('displayValue', 'N/A'),
-                        'largest_contentful_paint': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('largest-contentful-paint', {}).get('displayValue', 'N/A'),
-                        'time_to_interactive': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('interactive', {}).get('displayValue', 'N/A'),
-                        'total_blocking_time': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('total-blocking-time', {}).get('displayValue', 'N/A'),
-                        'cumulative_layout_shift': desktop_data.get('lighthouseResult', {}).get('audits', {}).get('cumulative-layout-shift', {}).get('displayValue', 'N/A'),
-                    }
-                else:
-                    # If desktop fails but mobile worked, just note the desktop error
-                    desktop_results = {'success': False, 'error': f"API Error: {desktop_response.status_code}"}
-            except Exception as e:
-                # If desktop analysis fails, we can still return mobile results
-                desktop_results = {'success': False, 'error': str(e)}
-                
-            # Get opportunities for improvement
-            opportunities = []
-            for audit_id, audit in data.get('lighthouseResult', {}).get('audits', {}).items():
-                if audit.get('details', {}).get('type') == 'opportunity':
-                    opportunities.append({
-                        'title': audit.get('title', ''),
-                        'description': audit.get('description', ''),
-                        'score': audit.get('score', 0),
-                        'display_value': audit.get('displayValue', 'N/A')
-                    })
-            
-            return {
-                'mobile': mobile_results,
-                'desktop': desktop_results,
-                'opportunities': opportunities,
-                'success': True
-            }
+        if mobile_data is None:
+            return {'success': False, 'error': f"API Error: {status_code}"}
+        
+        # Desktop results are only reported alongside a successful mobile run
+        if isinstance(desktop, BaseException):
+            # If desktop analysis fails, we can still return mobile results
+            desktop_results = {'success': False, 'error': str(desktop)}
+        elif desktop[1] is None:
+            # If desktop fails but mobile worked, just note the desktop error
+            desktop_results = {'success': False, 'error': f"API Error: {desktop[0]}"}
         else:
-            return {'success': False, 'error': f"API Error: {response.status_code}"}
-    except requests.exceptions.Timeout:
+            desktop_results = desktop[1]['results']
+        
+        return {
+            'mobile': mobile_data['results'],
+            'desktop': desktop_results,
+            'opportunities': mobile_data['opportunities'],
+            'success': True
+        }
+    except httpx.TimeoutException:
         return {
             'success': False, 
             'error': 'Connection Timeout', 
             'resolution': 'The PageSpeed API is taking too long to respond. Try again later or analyze a simpler page.'
         }
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return {
             'success': False, 
             'error': 'Connection Error', 
@@ -1088,6 +1108,8 @@ def get_seo_recommendations(analysis):
         recommendations.append("[FAIL] The website is not using HTTPS. Consider upgrading to HTTPS for better security and SEO.")
     elif 'ssl_info' in https and not https['ssl_info'].get('valid_certificate', True):
         recommendations.append("[FAIL] The website has an invalid SSL certificate. Fix SSL issues for better security and user trust.")
+    elif 'ssl_info' in https and not https['ssl_info'].get('reachable', True):
+        recommendations.append("[WARNING] The website could not be reached over HTTPS, so its SSL certificate could not be checked.")
     else:
         recommendations.append("[PASS] The website is using HTTPS with a valid SSL certificate.")
     
@@ -0,0 +1,80 @@
+"""
+Summary of the bulk inner-page audit.
+
+The page rows are walked once: each page is bucketed by its stripped title
+and meta description and checked for missing values and length issues on
+the way, so the cost stays linear in the number of pages however many
+duplicate groups a site has.
+"""
+from typing import Any, Dict, Iterable, List, Mapping
+
+
+def summarize_inner_pages(
+    inner_results: List[Dict[str, Any]],
+    inner_link_map: Mapping[str, Iterable[str]],
+    url_list: Iterable[str],
+    base_url: str,
+) -> Dict[str, Any]:
+    """
+    Missing, duplicate and badly sized titles and descriptions, and orphan
+    pages (no inbound link from another audited page, the home page
+    excepted). Duplicate URL lists are grouped by value, groups in order of
+    first appearance.
+    """
+    missing_titles_list = []
+    missing_descriptions_list = []
+    title_length_issues = []
+    desc_length_issues = []
+    # value -> URLs of the pages that have it, in page order
+    title_groups: Dict[str, List[str]] = {}
+    desc_groups: Dict[str, List[str]] = {}
+
+    for row in inner_results:
+        url = row["URL"]
+        title = (row["Title"] or "").strip()
+        desc = (row["Meta Description"] or "").strip()
+        if title:
+            title_groups.setdefault(title, []).append(url)
+        else:
+            missing_titles_list.append(url)
+        if desc:
+            desc_groups.setdefault(desc, []).append(url)
+        else:
+            missing_descriptions_list.append(url)
+        if row["Title Length"] < 50 or row["Title Length"] > 60:
+            title_length_issues.append(url)
+        if row["Description Length"] > 160:
+            desc_length_issues.append(url)
+
+    duplicate_titles = [url for urls in title_groups.values() if len(urls) > 1 for url in urls]
+    dup_title_groups = sum(1 for urls in title_groups.values() if len(urls) > 1)
+    duplicate_desc_groups = [url for urls in desc_groups.values() if len(urls) > 1 for url in urls]
+    dup_desc_groups = sum(1 for urls in desc_groups.values() if len(urls) > 1)
+
+    inbound_counts = dict.fromkeys(url_list, 0)
+    for targets in inner_link_map.values():
+        for target in targets:
+            if target in inbound_counts:
+                inbound_counts[target] += 1
+    root_norm = base_url.rstrip("/")
+    orphan_pages = [
+        u for u, cnt in inbound_counts.items() if cnt == 0 and u.rstrip("/") != root_norm
+    ]
+
+    return {
+        "total_pages": len(inner_results),
+        "missing_titles": len(missing_titles_list),
+        "missing_titles_list": missing_titles_list,
+        "missing_descriptions": len(missing_descriptions_list),
+        "missing_descriptions_list": missing_descriptions_list,
+        "duplicate_groups": dup_title_groups,
+        "duplicate_titles": duplicate_titles,
+        "duplicate_pages": len(duplicate_titles),
+        "duplicate_desc_groups_count": dup_desc_groups,
+        "duplicate_desc_groups": duplicate_desc_groups,
+        "duplicate_desc_pages": len(duplicate_desc_groups),
+        "title_length_issues": title_length_issues,
+        "desc_length_issues": desc_length_issues,
+        "orphan_pages": orphan_pages,
+        "orphan_count": len(orphan_pages),
+    }
@@ -0,0 +1,391 @@
+"""
+Persisted, resumable site audits.
+
+A job is an ``Audit`` document of the site's ``AuditGroup``, run by a
+background task. Every finished check is written to the audit's checkpoint
+and inner pages are audited in batches whose rows go to a side collection,
+so a job that crashed or was cancelled continues from its last checkpoint
+instead of starting over. The running process holds a lease on the job,
+renewed through ``updated_at``; once the lease runs out (the process died)
+any instance may take the job over.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from app.core.config import Config
+from app.core.database import get_database
+from app.seo_audit.executor import Subtask, run_subtasks
+from app.seo_audit.helpers import determine_audit_status, get_page_content
+from app.seo_audit.inner_summary import summarize_inner_pages
+from app.seo_audit.models import Audit, AuditGroup
+from app.seo_audit.page_model import parse_page
+from app.seo_audit.pipeline import (
+    audit_inner_page,
+    build_report,
+    build_subtasks,
+    inner_fetch_limit,
+    inner_page_urls,
+)
+
+logger = logging.getLogger(__name__)
+
+GROUPS = 'seo_audit_groups'
+AUDITS = 'seo_audits'
+PAGES = 'seo_audit_pages'
+
+QUEUED = "Queued"
+RUNNING = "Running"
+COMPLETED = "Completed"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+ACTIVE = [QUEUED, RUNNING]
+
+
+class AuditJobError(Exception):
+    """Raised when an audit job cannot continue."""
+
+
+def _now() -> datetime:
+    # The audit models store naive UTC datetimes
+    return datetime.utcnow()
+
+
+def _plain(value: Any) -> Any:
+    """JSON-compatible copy of a check result, safe to store in MongoDB."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _failed_check(result: Any) -> bool:
+    return isinstance(result, dict) and set(result) == {'error'}
+
+
+async def upsert_group(database, url: str, ran_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """The ``AuditGroup`` of ``url``, created on first use."""
+    group_doc = AuditGroup(url=url).model_dump(by_alias=True)
+    update: Dict[str, Any] = {
+        '$setOnInsert': {k: v for k, v in group_doc.items() if k not in ('url', 'first_run_at', 'last_run_at')}
+    }
+    if ran_at is not None:
+        # $min also fills in first_run_at for groups created before their first run
+        update['$min'] = {'first_run_at': ran_at}
+        update['$set'] = {'last_run_at': ran_at}
+    return await database[GROUPS].find_one_and_update(
+        {'url': url}, update, upsert=True, return_document=ReturnDocument.AFTER
+    )
+
+
+class AuditJobs:
+    """Starts, checkpoints, cancels and resumes audit jobs."""
+
+    def __init__(self, batch_size: int = Config.AUDIT_JOB_BATCH_SIZE, lease: int = Config.AUDIT_JOB_LEASE):
+        self.batch_size = max(batch_size, 1)
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._recovery: Optional[asyncio.Task] = None
+        self._indexes_ready = False
+        self.started = 0
+        self.resumed = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    # --- lifecycle ------------------------------------------------------------
+
+    def start(self):
+        """Start taking over abandoned jobs. Called on application startup."""
+        if self._recovery is None:
+            self._recovery = asyncio.create_task(self._recover_loop())
+
+    async def close(self):
+        """
+        Stop the running jobs without changing their state; their leases
+        expire and they are resumed by the next instance to start.
+        """
+        tasks = [t for t in [self._recovery, *self._tasks.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._recovery = None
+        self._tasks.clear()
+
+    async def _ensure_indexes(self, database):
+        if not self._indexes_ready:
+            await database[PAGES].create_index([('audit_id', 1), ('i', 1)])
+            await database[AUDITS].create_index([('progress', 1), ('updated_at', 1)])
+            await database[AUDITS].create_index([('progress', 1), ('not_before', 1)])
+            await database[AUDITS].create_index([('domain', 1), ('not_before', 1)])
+            # One run per schedule occurrence, however many instances claim it
+            await database[AUDITS].create_index(
+                [('schedule_id', 1), ('scheduled_for', 1)],
+                unique=True,
+                partialFilterExpression={'schedule_id': {'$type': 'string'}},
+            )
+            self._indexes_ready = True
+
+    # --- public operations ----------------------------------------------------
+
+    async def create(self, url: str, user_id: str) -> Dict[str, Any]:
+        """Record a new audit of ``url`` under its group and start it."""
+        doc = await self.enqueue(url, user_id)
+        self.started += 1
+        await self._claim_and_launch({'_id': doc['_id'], 'progress': QUEUED})
+        return doc
+
+    async def enqueue(self, url: str, user_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Record a new queued audit of ``url`` without starting it; ``fields``
+        are extra ``Audit`` fields. Raises DuplicateKeyError if the schedule
+        occurrence it belongs to was already recorded.
+        """
+        database = get_database()
+        await self._ensure_indexes(database)
+        group = await upsert_group(database, url, ran_at=_now())
+        audit = Audit(
+            group_id=group['_id'], user_id=str(user_id), parameters={'url': url}, progress=QUEUED, checkpoint={},
+            **fields
+        )
+        doc = audit.model_dump(by_alias=True)
+        await database[AUDITS].insert_one(doc)
+        return doc
+
+    async def launch(self, audit_id: str) -> bool:
+        """Start a queued job here; False if it was started or cancelled elsewhere."""
+        if not await self._claim_and_launch({'_id': audit_id, 'progress': QUEUED}):
+            return False
+        self.started += 1
+        return True
+
+    async def wait(self, audit_id: str):
+        """Wait for a job started by this process to stop running here."""
+        task = self._tasks.get(audit_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def get(self, audit_id: str, with_results: bool = False) -> Optional[Dict[str, Any]]:
+        projection = None if with_results else {'results': 0, 'checkpoint.analysis': 0}
+        return await get_database()[AUDITS].find_one({'_id': audit_id}, projection)
+
+    async def cancel(self, audit_id: str) -> bool:
+        """Stop a queued or running job; it can be resumed later."""
+        result = await get_database()[AUDITS].update_one(
+            {'_id': audit_id, 'progress': {'$in': ACTIVE}},
+            {'$set': {'progress': CANCELLED, 'stage': "Cancelled", 'updated_at': _now()}},
+        )
+        if not result.modified_count:
+            return False
+        task = self._tasks.get(audit_id)
+        if task is not None:
+            task.cancel()
+        self.cancelled += 1
+        return True
+
+    async def resume(self, audit_id: str) -> bool:
+        """Restart a cancelled or failed job from its last checkpoint."""
+        result = await get_database()[AUDITS].update_one(
+            {'_id': audit_id, 'progress': {'$in': [CANCELLED, FAILED]}},
+            {'$set': {'progress': QUEUED, 'owner': None, 'error': None, 'updated_at': _now()}},
+        )
+        if not result.modified_count:
+            return False
+        self.resumed += 1
+        await self._claim_and_launch({'_id': audit_id, 'progress': QUEUED})
+        return True
+
+    # --- claiming -------------------------------------------------------------
+
+    async def _claim_and_launch(self, query: Dict[str, Any]) -> bool:
+        """Atomically take the job matching ``query`` and run it here."""
+        doc = await get_database()[AUDITS].find_one_and_update(
+            query,
+            {'$set': {'progress': RUNNING, 'owner': self.owner, 'updated_at': _now()}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return False
+        task = asyncio.create_task(self._run(doc))
+        self._tasks[doc['_id']] = task
+        task.add_done_callback(lambda _, audit_id=doc['_id']: self._tasks.pop(audit_id, None))
+        return True
+
+    async def _recover_loop(self):
+        while True:
+            try:
+                await self._recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Could not look for abandoned audit jobs: {e}")
+            await asyncio.sleep(self.lease)
+
+    async def _recover(self):
+        """
+        Take over jobs whose lease expired, e.g. after a crash or restart.
+        Queued scheduled runs are left to the scheduler, which starts them
+        within its worker and domain limits.
+        """
+        expired = _now() - timedelta(seconds=self.lease)
+        cursor = get_database()[AUDITS].find(
+            {
+                'updated_at': {'$lt': expired},
+                '$or': [{'progress': RUNNING}, {'progress': QUEUED, 'not_before': None}],
+            },
+            {'_id': 1, 'updated_at': 1},
+        )
+        async for doc in cursor:
+            # Matching the observed updated_at makes sure only one instance wins
+            query = {'_id': doc['_id'], 'progress': {'$in': ACTIVE}, 'updated_at': doc['updated_at']}
+            if await self._claim_and_launch(query):
+                self.resumed += 1
+                logger.info(f"Resuming abandoned audit job {doc['_id']}")
+
+    # --- running --------------------------------------------------------------
+
+    async def _update(self, audit_id: str, fields: Dict[str, Any], unset: Optional[Dict[str, Any]] = None) -> bool:
+        """Write to a job this process still owns; False once it lost it."""
+        update = {'$set': {**fields, 'updated_at': _now()}}
+        if unset:
+            update['$unset'] = unset
+        result = await get_database()[AUDITS].update_one(
+            {'_id': audit_id, 'owner': self.owner, 'progress': RUNNING}, update
+        )
+        return bool(result.matched_count)
+
+    async def _heartbeat(self, audit_id: str, job: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                owned = await self._update(audit_id, {})
+            except Exception as e:
+                logger.warning(f"Could not renew the lease of audit job {audit_id}: {e}")
+                continue
+            if not owned:
+                # Cancelled elsewhere or taken over by another instance
+                job.cancel()
+                return
+
+    async def _run(self, doc: Dict[str, Any]):
+        audit_id = doc['_id']
+        heartbeat = asyncio.create_task(self._heartbeat(audit_id, asyncio.current_task()))
+        try:
+            if await self._execute(audit_id, doc['parameters']['url'], doc.get('checkpoint') or {}):
+                self.completed += 1
+        except asyncio.CancelledError:
+            # Cancelled jobs already carry their state; on shutdown the lease expires
+            raise
+        except Exception as e:
+            logger.error(f"Audit job {audit_id} failed: {e}")
+            self.failed += 1
+            await self._update(audit_id, {'progress': FAILED, 'stage': "Failed", 'error': str(e)})
+        finally:
+            heartbeat.cancel()
+
+    async def _execute(self, audit_id: str, url: str, checkpoint: Dict[str, Any]) -> bool:
+        """Run the audit from ``checkpoint``; False if the job was lost on the way."""
+        database = get_database()
+        html, status, final_url = await get_page_content(url)
+        if not html:
+            raise AuditJobError(f"Failed to fetch URL: {status}")
+        base_url = final_url or url
+        page = await asyncio.to_thread(parse_page, html)
+        subtasks = build_subtasks(html, page, base_url)
+        # Checks finished before an interruption are replayed from the
+        # checkpoint, which also hands their results to dependent checks
+        done: Dict[str, Any] = checkpoint.get('analysis') or {}
+        await self._update(audit_id, {
+            'stage': "Page fetched successfully.",
+            'checkpoint.base_url': base_url,
+            'checkpoint.subtasks_total': len(subtasks),
+            'checkpoint.subtasks_done': len(done),
+        })
+        runnable = [
+            Subtask(task.key, task.message, lambda result=done[task.key]: result) if task.key in done else task
+            for task in subtasks
+        ]
+        analysis: Dict[str, Any] = {}
+        async for task, result in run_subtasks(runnable):
+            analysis[task.key] = result = _plain(result)
+            # Failed checks are not checkpointed, so a resumed job retries them
+            if task.key not in done and not _failed_check(result):
+                done[task.key] = result
+                await self._update(audit_id, {
+                    f'checkpoint.analysis.{task.key}': result,
+                    'checkpoint.subtasks_done': len(done),
+                    'stage': task.message,
+                })
+        analysis = {task.key: analysis[task.key] for task in subtasks}
+
+        url_list = inner_page_urls(analysis)
+        if url_list:
+            if not await self._audit_inner_pages(audit_id, url_list, checkpoint.get('inner_done', 0)):
+                return False
+            pages = await database[PAGES].find(
+                {'audit_id': audit_id}, {'row': 1, 'links': 1}
+            ).sort('i', 1).to_list(length=None)
+            inner_results = [p['row'] for p in pages]
+            inner_link_map = {p['row']['URL']: p['links'] for p in pages}
+            analysis["inner_audit_df"] = inner_results
+            analysis["inner_summary"] = summarize_inner_pages(inner_results, inner_link_map, url_list, base_url)
+
+        report = _plain(build_report(url, base_url, analysis))
+        completed = await self._update(
+            audit_id,
+            {
+                'progress': COMPLETED,
+                'stage': "Done.",
+                'results': report,
+                'audit_status': determine_audit_status(report['recommendations']),
+                'completed_at': _now(),
+            },
+            # The report holds everything the checkpoint did
+            unset={'checkpoint.analysis': ''},
+        )
+        if completed:
+            await database[PAGES].delete_many({'audit_id': audit_id})
+        return completed
+
+    async def _audit_inner_pages(self, audit_id: str, url_list: List[str], inner_done: int) -> bool:
+        """
+        Audit the sitemap URLs from ``inner_done`` on, checkpointing each
+        batch. False if the job was lost on the way.
+        """
+        pages = get_database()[PAGES]
+        limit = inner_fetch_limit()
+        await self._update(audit_id, {'checkpoint.inner_total': len(url_list)})
+        for start in range(inner_done, len(url_list), self.batch_size):
+            batch = url_list[start:start + self.batch_size]
+            rows = await asyncio.gather(*(audit_inner_page(u, limit) for u in batch))
+            # Rows of a batch interrupted before its checkpoint are written again
+            await pages.delete_many({'audit_id': audit_id, 'i': {'$gte': start}})
+            await pages.insert_many([
+                {'audit_id': audit_id, 'i': start + n, 'row': row, 'links': links}
+                for n, (row, links) in enumerate(rows)
+            ])
+            done = start + len(batch)
+            if not await self._update(audit_id, {
+                'checkpoint.inner_done': done,
+                'stage': f"Audited {done}/{len(url_list)} inner pages...",
+            }):
+                return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': len(self._tasks),
+            'started': self.started,
+            'resumed': self.resumed,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+        }
+
+
+audit_jobs = AuditJobs()
@@ -34,6 +34,23 @@ class Audit(BaseModel):
     results: Optional[Any] = None
     run_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     progress: str = "Queued"
+    # Last progress message, e.g. the check that just finished
+    stage: Optional[str] = None
+    # Finished checks and inner-page position a resumed job continues from
+    checkpoint: Optional[Any] = None
+    # Process running the job; its lease is renewed through updated_at
+    owner: Optional[str] = None
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    # Overall outcome of a completed audit (see determine_audit_status)
+    audit_status: Optional[str] = None
+    error: Optional[str] = None
+    # Set on runs of a ScheduledAudit: the occurrence they belong to, the
+    # audited domain and the earliest time the scheduler may start them
+    schedule_id: Optional[str] = None
+    scheduled_for: Optional[datetime] = None
+    domain: Optional[str] = None
+    not_before: Optional[datetime] = None
     
     class Config:
         populate_by_name = True
@@ -46,6 +63,7 @@ class ScheduledAudit(BaseModel):
     cron_expression: str
     next_run_at: Optional[datetime] = None
     last_run_at: Optional[datetime] = None
+    last_audit_id: Optional[str] = None
     active: bool = True
     
     class Config:
@@ -0,0 +1,132 @@
+"""
+Parse-once page model for the SEO audit analyzers.
+
+The page is parsed once with lxml and walked once; every node the analyzers
+look at (title, meta and link tags, headings, images, anchors, structured
+data) and the visible text are collected on the way. The analyzers in
+``helpers`` read from the resulting :class:`PageModel` instead of running
+their own BeautifulSoup ``find_all`` passes over the tree.
+
+Visible text follows BeautifulSoup's ``get_text`` rules: strings inside
+``script``, ``style`` and ``template`` elements and comments are left out.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from lxml import etree, html as lxml_html
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Elements whose strings are not part of the visible text
+_HIDDEN_TEXT_TAGS = {'script', 'style', 'template'}
+
+_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+
+@dataclass
+class Anchor:
+    href: str
+    text: str
+    rel: List[str]
+
+
+@dataclass
+class PageModel:
+    """Everything the audit analyzers read from a page."""
+    title: Optional[str] = None
+    metas: List[Dict[str, str]] = field(default_factory=list)
+    link_tags: List[Dict[str, str]] = field(default_factory=list)
+    headings: Dict[str, List[str]] = field(default_factory=lambda: {tag: [] for tag in HEADING_TAGS})
+    images: List[Dict[str, str]] = field(default_factory=list)
+    anchors: List[Anchor] = field(default_factory=list)
+    # Contents of the application/ld+json scripts (None when empty)
+    json_ld: List[Optional[str]] = field(default_factory=list)
+    # itemtype of each itemscope element (None when it has none)
+    microdata_types: List[Optional[str]] = field(default_factory=list)
+    # typeof attribute of each RDFa element
+    rdfa_types: List[str] = field(default_factory=list)
+    text: str = ''
+
+
+def _document(content: Union[str, bytes], encoding: Optional[str]):
+    if isinstance(content, bytes):
+        # Without a charset from the response headers, libxml2 picks the
+        # encoding from the meta charset / BOM
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        return lxml_html.document_fromstring(content, parser=parser)
+    # lxml refuses str input that carries an XML encoding declaration
+    return lxml_html.document_fromstring(content.encode('utf-8', 'replace'), parser=_PARSER)
+
+
+def parse_page(content: Union[str, bytes], encoding: Optional[str] = None) -> PageModel:
+    """
+    Build the page model of an HTML document in a single tree walk. Raw
+    bytes are decoded with ``encoding`` when the response declared one.
+    """
+    page = PageModel()
+    if not content:
+        return page
+    try:
+        root = _document(content, encoding)
+    except (etree.ParserError, ValueError, LookupError):
+        return page
+
+    text_parts: List[str] = []
+    hidden_depth = 0
+    title_seen = False
+
+    def add_text(value: Optional[str]):
+        if value and hidden_depth == 0:
+            value = value.strip()
+            if value:
+                text_parts.append(value)
+
+    # Comments and processing instructions are only reported by their own
+    # events, never as start/end
+    for event, el in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        tag = el.tag
+        if not isinstance(tag, str):
+            # They contribute their tail but not their content
+            add_text(el.tail)
+            continue
+
+        if event == 'end':
+            if tag in _HIDDEN_TEXT_TAGS:
+                hidden_depth -= 1
+            add_text(el.tail)
+            continue
+
+        if tag in _HIDDEN_TEXT_TAGS:
+            hidden_depth += 1
+        else:
+            add_text(el.text)
+
+        attrib = el.attrib
+        if tag == 'title':
+            if not title_seen:
+                title_seen = True
+                page.title = el.text if len(el) == 0 else None
+        elif tag == 'meta':
+            page.metas.append(dict(attrib))
+        elif tag == 'link':
+            page.link_tags.append(dict(attrib))
+        elif tag in HEADING_TAGS:
+            heading = el.text_content().strip()
+            if heading:
+                page.headings[tag].append(heading)
+        elif tag == 'img':
+            page.images.append(dict(attrib))
+        elif tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                page.anchors.append(Anchor(href, el.text_content().strip(), attrib.get('rel', '').split()))
+        elif tag == 'script' and attrib.get('type') == 'application/ld+json':
+            page.json_ld.append(el.text if len(el) == 0 else None)
+
+        if 'itemscope' in attrib:
+            page.microdata_types.append(attrib.get('itemtype'))
+        if 'typeof' in attrib:
+            page.rdfa_types.append(attrib['typeof'])
+
+    page.text = ' '.join(text_parts)
+    return page
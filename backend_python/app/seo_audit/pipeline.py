@@ -0,0 +1,126 @@
+"""
+Building blocks of a site audit, shared by the streaming ``/audits``
+endpoint and the persisted audit jobs.
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import Config
+from app.seo_audit.executor import Subtask
+from app.seo_audit.helpers import (
+    get_inner_page_meta,
+    analyze_meta_tags,
+    analyze_headings,
+    analyze_images,
+    analyze_content,
+    analyze_links,
+    check_robots_txt,
+    check_www_resolve,
+    check_redirect_chain,
+    check_analytics,
+    check_custom_404,
+    check_https,
+    check_sitemap,
+    check_schema_markup,
+    check_search_engine_accessibility,
+    check_pagespeed,
+    get_seo_recommendations,
+)
+from app.seo_audit.page_model import PageModel
+
+
+def build_subtasks(html: str, page: PageModel, base_url: str) -> List[Subtask]:
+    """The checks run against the audited page and its site."""
+    return [
+        Subtask("meta_tags", "Analyzing meta tags...", lambda: asyncio.to_thread(analyze_meta_tags, page)),
+        Subtask("headings", "Analyzing headings...", lambda: asyncio.to_thread(analyze_headings, page)),
+        Subtask("images", "Analyzing images...", lambda: asyncio.to_thread(analyze_images, page, base_url)),
+        Subtask("content", "Analyzing main content...", lambda: asyncio.to_thread(analyze_content, page)),
+        Subtask("links", "Analyzing links...", lambda: asyncio.to_thread(analyze_links, page, base_url)),
+        Subtask("robots", "Checking robots.txt...", lambda: check_robots_txt(base_url)),
+        Subtask(
+            "www_resolve",
+            "Checking www/non-www redirection...",
+            lambda: check_www_resolve(base_url),
+        ),
+        Subtask(
+            "redirect_chain",
+            "Checking redirect chains...",
+            lambda: check_redirect_chain(base_url),
+        ),
+        Subtask(
+            "analytics",
+            "Checking for analytics scripts...",
+            lambda: asyncio.to_thread(check_analytics, html),
+        ),
+        Subtask(
+            "custom_404",
+            "Checking for custom 404 page...",
+            lambda: check_custom_404(base_url),
+        ),
+        Subtask("https", "Checking HTTPS...", lambda: check_https(base_url)),
+        Subtask("sitemap", "Checking for sitemap.xml...", lambda: check_sitemap(base_url)),
+        Subtask(
+            "schema_markup",
+            "Checking for structured data...",
+            lambda: asyncio.to_thread(check_schema_markup, html, page),
+        ),
+        Subtask(
+            "accessibility",
+            "Checking search engine accessibility...",
+            lambda robots, meta_tags: check_search_engine_accessibility(
+                base_url, robots, meta_tags
+            ),
+            depends_on=("robots", "meta_tags"),
+        ),
+        Subtask(
+            "pagespeed",
+            "Checking page speed...",
+            lambda: check_pagespeed(base_url, api_key=os.getenv('PAGESPEED_API_KEY'), run_pagespeed=True),
+        ),
+    ]
+
+
+def inner_page_urls(analysis: Dict[str, Any]) -> List[str]:
+    """Sitemap URLs to audit as inner pages."""
+    sitemap = analysis.get("sitemap", {})
+    return sitemap.get("url_list", []) if sitemap.get("exists", False) else []
+
+
+async def audit_inner_page(u: str, limit: Optional[asyncio.Semaphore] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """Inner audit row of a sitemap URL and the internal links found on it."""
+    if limit is None:
+        page = await get_inner_page_meta(u)
+    else:
+        async with limit:
+            page = await get_inner_page_meta(u)
+    if page:
+        return {
+            "URL": u,
+            "Title": page["title"],
+            "Title Length": page["title_length"],
+            "Meta Description": page["meta_description"],
+            "Description Length": page["meta_description_length"],
+        }, page["internal_links"]
+    return {
+        "URL": u,
+        "Title": None,
+        "Title Length": 0,
+        "Meta Description": None,
+        "Description Length": 0,
+    }, []
+
+
+def inner_fetch_limit() -> asyncio.Semaphore:
+    # Fetches run concurrently on the event loop; parsing goes to the analysis process pool
+    return asyncio.Semaphore(Config.AUDIT_INNER_FETCH_CONCURRENCY)
+
+
+def build_report(url: str, base_url: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "canonical_url": base_url,
+        "analysis": analysis,
+        "recommendations": get_seo_recommendations(analysis),
+    }
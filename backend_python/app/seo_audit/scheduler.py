@@ -0,0 +1,265 @@
+"""
+Runs ``ScheduledAudit`` documents on their cron schedules.
+
+Every ``AUDIT_SCHEDULER_INTERVAL`` seconds the scheduler looks for active
+schedules that are due and records each occurrence as a queued ``Audit``
+job before moving ``next_run_at`` to the next cron time, so a claimed run
+survives a deploy or crash and is started by whichever instance polls next.
+A unique index on the occurrence makes sure that when several replicas poll
+the same collection only one job is recorded for it. Queued runs carry a
+``not_before`` time that spaces runs against the same domain at least
+``AUDIT_SCHEDULER_DOMAIN_INTERVAL`` seconds apart, and each instance starts
+at most ``AUDIT_SCHEDULER_WORKERS`` of them at a time; a night of re-audits
+is worked off gradually instead of all at once. Runs missed while no
+instance was up collapse into a single run.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from croniter import croniter
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import Config
+from app.core.database import get_database
+from app.seo_audit.jobs import AUDITS, COMPLETED, FAILED, GROUPS, QUEUED, RUNNING, audit_jobs, upsert_group
+from app.seo_audit.models import ScheduledAudit
+
+logger = logging.getLogger(__name__)
+
+SCHEDULES = 'seo_scheduled_audits'
+
+
+def _now() -> datetime:
+    # The audit models store naive UTC datetimes
+    return datetime.utcnow()
+
+
+def next_run(cron_expression: str, after: datetime) -> datetime:
+    """Next time after ``after`` matching the expression; ValueError if invalid."""
+    if not croniter.is_valid(cron_expression):
+        raise ValueError(f"Invalid cron expression: {cron_expression}")
+    return croniter(cron_expression, after).get_next(datetime)
+
+
+class AuditScheduler:
+    """Turns due schedules into queued audit jobs and starts them a few at a time."""
+
+    def __init__(
+        self,
+        interval: float = Config.AUDIT_SCHEDULER_INTERVAL,
+        workers: int = Config.AUDIT_SCHEDULER_WORKERS,
+        queue_size: int = Config.AUDIT_SCHEDULER_QUEUE_SIZE,
+        domain_interval: float = Config.AUDIT_SCHEDULER_DOMAIN_INTERVAL,
+    ):
+        self.interval = interval
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.domain_interval = timedelta(seconds=domain_interval)
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self.claimed = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.invalid = 0
+
+    def start(self):
+        """Start polling. Called on application startup."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        """
+        Stop polling and stop following the runs started here. Queued runs
+        stay in the database for the next instance; started ones are resumed
+        once their job lease expires.
+        """
+        tasks = [t for t in [self._task, *self._running.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    # --- schedules ------------------------------------------------------------
+
+    async def create(self, url: str, cron_expression: str, user_id: str) -> Dict[str, Any]:
+        """Schedule recurring audits of ``url``. Raises ValueError on a bad expression."""
+        database = get_database()
+        first_run = next_run(cron_expression, _now())
+        group = await upsert_group(database, url)
+        schedule = ScheduledAudit(
+            user_id=str(user_id), group_id=group['_id'], cron_expression=cron_expression, next_run_at=first_run
+        )
+        doc = schedule.model_dump(by_alias=True)
+        await database[SCHEDULES].insert_one(doc)
+        return doc
+
+    async def deactivate(self, schedule_id: str) -> bool:
+        result = await get_database()[SCHEDULES].update_one(
+            {'_id': schedule_id, 'active': True}, {'$set': {'active': False}}
+        )
+        return bool(result.modified_count)
+
+    # --- claiming -------------------------------------------------------------
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.poll()
+                await self.dispatch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Could not poll scheduled audits: {e}")
+            # A finished run frees a worker, so look again right away
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def poll(self) -> int:
+        """Record as many due schedules as queued jobs as the backlog has room for."""
+        database = get_database()
+        backlog = await database[AUDITS].count_documents({'progress': QUEUED, 'not_before': {'$ne': None}})
+        free = self.queue_size - backlog
+        if free <= 0:
+            return 0
+        collection = database[SCHEDULES]
+        now = _now()
+        due = await collection.find(
+            {'active': True, 'next_run_at': {'$lte': now}}
+        ).sort('next_run_at', 1).limit(free).to_list(length=free)
+        # Schedules written without a next run start at their next occurrence
+        due += await collection.find(
+            {'active': True, 'next_run_at': None}
+        ).limit(free).to_list(length=free)
+
+        claimed = 0
+        for schedule in due:
+            observed = schedule.get('next_run_at')
+            try:
+                following = next_run(schedule['cron_expression'], now)
+                # Recorded before the schedule moves on, so a crash in between
+                # is retried by the next poll instead of losing the run
+                audit = await self._enqueue(database, schedule, observed) if observed is not None else None
+            except (ValueError, KeyError) as e:
+                self.invalid += 1
+                logger.error(f"Disabling scheduled audit {schedule['_id']}: {e}")
+                await collection.update_one({'_id': schedule['_id']}, {'$set': {'active': False}})
+                continue
+            update = {'next_run_at': following}
+            if observed is not None:
+                update['last_run_at'] = now
+            if audit is not None:
+                update['last_audit_id'] = audit['_id']
+                self.claimed += 1
+                claimed += 1
+            await collection.update_one(
+                {'_id': schedule['_id'], 'active': True, 'next_run_at': observed}, {'$set': update}
+            )
+        return claimed
+
+    async def _enqueue(self, database, schedule: Dict[str, Any], scheduled_for: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Record one occurrence of ``schedule`` as a queued job, spaced after
+        the runs already planned for its domain. None if another instance
+        recorded it first.
+        """
+        group = await database[GROUPS].find_one({'_id': schedule['group_id']})
+        if group is None:
+            raise ValueError(f"Audit group {schedule['group_id']} not found")
+        url = group['url']
+        domain = urlparse(url).netloc.lower() or url
+        not_before = _now()
+        latest = await database[AUDITS].find_one(
+            {'domain': domain, 'not_before': {'$ne': None}}, {'not_before': 1}, sort=[('not_before', -1)]
+        )
+        if latest is not None:
+            not_before = max(not_before, latest['not_before'] + self.domain_interval)
+        try:
+            audit = await audit_jobs.enqueue(
+                url, schedule['user_id'],
+                schedule_id=schedule['_id'], scheduled_for=scheduled_for, domain=domain, not_before=not_before,
+            )
+        except DuplicateKeyError:
+            return None
+        logger.info(f"Scheduled audit {schedule['_id']} queued job {audit['_id']} for {url} at {not_before}")
+        return audit
+
+    # --- running --------------------------------------------------------------
+
+    async def dispatch(self) -> int:
+        """Start queued runs whose time has come, as many as there are free workers."""
+        free = self.workers - len(self._running)
+        if free <= 0:
+            return 0
+        collection = get_database()[AUDITS]
+        now = _now()
+        queued = await collection.find(
+            {'progress': QUEUED, 'not_before': {'$lte': now}}, {'domain': 1}
+        ).sort('not_before', 1).to_list(length=self.queue_size)
+
+        started = 0
+        for doc in queued:
+            if started >= free:
+                break
+            # Runs that became due together, or waited for a worker, must
+            # still keep their distance from the domain's last start
+            last = await collection.find_one(
+                {'domain': doc['domain'], 'progress': {'$in': [RUNNING, COMPLETED, FAILED]}},
+                {'not_before': 1}, sort=[('not_before', -1)],
+            )
+            if last is not None and last['not_before'] + self.domain_interval > now:
+                await collection.update_one(
+                    {'_id': doc['_id'], 'progress': QUEUED},
+                    {'$set': {'not_before': last['not_before'] + self.domain_interval}},
+                )
+                continue
+            # not_before of a started run records when it actually started
+            await collection.update_one({'_id': doc['_id'], 'progress': QUEUED}, {'$set': {'not_before': now}})
+            if not await audit_jobs.launch(doc['_id']):
+                continue
+            self.started += 1
+            started += 1
+            task = asyncio.create_task(self._follow(doc['_id']))
+            self._running[doc['_id']] = task
+            task.add_done_callback(lambda _, audit_id=doc['_id']: self._running.pop(audit_id, None))
+        return started
+
+    async def _follow(self, audit_id: str):
+        try:
+            await audit_jobs.wait(audit_id)
+            audit = await audit_jobs.get(audit_id)
+            if audit is not None and audit['progress'] == COMPLETED:
+                self.completed += 1
+            else:
+                self.failed += 1
+                logger.error(f"Scheduled audit job {audit_id} did not complete")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not follow scheduled audit job {audit_id}: {e}")
+        finally:
+            self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': len(self._running),
+            'queue_size': self.queue_size,
+            'workers': self.workers,
+            'claimed': self.claimed,
+            'started': self.started,
+            'completed': self.completed,
+            'failed': self.failed,
+            'invalid': self.invalid,
+        }
+
+
+audit_scheduler = AuditScheduler()
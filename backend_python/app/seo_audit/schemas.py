@@ -21,4 +21,8 @@ class AuditDetail(AuditBase):
     recommendations: List[Any]
 
 class AuditCreate(BaseModel):
-    url: str 
\ No newline at end of file
+    url: str 
+
+class ScheduleCreate(BaseModel):
+    url: str
+    cron_expression: str
@@ -6,6 +6,8 @@ import logging
 import asyncio
 from dotenv import load_dotenv
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+from app.core.content_cache import PAGE_TEXT, content_cache, make_entry
+from app.services.search_client import SearchAPIError, result_links, search_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,57 +24,19 @@ api_key = CUSTOM_GOOGLE_SEARCH
 cx = CX_ID
 
 def company_google_search_links(query: str, api_key: str, cx: str, num: int = 5) -> List[str]:
-    links = []
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,
-        "cx": cx,
-        "num": num
-    }
-
     try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-
-        for item in data.get("items", []):
-            link = item.get("link")
-            if link and not link.lower().endswith(".pdf"):  # Exclude PDF links
-                links.append(link)
-
-    except requests.exceptions.RequestException as e:
+        return result_links(search_client.search(query, api_key, cx, num=num))
+    except SearchAPIError as e:
         print(f"An error occurred during the search: {e}")
-
-    return links
+        return []
 
 
 def article_google_search_links2(query: str, api_key: str, cx: str, num: int = 5) -> List[str]:
-    links = []
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,
-        "cx": cx,
-        "num": num
-    }
-
     try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-
-        for item in data.get("items", []):
-            link = item.get("link")
-            if link and not link.lower().endswith(".pdf"):  # Exclude PDF links
-                links.append(link)
-
-    except requests.exceptions.RequestException as e:
+        return result_links(search_client.search(query, api_key, cx, num=num))
+    except SearchAPIError as e:
         print(f"An error occurred during the search: {e}")
-
-    return links
+        return []
 
 def extract_content(query, num=6):
 
@@ -130,52 +94,39 @@ def count_words(text):
     return len(text.split())
 
 def extract_content2(query, num=5):
-    # Get Google search links separately for OpenAI and Gemini
-    openai_links = article_google_search_links2(query, api_key, cx, num=num)
-    gemini_links = article_google_search_links2(query, api_key, cx, num=num)
+    # One search and one scrape serve both the OpenAI and Gemini prompts
+    links = article_google_search_links2(query, api_key, cx, num=num)
 
-    # Extract content for OpenAI
-    openai_related_pages = []
-    openai_word_counts = []
-
-    for link in openai_links:
-        content = scrape_page_content2(link)
-        if content:
-            word_count = count_words(content)
-            openai_word_counts.append(word_count)
-            openai_related_pages.append((link, content, word_count))
-
-    # Extract content for Gemini
-    gemini_related_pages = []
-    gemini_word_counts = []
+    related_pages = []
+    word_counts = []
 
-    for link in gemini_links:
+    for link in links:
         content = scrape_page_content2(link)
         if content:
             word_count = count_words(content)
-            gemini_word_counts.append(word_count)
-            gemini_related_pages.append((link, content, word_count))
+            word_counts.append(word_count)
+            related_pages.append((link, content, word_count))
 
-    # Calculate average word counts separately
-    openai_avg_word_count = calculate_average_word_count(openai_word_counts)
-    gemini_avg_word_count = calculate_average_word_count(gemini_word_counts)
+    avg_word_count = calculate_average_word_count(word_counts)
 
     # Format results
     openai_result_text = "Reference Articles (OpenAI):\n"
-    for idx, (url, content, word_count) in enumerate(openai_related_pages, 1):
-        openai_result_text += f"{idx}. {url}\n"
-        openai_result_text += f"Article Content: {content[:20000]}...\n\n"
-
     gemini_result_text = "Reference Articles (Gemini):\n"
-    for idx, (url, content, word_count) in enumerate(gemini_related_pages, 1):
-        gemini_result_text += f"{idx}. {url}\n"
-        gemini_result_text += f"Article Content: {content[:20000]}...\n\n"
+    for idx, (url, content, word_count) in enumerate(related_pages, 1):
+        article = f"{idx}. {url}\nArticle Content: {content[:20000]}...\n\n"
+        openai_result_text += article
+        gemini_result_text += article
 
-    return (openai_result_text, openai_avg_word_count), (gemini_result_text, gemini_avg_word_count)
+    return (openai_result_text, avg_word_count), (gemini_result_text, avg_word_count)
 
 
 def scrape_page_content(url):
 
+    # Served from the content cache while fresh, revalidated once stale
+    cached = content_cache.get(PAGE_TEXT, url)
+    if content_cache.is_fresh(cached):
+        return cached['text']
+
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36",
@@ -184,11 +135,16 @@ def scrape_page_content(url):
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1",
         }
+        headers.update(content_cache.conditional_headers(cached))
         response = requests.get(url, headers=headers, timeout=20, verify=False)
+        if response.status_code == 304 and cached:
+            content_cache.touch(cached)
+            return cached['text']
         response.raise_for_status()  # Raise an error for HTTP issues
         soup = BeautifulSoup(response.text, "html.parser")
         # Extract all visible text from the page
         text = soup.get_text(separator=" ", strip=True)
+        content_cache.put(make_entry(PAGE_TEXT, url, text=text, headers=response.headers))
         return text
     except Exception as e:
         print(f"Failed to scrape {url}: {e}")
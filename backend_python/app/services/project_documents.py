@@ -0,0 +1,169 @@
+"""
+Lookups of the project, prompt and guideline documents behind ``/get-titles``
+and ``/get-articles``.
+
+Projects and title prompts change rarely, so they are served from TTL
+caches and read through to MongoDB on a miss. All prompts a request needs
+are resolved with one ``$in`` + ``$lookup`` aggregation, and the article ->
+project -> guideline chain of ``/get-articles`` is fetched in a single
+round trip. The Node backend can drop stale entries via ``/cache/invalidate``.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from bson import ObjectId
+
+from app.core.cache import StatsTTLCache
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cached "not found" results, so missing documents are not looked up again
+_NOT_FOUND = object()
+_MISSING = object()
+
+project_cache = StatsTTLCache(maxsize=Config.PROJECT_CACHE_MAXSIZE, ttl=Config.PROJECT_CACHE_TTL)
+title_prompt_cache = StatsTTLCache(maxsize=Config.PROMPT_CACHE_MAXSIZE, ttl=Config.PROMPT_CACHE_TTL)
+
+
+def _as_object_id(value: Any) -> Optional[ObjectId]:
+    try:
+        return ObjectId(str(value))
+    except Exception:
+        return None
+
+
+async def get_project(database, project_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Project document by id, read through the project cache."""
+    key = str(project_id)
+    project = project_cache.get(key, _MISSING)
+    if project is _MISSING:
+        project = await database.solution_seo_projects.find_one({"_id": project_id})
+        project_cache.set(key, project if project is not None else _NOT_FOUND)
+    return None if project is _NOT_FOUND else project
+
+
+async def get_title_prompts(database, prompt_type_ids: Iterable[ObjectId]) -> Dict[str, Optional[str]]:
+    """
+    Title prompt description for each prompt type id (None when the prompt
+    type or its title prompt is missing). Cache misses are resolved together
+    in one aggregation over ``solution_seo_prompt_types``.
+    """
+    prompts: Dict[str, Optional[str]] = {}
+    misses = []
+    for prompt_type_id in set(prompt_type_ids):
+        description = title_prompt_cache.get(str(prompt_type_id), _MISSING)
+        if description is _MISSING:
+            misses.append(prompt_type_id)
+        else:
+            prompts[str(prompt_type_id)] = None if description is _NOT_FOUND else description
+
+    if misses:
+        pipeline = [
+            {"$match": {"_id": {"$in": misses}}},
+            {
+                "$lookup": {
+                    "from": "solution_seo_system_prompts",
+                    "localField": "titlePrompt",
+                    "foreignField": "_id",
+                    "as": "title_prompt",
+                }
+            },
+            {"$project": {"description": {"$arrayElemAt": ["$title_prompt.description", 0]}}},
+        ]
+        found = {
+            str(doc["_id"]): doc.get("description") or None
+            async for doc in database.solution_seo_prompt_types.aggregate(pipeline)
+        }
+        for prompt_type_id in misses:
+            key = str(prompt_type_id)
+            description = found.get(key)
+            title_prompt_cache.set(key, description if description is not None else _NOT_FOUND)
+            prompts[key] = description
+    return prompts
+
+
+async def get_article_context(
+    database, article_id: ObjectId
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    ``(article, project, guideline)`` for an article in one aggregation. The
+    project found this way refreshes the project cache. References stored as
+    strings can't be joined by ``$lookup`` and are resolved separately.
+    """
+    pipeline = [
+        {"$match": {"_id": article_id}},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": "solution_seo_projects",
+                "localField": "project",
+                "foreignField": "_id",
+                "as": "_project",
+            }
+        },
+        {"$addFields": {"_project": {"$arrayElemAt": ["$_project", 0]}}},
+        {
+            "$lookup": {
+                "from": "solution_seo_guidelines",
+                "localField": "_project.guideline_id",
+                "foreignField": "_id",
+                "as": "_guideline",
+            }
+        },
+        {"$addFields": {"_guideline": {"$arrayElemAt": ["$_guideline", 0]}}},
+    ]
+    docs = await database.solution_seo_articles.aggregate(pipeline).to_list(length=1)
+    if not docs:
+        return None, None, None
+
+    article = docs[0]
+    project = article.pop("_project", None)
+    guideline = article.pop("_guideline", None)
+
+    if project is not None:
+        project_cache.set(str(project["_id"]), project)
+    elif article.get("project"):
+        project_id = _as_object_id(article["project"])
+        if project_id is None:
+            logger.error(f"Invalid ObjectId format for project: {article['project']}")
+        else:
+            project = await get_project(database, project_id)
+
+    if guideline is None and project and project.get("guideline_id"):
+        guideline_id = _as_object_id(project["guideline_id"])
+        if guideline_id is None:
+            logger.error(f"Invalid ObjectId format for guideline_id: {project['guideline_id']}")
+        else:
+            guideline = await database.solution_seo_guidelines.find_one({"_id": guideline_id})
+
+    return article, project, guideline
+
+
+def invalidate(kind: str, document_id: Optional[str] = None) -> None:
+    """
+    Drop cached documents after they changed. ``kind`` is ``project``,
+    ``prompt_type``, ``system_prompt`` or ``all``; without an id the whole
+    cache of that kind is cleared. A system prompt can back several prompt
+    types, so it clears every cached title prompt.
+    """
+    if kind == "project" and document_id:
+        project_cache.invalidate(document_id)
+    elif kind == "project":
+        project_cache.clear()
+    elif kind == "prompt_type" and document_id:
+        title_prompt_cache.invalidate(document_id)
+    elif kind in ("prompt_type", "system_prompt"):
+        title_prompt_cache.clear()
+    elif kind == "all":
+        project_cache.clear()
+        title_prompt_cache.clear()
+    else:
+        raise ValueError(f"Unknown cache kind: {kind}")
+
+
+def get_document_cache_stats() -> Dict[str, Any]:
+    return {
+        'projects': project_cache.stats(),
+        'title_prompts': title_prompt_cache.stats(),
+    }
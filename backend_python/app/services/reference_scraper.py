@@ -0,0 +1,267 @@
+"""
+Tiered scraper for reference articles.
+
+Most reference articles are server-rendered, so each URL is first fetched on
+the shared HTTP client and its main content extracted with lxml. Only pages
+whose extracted text is too short, or that ask for JavaScript, are rendered
+in a pooled headless browser. Extracted text is kept in the shared content
+cache and revalidated with conditional GETs.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+from lxml import etree, html as lxml_html
+
+from app.core.browser_pool import browser_pool
+from app.core.config import Config
+from app.core.content_cache import REFERENCE_TEXT, content_cache, make_entry
+from app.core.http_client import fetch
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36"
+
+HTTP_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Same noise and main-content selectors as the in-browser extraction below
+_NOISE_TAGS = ('header', 'footer', 'nav', 'script', 'style', 'iframe', 'noscript', 'template')
+_NOISE_CLASSES = ('ad', 'advertisement', 'banner', 'popup', 'modal', 'cookie-banner', 'newsletter', 'social-share')
+_MAIN_CLASSES = ('content', 'post', 'article')
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_NOISE_XPATH = etree.XPath(
+    ' | '.join([f'//{tag}' for tag in _NOISE_TAGS] + [f'//*[{_has_class(c)}]' for c in _NOISE_CLASSES])
+)
+# XPath unions come back in document order, matching querySelector()
+_MAIN_XPATH = etree.XPath(
+    ' | '.join(['//main', '//article'] + [f'//*[{_has_class(c)}]' for c in _MAIN_CLASSES])
+)
+_BLOCK_TAGS = {
+    'p', 'div', 'section', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'br', 'tr', 'td', 'th', 'table', 'blockquote', 'pre', 'article', 'main', 'dd', 'dt',
+}
+
+JS_REQUIRED_MARKERS = (
+    'enable javascript',
+    'javascript is disabled',
+    'javascript is required',
+    'requires javascript',
+    'turn on javascript',
+)
+
+BROWSER_EXTRACT_JS = """() => {
+    // Remove unwanted elements
+    const elementsToRemove = document.querySelectorAll(
+        'header, footer, nav, script, style, iframe, .ad, .advertisement, ' +
+        '.banner, .popup, .modal, .cookie-banner, .newsletter, .social-share'
+    );
+    elementsToRemove.forEach(el => el.remove());
+
+    // Get main content
+    const mainContent = document.querySelector('main, article, .content, .post, .article') || document.body;
+    return mainContent.innerText;
+}"""
+
+
+class _TierStats:
+    """
+    Counts which tier (cache, http or browser) produced each reference.
+    ``http_fallback`` means the browser was needed but failed, and the short
+    HTTP extraction was returned instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.http_hits = 0
+        self.browser_hits = 0
+        self.http_fallbacks = 0
+        self.failures = 0
+        self.escalations: Dict[str, int] = {}
+
+    def record(self, tier: Optional[str], escalation: Optional[str] = None):
+        with self._lock:
+            self.requests += 1
+            if tier == 'cache':
+                self.cache_hits += 1
+            elif tier == 'http':
+                self.http_hits += 1
+            elif tier == 'browser':
+                self.browser_hits += 1
+            elif tier == 'http_fallback':
+                self.http_fallbacks += 1
+            else:
+                self.failures += 1
+            if escalation:
+                self.escalations[escalation] = self.escalations.get(escalation, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.requests
+            return {
+                'requests': total,
+                'cache_hits': self.cache_hits,
+                'http_hits': self.http_hits,
+                'browser_hits': self.browser_hits,
+                'http_fallbacks': self.http_fallbacks,
+                'failures': self.failures,
+                'cache_hit_rate': round(self.cache_hits / total, 4) if total else 0.0,
+                'http_hit_rate': round(self.http_hits / total, 4) if total else 0.0,
+                'browser_hit_rate': round(self.browser_hits / total, 4) if total else 0.0,
+                'escalations': dict(self.escalations),
+                'min_words': Config.SCRAPER_MIN_WORDS,
+            }
+
+
+TIER_STATS = _TierStats()
+
+
+def get_scraper_stats() -> Dict[str, Any]:
+    return TIER_STATS.snapshot()
+
+
+def extract_main_text(html_content: str) -> str:
+    """Return the whitespace-normalised main-content text of an HTML page."""
+    try:
+        root = lxml_html.document_fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return ""
+    for el in _NOISE_XPATH(root):
+        if el.getparent() is not None:
+            el.drop_tree()
+    matches = _MAIN_XPATH(root)
+    main = matches[0] if matches else root.find('body')
+    if main is None:
+        main = root
+    # Separate block elements the way innerText would
+    for el in main.iter():
+        if isinstance(el.tag, str) and el.tag in _BLOCK_TAGS:
+            el.tail = "\n" + (el.tail or "")
+    return " ".join(" ".join(main.itertext()).split())
+
+
+def needs_browser(html_content: str, text: str) -> Optional[str]:
+    """Return why a page must be rendered in the browser, or None."""
+    if len(text.split()) < Config.SCRAPER_MIN_WORDS:
+        lowered = html_content.lower()
+        if any(marker in lowered for marker in JS_REQUIRED_MARKERS):
+            return 'javascript_required'
+        return 'too_short'
+    return None
+
+
+async def fetch_html(url: str, extra_headers: Optional[Dict[str, str]] = None) -> Tuple[int, Optional[str], Mapping[str, str]]:
+    """
+    Plain HTTP fetch on the shared client. Returns ``(status, html, headers)``
+    where ``html`` is None unless the response is a 200 HTML page.
+    """
+    headers = {**HTTP_HEADERS, **(extra_headers or {})}
+    response = await fetch(
+        'GET', url, verify=False, headers=headers,
+        timeout=Config.SCRAPER_HTTP_TIMEOUT, follow_redirects=True,
+    )
+    if response.status_code != 200:
+        return response.status_code, None, response.headers
+    if 'html' not in response.headers.get('Content-Type', 'text/html').lower():
+        return response.status_code, None, response.headers
+    return response.status_code, response.text, response.headers
+
+
+async def browser_extract(url: str) -> str:
+    """Render the page in a pooled browser context and extract its main text."""
+    async with browser_pool.new_context(
+        user_agent=USER_AGENT,
+        viewport={"width": 1920, "height": 1080},
+    ) as context:
+        # Enable request interception to block unnecessary resources
+        await context.route(
+            "**/*.{png,jpg,jpeg,gif,svg,css,font,woff,woff2,eot,ttf,otf}",
+            lambda route: route.abort(),
+        )
+        page = await context.new_page()
+        # Set longer timeout for initial page load
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        # Wait for main content to be available
+        await page.wait_for_selector("body", timeout=10000)
+        content = await page.evaluate(BROWSER_EXTRACT_JS)
+    return " ".join((content or "").split())
+
+
+async def _http_tier(url: str, cached: Optional[Dict[str, Any]]):
+    """
+    Return ``(status, text, escalation, headers)``. ``escalation`` names why
+    the browser is needed, in which case ``text`` is whatever the HTTP tier
+    could extract. A 304 means ``cached`` is still current.
+    """
+    try:
+        status, html_content, headers = await fetch_html(url, content_cache.conditional_headers(cached))
+    except httpx.HTTPError as e:
+        logger.info(f"HTTP fetch failed for {url}, using browser: {type(e).__name__}")
+        return None, "", 'http_error', {}
+    if status == 304 and cached:
+        return status, cached['text'], None, headers
+    if html_content is None:
+        return status, "", 'http_status', headers
+    text = await asyncio.to_thread(extract_main_text, html_content)
+    return status, text, needs_browser(html_content, text), headers
+
+
+async def scrape_reference(url: str, max_attempts: int = 3) -> Optional[str]:
+    """
+    Scrape a reference article. Fresh cached text is returned as is and stale
+    text is revalidated with a conditional GET; otherwise the HTTP tier is
+    tried first, falling back to the browser (with retries). Returns the
+    cleaned text followed by a source footer, or None if nothing could be
+    extracted.
+    """
+    cached = await content_cache.aget(REFERENCE_TEXT, url)
+    if content_cache.is_fresh(cached):
+        TIER_STATS.record('cache')
+        return f"{cached['text']}\n\nSource: {url}\n"
+
+    status, text, escalation, headers = await _http_tier(url, cached)
+    if status == 304 and cached:
+        await content_cache.atouch(cached)
+        TIER_STATS.record('cache')
+        return f"{text}\n\nSource: {url}\n"
+    tier = 'http' if text else None
+
+    if escalation:
+        for attempt in range(max_attempts):
+            try:
+                content = await browser_extract(url)
+                if not content:
+                    raise Exception("No content extracted")
+                text, tier = content, 'browser'
+                break
+            except Exception as e:
+                logger.warning(
+                    f"[Attempt {attempt+1}] Failed scraping {url}: {type(e).__name__}: {str(e)[:100]}..."
+                )
+                await asyncio.sleep(2**attempt)
+        if tier == 'http':
+            # The browser failed too. A short HTTP extraction still beats
+            # nothing, but it is not cached so the browser is tried again
+            tier = 'http_fallback'
+
+    TIER_STATS.record(tier, escalation)
+    if not text:
+        return None
+    if tier == 'http_fallback':
+        return f"{text}\n\nSource: {url}\n"
+    # Validators come from the HTTP response even when the browser rendered
+    # the text, so an unchanged page revalidates with a 304 next time
+    await content_cache.aput(make_entry(REFERENCE_TEXT, url, text=text, headers=headers))
+    return f"{text}\n\nSource: {url}\n"
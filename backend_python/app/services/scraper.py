@@ -2,19 +2,18 @@ from bs4 import BeautifulSoup
 import requests
 from fastapi import APIRouter, Depends
 import os
-from langchain_openai import ChatOpenAI
 from app.models.schemas import URLInput
 import logging
 import asyncio
 from urllib.parse import urljoin
-from typing import List, Set, Dict
-import aiohttp
+from typing import List, Optional, Set, Dict
+import httpx
 from fastapi import HTTPException
 from app.models.schemas import MetaAnalysisResult, CompanyDetails
-import xml.etree.ElementTree as ET
-import brotli
-import gzip 
-import google.generativeai as genai
+from app.core.config import Config
+from app.core.llm_gateway import llm_gateway
+from app.core.http_client import fetch
+from app.services.search_client import SearchAPIError, result_links, search_client
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 from typing import List
 
@@ -24,9 +23,6 @@ CX_ID = os.getenv("CX_ID")
 
 api_key = CUSTOM_GOOGLE_SEARCH
 cx = CX_ID
-# client = genai.Client(api_key=CUSTOM_GOOGLE_SEARCH)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash")
-model_name="gemini-1.5-flash"
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -80,17 +76,11 @@ def scrape_page_content2(url):
         print(f"Failed to scrape {url}: {e}")
         return None
 
-def target_audience_generator1(title, company_details):
-  llm = ChatOpenAI(
-        model="gpt-4.1",
-      temperature=0.8,
-      api_key=OPENAI_API_KEY
-  )
-
+async def target_audience_generator1(title, company_details):
   messages = [
-      (
-          "system",
-           """
+      {
+          "role": "system",
+          "content": """
            You’re an expert SEO strategist with over 10 years of experience in identifying target audiences based on business models and content topics. You have a proven track record of analyzing companies to align their offerings with relevant content that attracts the right readership.
 
 Your task is to provide a singular target audience for a specified article or blog, based on the given company’s business overview and the article title.
@@ -103,33 +93,21 @@ Here are the details you need to consider:
 Focus on identifying one specific target audience segment that would find the article most relevant and engaging, and ensure your analysis reflects the nuances of the company's offerings and the content theme.
 Note: only give target audience, do not include any extra text or words explaining it.
            """
-      ),
-      (
-          "human",
-          f"""these are details:\n
+      },
+      {
+          "role": "user",
+          "content": f"""these are details:\n
           - Article Title:{', '.join(title)}\n
           - company's business overview :\n
             {company_details}
            """""
-      )
+      }
 ]
 
 
-  response = llm.invoke(messages)
-  return response.content
-
-def target_audience_generator(title, company_details):
-    """Generate a target audience using both OpenAI (gpt-4.1) and Google Gemini."""
+  return await llm_gateway.openai_chat(messages, model="gpt-4.1", temperature=0.8)
 
-    try:
-        llm = ChatOpenAI(
-            model="gpt-4.1",
-            temperature=0.8,
-            api_key=OPENAI_API_KEY
-        )
-        
-        openai_messages = [
-            ("system", """
+TARGET_AUDIENCE_PROMPT = """
             You’re an expert SEO strategist with over 10 years of experience in identifying target audiences based on business models and content topics. 
             You have a proven track record of analyzing companies to align their offerings with relevant content that attracts the right readership.
 
@@ -142,39 +120,60 @@ def target_audience_generator(title, company_details):
             
             Focus on identifying **one specific target audience segment** that would find the article most relevant and engaging.
             **Note:** Only return the target audience phrase, no extra text.
-            """),
-            ("human", f"Article Title: {title}\nCompany Overview:\n{company_details}")
-        ]
+            """
 
-        openai_response = llm.invoke(openai_messages)
-        openai_audience = openai_response.content.strip()
-    except Exception as e:
-        openai_audience = f"Error with OpenAI: {e}"
 
+async def _audience_answer(provider, call, timeout):
+    """Await one provider's answer, turning failures into an error marker."""
     try:
-        gemini_messages = [
-            """
-            You’re an expert SEO strategist with over 10 years of experience in identifying target audiences based on business models and content topics. 
-            You have a proven track record of analyzing companies to align their offerings with relevant content that attracts the right readership.
+        return (await asyncio.wait_for(call, timeout)).strip()
+    except asyncio.TimeoutError:
+        return f"Error with {provider}: timed out after {timeout:g}s"
+    except Exception as e:
+        return f"Error with {provider}: {e}"
 
-            Your task is to provide a singular target audience for a specified article or blog, based on the given company’s business overview and the article title.
 
-            **Guidelines:**
-            - Use the company's business overview
-            - Use the article title
-            - Target audience: **Do not use more than 5 or 6 words**.
-            
-            Focus on identifying **one specific target audience segment** that would find the article most relevant and engaging.
-            **Note:** Only return the target audience phrase, no extra text.
-            """,
-            f"Article Title: {title}\nCompany Overview:\n{company_details}"
-        ]
+async def target_audience_generator(
+    title, company_details, budget: Optional[float] = None, force_refresh: bool = False
+):
+    """
+    Generate a target audience using both OpenAI (gpt-4.1) and Google Gemini.
 
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        gemini_response = model.generate_content(gemini_messages)
-        gemini_audience = gemini_response.text.strip()
-    except Exception as e:
-        gemini_audience = f"Error with Gemini: {e}"
+    Both providers are queried concurrently, each under its own timeout and
+    never longer than ``budget`` seconds, so a slow provider only costs its
+    own answer: it comes back as an "Error with ..." marker next to the
+    other provider's result. Answers come from the LLM response cache
+    unless ``force_refresh`` is set.
+    """
+    budget = budget or Config.TARGET_AUDIENCE_BUDGET
+    details = f"Article Title: {title}\nCompany Overview:\n{company_details}"
+
+    openai_messages = [
+        {"role": "system", "content": TARGET_AUDIENCE_PROMPT},
+        {"role": "user", "content": details},
+    ]
+    gemini_messages = [
+        {"role": "user", "content": TARGET_AUDIENCE_PROMPT},
+        {"role": "user", "content": details},
+    ]
+
+    openai_audience, gemini_audience = await asyncio.gather(
+        _audience_answer(
+            "OpenAI",
+            llm_gateway.openai_chat(
+                openai_messages, model="gpt-4.1", temperature=0.8,
+                cache=True, force_refresh=force_refresh,
+            ),
+            min(Config.TARGET_AUDIENCE_TIMEOUT_OPENAI, budget),
+        ),
+        _audience_answer(
+            "Gemini",
+            llm_gateway.gemini_generate(
+                gemini_messages, model="gemini-2.0-flash", cache=True, force_refresh=force_refresh
+            ),
+            min(Config.TARGET_AUDIENCE_TIMEOUT_GEMINI, budget),
+        ),
+    )
 
     return {
         "openai_target_audience": openai_audience,
@@ -195,18 +194,11 @@ def target_audience_generator(title, company_details):
 
 async def generates_previews(title,keywords, target_audience, secondary_keywords, company_detail,article):
     try:
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",  # Using a valid OpenAI model
-            temperature=0.8,
-            api_key=OPENAI_API_KEY
-        )
-        
         # Use default prompt since article types are no longer supported
         full_prompt = f"Generate an outline for an article with title: {title}, keywords: {keywords}, target audience: {target_audience}, secondary keywords: {secondary_keywords}, company details: {company_detail}"
 
-        messages = [("human", full_prompt)]
-        response = llm.invoke(messages)
-        return response.content
+        messages = [{"role": "user", "content": full_prompt}]
+        return await llm_gateway.openai_chat(messages, model="gpt-4o-mini", temperature=0.8)
     except Exception as e:
         logger.error(f"Error in generates_previews: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating preview: {str(e)}")
@@ -231,54 +223,46 @@ async def extract_main_content(html_content: str) -> str:
 
 async def analyze_single_url(url: str, keywords: str = None) -> MetaAnalysisResult:
     try:
-        import ssl
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+        try:
+            response = await fetch('GET', url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+        except httpx.TimeoutException:
+            return MetaAnalysisResult(
+                url=url,
+                status="error",
+                error="Request timed out"
+            )
+        if response.status_code != 200:
+            return MetaAnalysisResult(
+                url=url,
+                status="error",
+                error=f"HTTP {response.status_code}"
+            )
         
-        timeout = aiohttp.ClientTimeout(total=30)
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        async with aiohttp.ClientSession(timeout=timeout, headers=BROWSER_HEADERS, connector=connector) as session:
-            try:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return MetaAnalysisResult(
-                            url=url,
-                            status="error",
-                            error=f"HTTP {response.status}"
-                        )
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Extract existing meta tags
-                    meta_title = soup.title.string if soup.title else None
-                    meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-                    meta_description = meta_desc_tag.get('content') if meta_desc_tag else None
-                    
-                    # Generate new meta tags
-                    page_content = await extract_main_content(html)
-                    #generated_title, generated_description = await generate_meta_tags(
-                      #  url, 
-                     #   page_content,
-                     #   keywords
-                  #  )
-                    
-                    return MetaAnalysisResult(
-                        url=url,
-                        status="success",
-                        meta_title=meta_title,
-                        meta_description=meta_description,
-                        #generated_title=generated_title,
-                        #generated_description=generated_description,
-                        keywords=keywords
-                    )
-            except asyncio.TimeoutError:
-                return MetaAnalysisResult(
-                    url=url,
-                    status="error",
-                    error="Request timed out"
-                )
+        html = response.text
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # Extract existing meta tags
+        meta_title = soup.title.string if soup.title else None
+        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+        meta_description = meta_desc_tag.get('content') if meta_desc_tag else None
+        
+        # Generate new meta tags
+        page_content = await extract_main_content(html)
+        #generated_title, generated_description = await generate_meta_tags(
+          #  url, 
+         #   page_content,
+         #   keywords
+      #  )
+        
+        return MetaAnalysisResult(
+            url=url,
+            status="success",
+            meta_title=meta_title,
+            meta_description=meta_description,
+            #generated_title=generated_title,
+            #generated_description=generated_description,
+            keywords=keywords
+        )
     except Exception as e:
         return MetaAnalysisResult(
             url=url,
@@ -315,21 +299,14 @@ class SitemapParser:
 
     async def discover_sitemaps_from_robots(self) -> Set[str]:
         try:
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            async with aiohttp.ClientSession(headers=BROWSER_HEADERS, connector=connector) as session:
-                robots_url = urljoin(self.base_url, 'robots.txt')
-                async with session.get(robots_url) as response:
-                    if response.status == 200:
-                        robots_content = await response.text()
-                        for line in robots_content.split('\n'):
-                            if 'sitemap:' in line.lower():
-                                sitemap_url = line.split(':', 1)[1].strip()
-                                self.robots_sitemaps.add(sitemap_url)
+            robots_url = urljoin(self.base_url, 'robots.txt')
+            response = await fetch('GET', robots_url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+            if response.status_code == 200:
+                robots_content = response.text
+                for line in robots_content.split('\n'):
+                    if 'sitemap:' in line.lower():
+                        sitemap_url = line.split(':', 1)[1].strip()
+                        self.robots_sitemaps.add(sitemap_url)
         except Exception as e:
             logger.error(f"Error fetching robots.txt: {str(e)}")
         return self.robots_sitemaps
@@ -340,59 +317,50 @@ class SitemapParser:
         name = filename.replace('-sitemap.xml', '').replace('sitemap-', '').replace('.xml', '')
         return name if name else 'main'
 
-    async def _process_sitemap(self, session: aiohttp.ClientSession, url: str, sitemap_type: str):
+    async def _process_sitemap(self, url: str, sitemap_type: str):
         try:
-            async with session.get(url, headers=BROWSER_HEADERS) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'xml')
-                    for url_tag in soup.find_all('url'):
-                        loc = url_tag.find('loc')
-                        if loc and loc.text:
-                            self.discovered_urls.add(loc.text)
-                            self.content_types[loc.text] = sitemap_type  # Store the content type
+            response = await fetch('GET', url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+            if response.status_code == 200:
+                soup = BeautifulSoup(response.text, 'xml')
+                for url_tag in soup.find_all('url'):
+                    loc = url_tag.find('loc')
+                    if loc and loc.text:
+                        self.discovered_urls.add(loc.text)
+                        self.content_types[loc.text] = sitemap_type  # Store the content type
         except Exception as e:
             logger.error(f"Error processing sitemap {url}: {str(e)}")
 
     async def get_all_urls(self) -> List[str]:
         try:
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
+            # First check robots.txt for sitemaps
+            await self.discover_sitemaps_from_robots()
             
-            async with aiohttp.ClientSession(headers=BROWSER_HEADERS, connector=connector) as session:
-                # First check robots.txt for sitemaps
-                await self.discover_sitemaps_from_robots()
-                
-                # If no sitemaps found in robots.txt, try default sitemap.xml
-                if not self.robots_sitemaps:
-                    self.robots_sitemaps.add(urljoin(self.base_url, 'sitemap.xml'))
-
-                # Process all found sitemaps
-                for sitemap_url in self.robots_sitemaps:
-                    try:
-                        async with session.get(sitemap_url, headers=BROWSER_HEADERS) as response:
-                            if response.status == 200:
-                                content = await response.text()
-                                soup = BeautifulSoup(content, 'xml')
-                                
-                                # Check for sitemap index
-                                sitemaps = soup.find_all('sitemap')
-                                if sitemaps:
-                                    for sitemap in sitemaps:
-                                        loc = sitemap.find('loc')
-                                        if loc:
-                                            sitemap_type = self._get_sitemap_type(loc.text)
-                                            await self._process_sitemap(session, loc.text, sitemap_type)
-                                else:
-                                    # Single sitemap
-                                    sitemap_type = self._get_sitemap_type(sitemap_url)
-                                    await self._process_sitemap(session, sitemap_url, sitemap_type)
-                    except Exception as e:
-                        logger.error(f"Error processing sitemap {sitemap_url}: {str(e)}")
-                        continue
+            # If no sitemaps found in robots.txt, try default sitemap.xml
+            if not self.robots_sitemaps:
+                self.robots_sitemaps.add(urljoin(self.base_url, 'sitemap.xml'))
+
+            # Process all found sitemaps
+            for sitemap_url in self.robots_sitemaps:
+                try:
+                    response = await fetch('GET', sitemap_url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+                    if response.status_code == 200:
+                        soup = BeautifulSoup(response.text, 'xml')
+                        
+                        # Check for sitemap index
+                        sitemaps = soup.find_all('sitemap')
+                        if sitemaps:
+                            for sitemap in sitemaps:
+                                loc = sitemap.find('loc')
+                                if loc:
+                                    sitemap_type = self._get_sitemap_type(loc.text)
+                                    await self._process_sitemap(loc.text, sitemap_type)
+                        else:
+                            # Single sitemap
+                            sitemap_type = self._get_sitemap_type(sitemap_url)
+                            await self._process_sitemap(sitemap_url, sitemap_type)
+                except Exception as e:
+                    logger.error(f"Error processing sitemap {sitemap_url}: {str(e)}")
+                    continue
 
             return list(self.discovered_urls)
         except Exception as e:
@@ -456,30 +424,11 @@ def scrape_page_content(url):
         return None
     
 def company_google_search_links(query, api_key, cx, num=5):
-    links = []
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,
-        "cx": cx,
-        "num": num
-    }
-
     try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-
-        for item in data.get("items", []):
-            link = item.get("link")
-            if link and not link.lower().endswith(".pdf"):  # Exclude PDF links
-                links.append(link)
-
-    except requests.exceptions.RequestException as e:
+        return result_links(search_client.search(query, api_key, cx, num=num))
+    except SearchAPIError as e:
         logger.error(f"An error occurred during the search: {e}")
-
-    return links
+        return []
 
 def extract_content(query, num=6):
     links = company_google_search_links(query, CUSTOM_GOOGLE_SEARCH, CX_ID, num=num)
@@ -503,18 +452,12 @@ def extract_content(query, num=6):
 
     return result_text
 
-def generate_target_audience(company_details: CompanyDetails):    # company_details = request_data.company_details
-
-    llm = ChatOpenAI(
-        model="gpt-4.1",
-        temperature=0,
-        api_key=OPENAI_API_KEY
-    )
+async def generate_target_audience(company_details: CompanyDetails, force_refresh: bool = False):    # company_details = request_data.company_details
 
     messages = [
-        (
-            "system",
-            """
+        {
+            "role": "system",
+            "content": """
             You are an expert market analyst specializing in audience segmentation. Your task is to analyze the given company description and identify the **primary target audience**.
 
             **Guidelines:**
@@ -530,84 +473,21 @@ def generate_target_audience(company_details: CompanyDetails):    # company_deta
             - Marketing Agencies
             - Nutrition Professionals
             """
-        ),
-        (
-            "human",
-            f"Based on the following company description, extract only the primary target audience as **headings only**:\n\n{company_details}"
-        )
+        },
+        {
+            "role": "user",
+            "content": f"Based on the following company description, extract only the primary target audience as **headings only**:\n\n{company_details}"
+        }
     ]
 
-    response = llm.invoke(messages)
-    return {"target_audience": response.content}
-
-def get_sitemap_urls(sitemap_url):
-    """Fetch and parse the sitemap XML, handling Brotli, Gzip, and plain text properly."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.90 Safari/537.36",
-        "Accept-Encoding": "gzip, deflate, br"
-    }
-
-    try:
-        response = requests.get(sitemap_url, headers=headers, timeout=20, verify=False)
-        response.raise_for_status()
-
-        content_encoding = response.headers.get("Content-Encoding", "").lower()
-        content_type = response.headers.get("Content-Type", "").lower()
-        raw_data = response.content
-
-        # Handle Brotli & Gzip decompression only if required
-        if "br" in content_encoding:
-            try:
-                raw_data = brotli.decompress(raw_data)
-            except brotli.error as e:
-                print(f"Brotli decompression error: {e}. Using raw content.")
-
-        elif "gzip" in content_encoding:
-            try:
-                raw_data = gzip.decompress(raw_data)
-            except gzip.BadGzipFile as e:
-                print(f"Gzip decompression error: {e}. Using raw content.")
-
-        # Ensure it's valid XML
-        if not raw_data.strip().startswith(b"<?xml"):
-            print(f"Invalid XML response from {sitemap_url}. Falling back to empty list.")
-            return []
-
-        # Parse the XML Sitemap
-        root = ET.fromstring(raw_data)
-        urls = [url.text for url in root.findall(".//{http://www.sitemaps.org/schemas/sitemap/0.9}loc")]
-        return urls
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching sitemap: {e}")
-        return []
-    except ET.ParseError as e:
-        print(f"XML Parsing Error: {e}. Falling back to empty list.")
-        return []
+    response = await llm_gateway.openai_chat(
+        messages, model="gpt-4.1", temperature=0, cache=True, force_refresh=force_refresh
+    )
+    return {"target_audience": response}
 
 def article_google_search_links2(query, api_key, cx, num=5):
-    links = []
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,
-        "cx": cx,
-        "num": num
-    }
-
     try:
-        response = requests.get(url, params=params, verify=False)
-        response.raise_for_status()
-        data = response.json()
-
-        for item in data.get("items", []):
-            link = item.get("link")
-            if link and not link.lower().endswith(".pdf"):  # Exclude PDF links
-                links.append(link)
-
-
-    except requests.exceptions.RequestException as e:
+        return result_links(search_client.search(query, api_key, cx, num=num))
+    except SearchAPIError as e:
         print(f"An error occurred during the search: {e}")
-
-    return links
+        return []
@@ -0,0 +1,194 @@
+"""
+Google Custom Search client shared by every search call site.
+
+Results are cached for ``GOOGLE_SEARCH_CACHE_TTL`` seconds keyed by
+``(query, cx, num, locale)``, and concurrent identical queries are coalesced
+into a single API call. Calls made against the daily quota are counted so
+the remaining budget can be watched on ``/metrics``.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from app.core.cache import StatsTTLCache
+from app.core.config import Config
+from app.core.http_client import fetch
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+SearchKey = Tuple[str, str, int, Optional[str]]
+
+
+class SearchAPIError(Exception):
+    """Raised when the Custom Search API call fails."""
+
+
+class GoogleSearchClient:
+    """Cached, coalescing Custom Search client with sync and async entry points."""
+
+    def __init__(
+        self,
+        ttl: int = Config.GOOGLE_SEARCH_CACHE_TTL,
+        maxsize: int = Config.GOOGLE_SEARCH_CACHE_MAXSIZE,
+        daily_quota: int = Config.GOOGLE_SEARCH_DAILY_QUOTA,
+    ):
+        self.cache = StatsTTLCache(maxsize=maxsize, ttl=ttl)
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self._inflight: Dict[SearchKey, Future] = {}
+        self._ainflight: Dict[SearchKey, asyncio.Future] = {}
+        self._quota_day = None
+        self.calls_today = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(query: str, cx: str, num: int, locale: Optional[str]) -> SearchKey:
+        return (query.strip(), cx, int(num), locale)
+
+    @staticmethod
+    def _params(key: SearchKey, api_key: str) -> Dict[str, Any]:
+        query, cx, num, locale = key
+        params = {"q": query, "key": api_key, "cx": cx, "num": num}
+        if locale:
+            params["hl"] = locale
+        return params
+
+    def _count_call(self):
+        with self._lock:
+            today = datetime.now(timezone.utc).date()
+            if today != self._quota_day:
+                self._quota_day = today
+                self.calls_today = 0
+            self.calls_today += 1
+            if self.calls_today == self.daily_quota:
+                logger.warning(f"Google Custom Search daily quota of {self.daily_quota} queries reached")
+
+    def _count_error(self):
+        with self._lock:
+            self.errors += 1
+
+    # --- sync -----------------------------------------------------------------
+
+    def search(self, query: str, api_key: str, cx: str, num: int = 5, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the result items for a query. Raises SearchAPIError on failure."""
+        key = self._key(query, cx, num, locale)
+        items = self.cache.get(key)
+        if items is not None:
+            return items
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            self._count_call()
+            try:
+                response = requests.get(SEARCH_URL, params=self._params(key, api_key), verify=False, timeout=15)
+                response.raise_for_status()
+                items = response.json().get("items", [])
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._count_error()
+                raise SearchAPIError(str(e)) from e
+            self.cache.set(key, items)
+            future.set_result(items)
+            return items
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # --- async ----------------------------------------------------------------
+
+    async def asearch(self, query: str, api_key: str, cx: str, num: int = 5, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Async variant of :meth:`search` on the shared HTTP client."""
+        key = self._key(query, cx, num, locale)
+        items = self.cache.get(key)
+        if items is not None:
+            return items
+
+        future = self._ainflight.get(key)
+        while future is not None:
+            with self._lock:
+                self.coalesced += 1
+            # wait() neither cancels the shared future nor raises its outcome,
+            # so only this call's own cancellation propagates from here
+            await asyncio.wait([future])
+            if not future.cancelled():
+                return future.result()
+            # The owning call was cancelled; join or start a fresh request
+            future = self._ainflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._ainflight[key] = future
+        try:
+            self._count_call()
+            try:
+                response = await fetch('GET', SEARCH_URL, verify=False, params=self._params(key, api_key), timeout=15)
+                if response.status_code != 200:
+                    raise SearchAPIError(f"Google API error: {response.status_code} - {response.text}")
+                data = response.json()
+            except SearchAPIError:
+                self._count_error()
+                raise
+            except (httpx.HTTPError, ValueError) as e:
+                self._count_error()
+                raise SearchAPIError(str(e)) from e
+            items = data.get("items", [])
+            self.cache.set(key, items)
+            future.set_result(items)
+            return items
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved: nobody may be waiting on the shared future
+            future.exception()
+            raise
+        except BaseException:
+            # Waiters see the cancelled future and issue their own request
+            future.cancel()
+            raise
+        finally:
+            self._ainflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            today = datetime.now(timezone.utc).date()
+            calls = self.calls_today if today == self._quota_day else 0
+            return {
+                'calls_today': calls,
+                'daily_quota': self.daily_quota,
+                'quota_remaining': max(self.daily_quota - calls, 0),
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'cache': self.cache.stats(),
+            }
+
+
+search_client = GoogleSearchClient()
+
+
+def result_links(items: List[Dict[str, Any]], exclude_pdf: bool = True) -> List[str]:
+    """Links from search result items, optionally skipping PDFs."""
+    links = []
+    for item in items:
+        link = item.get("link")
+        if link and not (exclude_pdf and link.lower().endswith(".pdf")):
+            links.append(link)
+    return links
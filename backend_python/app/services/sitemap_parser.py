@@ -1,9 +1,12 @@
+import asyncio
 import logging
-import aiohttp
-import ssl
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from typing import List, Set, Dict
+import httpx
+from urllib.parse import urljoin, urlparse
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from app.core.config import Config
+from app.core.http_client import fetch
+from app.services.sitemap_stream import stream_sitemap
 
 BROWSER_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -27,22 +30,25 @@ class SitemapParser:
         self.discovered_urls: Set[str] = set()
         self.content_types: Dict[str, str] = {} 
         self.robots_sitemaps: Set[str] = set()
-        # Create SSL context that doesn't verify certificates
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
-        self.connector = aiohttp.TCPConnector(ssl=self.ssl_context)
+        self.max_depth = Config.SITEMAP_MAX_DEPTH
+        # fetched / failed / timed_out count sitemap requests; skipped counts
+        # sitemaps not requested because they were already seen or too deep
+        self.stats: Dict[str, int] = {'fetched': 0, 'failed': 0, 'timed_out': 0, 'skipped': 0}
+        self._seen_sitemaps: Set[str] = set()
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        # Set while iter_urls() is streaming newly discovered pages
+        self._url_queue: Optional[asyncio.Queue] = None
 
-    async def discover_sitemaps_from_robots(self, session: aiohttp.ClientSession) -> Set[str]:
+    async def discover_sitemaps_from_robots(self) -> Set[str]:
         try:
             robots_url = urljoin(self.base_url, 'robots.txt')
-            async with session.get(robots_url) as response:
-                if response.status == 200:
-                    robots_content = await response.text()
-                    for line in robots_content.split('\n'):
-                        if 'sitemap:' in line.lower():
-                            sitemap_url = line.split(':', 1)[1].strip()
-                            self.robots_sitemaps.add(sitemap_url)
+            response = await fetch('GET', robots_url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+            if response.status_code == 200:
+                robots_content = response.text
+                for line in robots_content.split('\n'):
+                    if 'sitemap:' in line.lower():
+                        sitemap_url = line.split(':', 1)[1].strip()
+                        self.robots_sitemaps.add(sitemap_url)
         except Exception as e:
             logger.error(f"Error fetching robots.txt: {str(e)}")
         return self.robots_sitemaps
@@ -54,55 +60,95 @@ class SitemapParser:
         name = filename.replace('-sitemap.xml', '').replace('sitemap-', '').replace('.xml', '')
         return name if name else 'main'
 
-    async def _process_sitemap(self, session: aiohttp.ClientSession, url: str, sitemap_type: str):
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(Config.SITEMAP_MAX_CONCURRENCY_PER_HOST)
+        return self._host_limits[host]
+
+    def _add_url(self, url: str, sitemap_type: str):
+        if url not in self.discovered_urls:
+            self.discovered_urls.add(url)
+            if self._url_queue is not None:
+                self._url_queue.put_nowait(url)
+        self.content_types[url] = sitemap_type
+
+    async def _process_sitemap(self, url: str, depth: int = 0):
+        """
+        Record the page URLs listed in a sitemap, then follow its child
+        sitemaps concurrently. Pages take the type of the sitemap listing them.
+        """
+        if url in self._seen_sitemaps:
+            self.stats['skipped'] += 1
+            return
+        self._seen_sitemaps.add(url)
+        if depth > self.max_depth:
+            logger.warning(f"Skipping sitemap {url}: nesting deeper than {self.max_depth}")
+            self.stats['skipped'] += 1
+            return
+
+        sitemap_type = self._get_sitemap_type(url)
+        children: List[str] = []
         try:
-            async with session.get(url, headers=BROWSER_HEADERS, ssl=self.ssl_context) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'lxml')  # Use lxml parser
-                    for url_tag in soup.find_all('url'):
-                        loc = url_tag.find('loc')
-                        if loc and loc.text:
-                            self.discovered_urls.add(loc.text)
-                            self.content_types[loc.text] = sitemap_type
+            # Child sitemaps are followed after the slot is released so a
+            # deep index cannot exhaust the host limit waiting on itself.
+            async with self._host_limit(url):
+                # Same decoder as every other sitemap fetch: transfer encodings
+                # and gzipped .xml.gz files are both undone by the stream parser
+                async for kind, loc in stream_sitemap(
+                    url, headers=BROWSER_HEADERS, timeout=Config.SITEMAP_FETCH_TIMEOUT, verify=False
+                ):
+                    if kind == 'sitemap':
+                        children.append(loc)
+                    else:
+                        self._add_url(loc, sitemap_type)
+            self.stats['fetched'] += 1
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            logger.error(f"Timed out processing sitemap {url}")
+            self.stats['timed_out'] += 1
         except Exception as e:
             logger.error(f"Error processing sitemap {url}: {str(e)}")
+            self.stats['failed'] += 1
+
+        if children:
+            await asyncio.gather(*(self._process_sitemap(child, depth + 1) for child in children))
 
     async def get_all_urls(self) -> List[str]:
         try:
-            async with aiohttp.ClientSession(headers=BROWSER_HEADERS, connector=self.connector) as session:
-                # First check robots.txt for sitemaps
-                await self.discover_sitemaps_from_robots(session)
-                
-                # If no sitemaps found in robots.txt, try default sitemap.xml
-                if not self.robots_sitemaps:
-                    self.robots_sitemaps.add(urljoin(self.base_url, 'sitemap.xml'))
+            # First check robots.txt for sitemaps
+            await self.discover_sitemaps_from_robots()
+            
+            # If no sitemaps found in robots.txt, try default sitemap.xml
+            if not self.robots_sitemaps:
+                self.robots_sitemaps.add(urljoin(self.base_url, 'sitemap.xml'))
 
-                # Process all found sitemaps
-                for sitemap_url in self.robots_sitemaps:
-                    try:
-                        async with session.get(sitemap_url, headers=BROWSER_HEADERS, ssl=self.ssl_context) as response:
-                            if response.status == 200:
-                                content = await response.text()
-                                soup = BeautifulSoup(content, 'lxml')  # Use lxml parser
-                                
-                                # Check for sitemap index
-                                sitemaps = soup.find_all('sitemap')
-                                if sitemaps:
-                                    for sitemap in sitemaps:
-                                        loc = sitemap.find('loc')
-                                        if loc:
-                                            sitemap_type = self._get_sitemap_type(loc.text)
-                                            await self._process_sitemap(session, loc.text, sitemap_type)
-                                else:
-                                    # Single sitemap
-                                    sitemap_type = self._get_sitemap_type(sitemap_url)
-                                    await self._process_sitemap(session, sitemap_url, sitemap_type)
-                    except Exception as e:
-                        logger.error(f"Error processing sitemap {sitemap_url}: {str(e)}")
-                        continue
+            # Process all found sitemaps and their children concurrently
+            await asyncio.gather(*(self._process_sitemap(url) for url in self.robots_sitemaps))
 
+            logger.info(f"Sitemap discovery for {self.base_url}: {self.stats}")
             return list(self.discovered_urls)
         except Exception as e:
             logger.error(f"Error in get_all_urls: {str(e)}")
-            return list(self.discovered_urls)
\ No newline at end of file
+            return list(self.discovered_urls)
+
+    async def iter_urls(self, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Yield page URLs as soon as they are discovered while discovery keeps
+        running in the background. If discovery exceeds ``timeout`` the URLs
+        found so far have already been yielded and iteration simply ends.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._url_queue = queue
+        discovery = asyncio.ensure_future(asyncio.wait_for(self.get_all_urls(), timeout))
+        discovery.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                url = await queue.get()
+                if url is None:
+                    break
+                yield url
+            if isinstance(discovery.exception(), asyncio.TimeoutError):
+                logger.warning("URL discovery timed out, returning partial results")
+        finally:
+            discovery.cancel()
+            self._url_queue = None
@@ -0,0 +1,190 @@
+"""
+Streaming sitemap engine.
+
+Sitemaps are decoded and parsed incrementally as bytes arrive, so memory use
+stays bounded by the chunk size rather than the size of the sitemap. Both
+transfer encodings (``Content-Encoding: gzip/br/deflate``) and gzipped
+sitemap files (``sitemap.xml.gz``) are decompressed on the fly.
+"""
+import zlib
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Tuple
+
+import brotli
+from lxml import etree
+
+from app.core.http_client import stream
+
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+SITEMAP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/xml,text/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Cache-Control': 'no-cache',
+}
+
+# (kind, loc) where kind is 'url' for pages and 'sitemap' for child sitemaps
+SitemapEntry = Tuple[str, str]
+
+
+class SitemapParseError(Exception):
+    """Raised when a sitemap body is not valid (or decodable) XML."""
+
+
+def _inflate(obj, data: bytes) -> Iterator[bytes]:
+    """Decompress ``data`` in pieces of at most CHUNK_SIZE bytes."""
+    if isinstance(obj, brotli.Decompressor):
+        if data:
+            yield obj.process(data)
+        return
+    while data:
+        out = obj.decompress(data, CHUNK_SIZE)
+        data = obj.unconsumed_tail
+        if out:
+            yield out
+
+
+def _decompressor(content_encoding: Optional[str]):
+    encoding = (content_encoding or '').lower().strip()
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompressobj()
+    if encoding == 'br':
+        return brotli.Decompressor()
+    return None
+
+
+class SitemapStreamParser:
+    """
+    Incremental parser for ``<urlset>`` and ``<sitemapindex>`` documents.
+
+    Feed raw body chunks with :meth:`feed` and call :meth:`close` at the end;
+    both lazily yield the ``(kind, loc)`` entries completed so far. Parsed
+    elements are discarded immediately so the tree never grows.
+    """
+
+    def __init__(self, content_encoding: Optional[str] = None):
+        self._transfer = _decompressor(content_encoding)
+        self._file = None  # gunzip layer for .xml.gz bodies, set once sniffed
+        self._head = b''
+        self._sniffed = False
+        self._parser = etree.XMLPullParser(
+            events=('end',),
+            tag=('{*}url', '{*}sitemap'),
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+        )
+        self.url_count = 0
+        self.sitemap_count = 0
+
+    def feed(self, chunk: bytes) -> Iterator[SitemapEntry]:
+        try:
+            pieces = _inflate(self._transfer, chunk) if self._transfer else [chunk]
+            for piece in pieces:
+                yield from self._feed_decoded(piece)
+        except (zlib.error, brotli.error) as e:
+            raise SitemapParseError(str(e)) from e
+
+    def close(self) -> Iterator[SitemapEntry]:
+        try:
+            if self._transfer is not None and not isinstance(self._transfer, brotli.Decompressor):
+                yield from self._feed_decoded(self._transfer.flush())
+            if not self._sniffed:
+                yield from self._feed_decoded(b'', final=True)
+            if self._file is not None:
+                yield from self._feed_xml(self._file.flush())
+            self._parser.close()
+        except (etree.XMLSyntaxError, zlib.error, brotli.error) as e:
+            raise SitemapParseError(str(e)) from e
+        yield from self._drain()
+
+    def _feed_decoded(self, data: bytes, final: bool = False) -> Iterator[SitemapEntry]:
+        if not self._sniffed:
+            # Gzipped sitemap files are served without a Content-Encoding
+            # header, so detect them from the magic bytes.
+            self._head += data
+            if len(self._head) < len(GZIP_MAGIC) and not final:
+                return
+            data, self._head = self._head, b''
+            self._sniffed = True
+            if data.startswith(GZIP_MAGIC):
+                self._file = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._file is not None:
+            for piece in _inflate(self._file, data):
+                yield from self._feed_xml(piece)
+        else:
+            yield from self._feed_xml(data)
+
+    def _feed_xml(self, data: bytes) -> Iterator[SitemapEntry]:
+        if not data:
+            return
+        try:
+            self._parser.feed(data)
+        except etree.XMLSyntaxError as e:
+            raise SitemapParseError(str(e)) from e
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[SitemapEntry]:
+        for _, elem in self._parser.read_events():
+            kind = etree.QName(elem).localname
+            loc = elem.findtext('{*}loc')
+            # Drop the finished element and any siblings already processed
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+            if loc and loc.strip():
+                if kind == 'url':
+                    self.url_count += 1
+                else:
+                    self.sitemap_count += 1
+                yield kind, loc.strip()
+
+
+def iter_sitemap_entries(chunks: Iterable[bytes], content_encoding: Optional[str] = None) -> Iterator[SitemapEntry]:
+    """Yield ``(kind, loc)`` entries from an iterable of raw body chunks."""
+    parser = SitemapStreamParser(content_encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_sitemap_entries(chunks: AsyncIterable[bytes], content_encoding: Optional[str] = None) -> AsyncIterator[SitemapEntry]:
+    """Yield ``(kind, loc)`` entries from an async iterable of raw body chunks."""
+    parser = SitemapStreamParser(content_encoding)
+    async for chunk in chunks:
+        for entry in parser.feed(chunk):
+            yield entry
+    for entry in parser.close():
+        yield entry
+
+
+def response_entries(response) -> AsyncIterator[SitemapEntry]:
+    """Stream entries from an open httpx response without buffering the body."""
+    return aiter_sitemap_entries(
+        response.aiter_raw(CHUNK_SIZE),
+        response.headers.get('content-encoding'),
+    )
+
+
+async def stream_sitemap(url: str, headers: dict = None, timeout: float = 20, verify: bool = False) -> AsyncIterator[SitemapEntry]:
+    """
+    Fetch a sitemap on the shared HTTP client and yield its entries as they
+    are parsed. Raises ``httpx.HTTPStatusError`` for non-2xx responses and
+    :class:`SitemapParseError` for bodies that are not valid XML.
+    """
+    async with stream(
+        'GET',
+        url,
+        verify=verify,
+        headers=headers or SITEMAP_HEADERS,
+        timeout=timeout,
+        follow_redirects=True,
+    ) as response:
+        response.raise_for_status()
+        async for entry in response_entries(response):
+            yield entry
@@ -0,0 +1,179 @@
+"""
+Blog title generation for ``/get-titles``.
+
+Titles for every keyword are requested concurrently through the LLM gateway,
+at most ``TITLE_GENERATION_CONCURRENCY`` OpenAI calls at a time.
+With ``TITLE_BATCH_SIZE`` above 1, keywords are grouped into a single
+structured-output call per batch. When any generated title is too close to
+an existing article (looked up in the project's title index), one follow-up
+call asks for a title different from all of them.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import Config
+from app.core.llm_gateway import LLMError, llm_gateway
+from app.services.title_index import TitleIndex
+
+logger = logging.getLogger(__name__)
+
+TITLE_MODEL = "gpt-4o-mini"
+
+BATCH_SCHEMA = {
+    "name": "keyword_titles",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "keyword": {"type": "string"},
+                        "titles": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["keyword", "titles"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
+
+
+class TitleGenerationError(Exception):
+    """Raised when OpenAI cannot be reached or answers with an error."""
+
+
+async def _chat(messages: List[Dict[str, str]], **extra: Any) -> str:
+    """Send one chat completion request and return the message content."""
+    try:
+        content = await llm_gateway.openai_chat(
+            messages, model=TITLE_MODEL, temperature=0.8,
+            timeout=Config.TITLE_GENERATION_TIMEOUT, **extra,
+        )
+    except LLMError as e:
+        logger.error(f"OpenAI API error: {e}")
+        if e.status_code:
+            raise TitleGenerationError(f"OpenAI API error: {e.status_code}") from e
+        raise TitleGenerationError("Failed to generate titles due to API error.") from e
+    return content.strip()
+
+
+def clean_titles(lines: Sequence[str]) -> List[str]:
+    """Strip list numbering and bullets from generated titles."""
+    return [re.sub(r"^[-\d\.]+\s*", "", title).strip() for title in lines if title.strip()]
+
+
+def similar_titles(generated: Sequence[str], existing: TitleIndex) -> List[str]:
+    """Generated titles that are near-duplicates of an existing title."""
+    return [title for title in generated if existing.has_similar(title)]
+
+
+async def _unique_title(too_similar: Sequence[str]) -> Optional[str]:
+    """One follow-up call for a title unlike every flagged one."""
+    avoid = "\n".join(f"- {title}" for title in too_similar)
+    prompt = f"Generate a completely unique blog title that is different from all of these titles:\n{avoid}"
+    try:
+        return await _chat([{"role": "user", "content": prompt}]) or None
+    except TitleGenerationError as e:
+        logger.error(f"Failed to generate unique title: {e}")
+        return None
+
+
+async def _pick_title(keyword: str, titles: List[str], existing: TitleIndex) -> str:
+    too_similar = similar_titles(titles, existing)
+    if too_similar:
+        logger.info(f"Generated titles {too_similar} are too similar to existing titles.")
+        unique = await _unique_title(too_similar)
+        if unique:
+            return unique
+    if titles:
+        return titles[0]
+    # Fallback if no titles were generated
+    return f"SEO Title for {keyword}"
+
+
+async def _generate_one(keyword: str, prompt: str) -> List[str]:
+    content = await _chat([
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": "Generate SEO-optimized blog titles."},
+    ])
+    return clean_titles(content.split("\n"))
+
+
+async def _generate_batch(batch: List[Dict[str, str]]) -> List[List[str]]:
+    """
+    Titles for several keywords from one structured-output call. Keywords
+    missing from the answer are generated on their own.
+    """
+    instructions = "\n\n".join(
+        f"Keyword {n}: {item['keyword']}\nInstructions:\n{item['prompt']}"
+        for n, item in enumerate(batch, 1)
+    )
+    content = await _chat(
+        [
+            {
+                "role": "system",
+                "content": "You write SEO-optimized blog titles. For each keyword below, follow its "
+                           "instructions and return the titles for that keyword under its exact keyword.",
+            },
+            {"role": "user", "content": instructions},
+        ],
+        response_format={"type": "json_schema", "json_schema": BATCH_SCHEMA},
+    )
+    try:
+        results = {r["keyword"]: r["titles"] for r in json.loads(content)["results"]}
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Unreadable batched title response, generating keywords one by one: {e}")
+        results = {}
+
+    titles = []
+    for item in batch:
+        if item["keyword"] in results:
+            titles.append(clean_titles(results[item["keyword"]]))
+        else:
+            titles.append(await _generate_one(item["keyword"], item["prompt"]))
+    return titles
+
+
+async def generate_titles(
+    items: List[Dict[str, str]],
+    existing_titles: TitleIndex,
+    concurrency: int = Config.TITLE_GENERATION_CONCURRENCY,
+    batch_size: int = Config.TITLE_BATCH_SIZE,
+) -> List[str]:
+    """
+    Return one title per ``{"keyword", "prompt"}`` item, in order. Raises
+    TitleGenerationError if any title request fails; the other requests are
+    cancelled.
+    """
+    limit = asyncio.Semaphore(max(concurrency, 1))
+    batch_size = max(batch_size, 1)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    async def run_batch(batch: List[Dict[str, str]]) -> List[str]:
+        async with limit:
+            if len(batch) == 1:
+                generated = [await _generate_one(batch[0]["keyword"], batch[0]["prompt"])]
+            else:
+                generated = await _generate_batch(batch)
+            return [
+                await _pick_title(item["keyword"], titles, existing_titles)
+                for item, titles in zip(batch, generated)
+            ]
+
+    tasks = [asyncio.create_task(run_batch(batch)) for batch in batches]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return [title for batch_titles in results for title in batch_titles]
@@ -0,0 +1,262 @@
+"""
+Near-duplicate lookup over the article titles of a project.
+
+Each title is reduced to a MinHash signature of its character 3-grams and
+banded for locality-sensitive hashing, so a lookup only verifies the titles
+that share a band with the query instead of every title in the project.
+Candidates are confirmed with the same ``fuzz.ratio`` check ``/get-titles``
+has always used. Band keys live in sorted numpy arrays rather than Python
+sets, which keeps a 100k-title project in a few dozen MB.
+
+Indexes are cached per project and kept current from the articles'
+``updated_at`` timestamps. A fingerprint of the project's articles (count
+and highest ``_id``) catches deletions and articles the timestamps missed,
+which trigger a full reload, as does ``TITLE_INDEX_RELOAD_INTERVAL``.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from bson import ObjectId
+from cachetools import LRUCache
+from fuzzywuzzy import fuzz
+
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 80
+
+_PRIME = 4294967291  # largest prime below 2**32, so hash values fit in uint32
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BAND_SALT = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.lower().split())
+
+
+def _shingles(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} or {padded}
+
+
+def _may_reach(len_a: int, len_b: int, threshold: int) -> bool:
+    """fuzz.ratio can't exceed 200 * min / (len_a + len_b); skip pairs below it."""
+    return 200 * min(len_a, len_b) >= (threshold - 0.5) * (len_a + len_b)
+
+
+class TitleIndex:
+    """MinHash LSH index mapping article ids to their titles."""
+
+    def __init__(self, bands: int = Config.TITLE_INDEX_BANDS, rows: int = Config.TITLE_INDEX_ROWS, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, bands * rows, dtype=np.uint64)
+        self._band_salts = np.arange(1, bands + 1, dtype=np.uint64) * _BAND_SALT
+        # Slot per added title; removed titles leave a None behind
+        self._titles: List[Optional[str]] = []
+        self._slot: Dict[str, int] = {}
+        # Merged band keys, sorted, with the slot each one belongs to
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._key_slots = np.empty(0, dtype=np.int64)
+        # Recently added band keys, merged once there are enough of them
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_slots: List[np.ndarray] = []
+        self._pending_count = 0
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def _band_keys(self, titles: Sequence[str]) -> np.ndarray:
+        """One key per band for each title, shape ``(len(titles), bands)``."""
+        grams = [_shingles(normalize_title(title)) for title in titles]
+        counts = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+        hashes = np.fromiter(
+            (hash(gram) & 0xFFFFFFFF for g in grams for gram in g), dtype=np.uint64, count=int(counts.sum())
+        )
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        keys = np.zeros((len(titles), self.bands), dtype=np.uint64)
+        for k in range(self.bands * self.rows):
+            minima = np.minimum.reduceat((self._a[k] * hashes + self._b[k]) % _PRIME, offsets)
+            band = k // self.rows
+            keys[:, band] = (keys[:, band] ^ minima) * _MIX
+        return keys ^ self._band_salts
+
+    def add_many(self, items: Iterable[Tuple[str, Optional[str]]]):
+        """Add or replace ``(article_id, title)`` pairs; empty titles are removed."""
+        new_titles = []
+        for article_id, title in items:
+            title = (title or "").strip().lower()
+            slot = self._slot.get(article_id)
+            if slot is not None:
+                if self._titles[slot] == title:
+                    continue
+                self._titles[slot] = None
+                del self._slot[article_id]
+            if title:
+                self._slot[article_id] = len(self._titles)
+                self._titles.append(title)
+                new_titles.append(title)
+        if not new_titles:
+            return
+        first = len(self._titles) - len(new_titles)
+        keys = self._band_keys(new_titles)
+        self._pending_keys.append(keys.ravel())
+        self._pending_slots.append(np.repeat(np.arange(first, len(self._titles), dtype=np.int64), self.bands))
+        self._pending_count += len(new_titles)
+        if self._pending_count >= max(256, len(self._slot) // 16):
+            self._merge()
+
+    def add(self, article_id: str, title: Optional[str]):
+        self.add_many([(article_id, title)])
+
+    def remove(self, article_id: str):
+        slot = self._slot.pop(article_id, None)
+        if slot is not None:
+            self._titles[slot] = None
+
+    def _merge(self):
+        keys = np.concatenate([self._keys, *self._pending_keys])
+        slots = np.concatenate([self._key_slots, *self._pending_slots])
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._key_slots = keys[order], slots[order]
+        self._pending_keys, self._pending_slots, self._pending_count = [], [], 0
+
+    def _candidates(self, title: str) -> Set[int]:
+        query_keys = self._band_keys([title])[0]
+        slots: Set[int] = set()
+        if len(self._keys):
+            lo = np.searchsorted(self._keys, query_keys, side="left")
+            hi = np.searchsorted(self._keys, query_keys, side="right")
+            for start, end in zip(lo.tolist(), hi.tolist()):
+                if end > start:
+                    slots.update(self._key_slots[start:end].tolist())
+        for keys, key_slots in zip(self._pending_keys, self._pending_slots):
+            slots.update(key_slots[np.isin(keys, query_keys)].tolist())
+        return slots
+
+    def find_similar(self, title: str, threshold: int = SIMILARITY_THRESHOLD, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Indexed titles whose fuzz.ratio with ``title`` is at least ``threshold``."""
+        query = title.strip().lower()
+        if not query or not self._slot:
+            return []
+        matches = []
+        for slot in self._candidates(query):
+            candidate = self._titles[slot]
+            if candidate is None or not _may_reach(len(candidate), len(query), threshold):
+                continue
+            score = fuzz.ratio(candidate, query)
+            if score >= threshold:
+                matches.append((candidate, score))
+                if limit and len(matches) >= limit:
+                    break
+        return matches
+
+    def has_similar(self, title: str, threshold: int = SIMILARITY_THRESHOLD) -> bool:
+        return bool(self.find_similar(title, threshold, limit=1))
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, Optional[str]]], **kwargs) -> "TitleIndex":
+        index = cls(**kwargs)
+        index.add_many(items)
+        if index._pending_count:
+            index._merge()
+        return index
+
+
+@dataclass
+class _ProjectEntry:
+    index: TitleIndex
+    article_ids: Set[str] = field(default_factory=set)
+    watermark: datetime = datetime.min
+    max_id: Optional[ObjectId] = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class ProjectTitleIndexes:
+    """Per-project title indexes, synced from MongoDB on each lookup."""
+
+    def __init__(
+        self,
+        maxsize: int = Config.TITLE_INDEX_MAX_PROJECTS,
+        reload_interval: float = Config.TITLE_INDEX_RELOAD_INTERVAL,
+    ):
+        self._entries = LRUCache(maxsize=maxsize)
+        self.reload_interval = reload_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.full_loads = 0
+        self.incremental_syncs = 0
+
+    async def get(self, database, project_id: ObjectId) -> TitleIndex:
+        """Return the project's index, bringing it up to date first."""
+        key = str(project_id)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            collection = database.solution_seo_articles
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.loaded_at < self.reload_interval:
+                changed = await collection.find(
+                    {"project": project_id, "updated_at": {"$gte": entry.watermark}},
+                    {"name": 1, "updated_at": 1},
+                ).to_list(length=None)
+                self._apply(entry, changed)
+                total, max_id = await self._fingerprint(collection, project_id)
+                self.incremental_syncs += 1
+                # A deletion leaves ids the project no longer has; an article
+                # missed by the updated_at sync raises the highest _id
+                if total == len(entry.article_ids) and max_id == entry.max_id:
+                    return entry.index
+                logger.info(f"Articles of project {key} were deleted or missed, reloading its title index")
+
+            articles = await collection.find(
+                {"project": project_id}, {"name": 1, "updated_at": 1}
+            ).to_list(length=None)
+            index = await asyncio.to_thread(
+                TitleIndex.build, [(str(a["_id"]), a.get("name")) for a in articles]
+            )
+            entry = _ProjectEntry(index=index)
+            self._apply(entry, articles, index_titles=False)
+            self._entries[key] = entry
+            self.full_loads += 1
+            return index
+
+    @staticmethod
+    async def _fingerprint(collection, project_id: ObjectId) -> Tuple[int, Optional[ObjectId]]:
+        """Number of articles in the project and their highest ``_id``."""
+        groups = await collection.aggregate([
+            {"$match": {"project": project_id}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "max_id": {"$max": "$_id"}}},
+        ]).to_list(length=1)
+        if not groups:
+            return 0, None
+        return groups[0]["count"], groups[0]["max_id"]
+
+    @staticmethod
+    def _apply(entry: _ProjectEntry, articles: List[dict], index_titles: bool = True):
+        if index_titles:
+            entry.index.add_many((str(a["_id"]), a.get("name")) for a in articles)
+        for article in articles:
+            entry.article_ids.add(str(article["_id"]))
+            if entry.max_id is None or article["_id"] > entry.max_id:
+                entry.max_id = article["_id"]
+            updated_at = article.get("updated_at")
+            if isinstance(updated_at, datetime) and updated_at > entry.watermark:
+                entry.watermark = updated_at
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'projects': len(self._entries),
+            'titles': sum(len(entry.index) for entry in self._entries.values()),
+            'full_loads': self.full_loads,
+            'incremental_syncs': self.incremental_syncs,
+        }
+
+
+project_title_indexes = ProjectTitleIndexes()
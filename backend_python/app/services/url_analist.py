@@ -1,12 +1,13 @@
-import aiohttp
+import httpx
 from bs4 import BeautifulSoup
 import asyncio
 import logging
-from typing import List, Tuple
+from typing import AsyncIterable, AsyncIterator, Iterable, List, Tuple
 from app.models.schemas import MetaAnalysisResult
 from fastapi import APIRouter, HTTPException
 from app.services.scraper import extract_main_content, article_google_search_links2
-import aiohttp
+from app.core.config import Config
+from app.core.http_client import fetch
 import os
 import requests
 
@@ -40,73 +41,58 @@ logger = logging.getLogger(__name__)
 
 async def fetch_and_parse_url(url: str) -> Tuple[str, BeautifulSoup, str]:
     """Fetch URL content and return HTML and parsed soup"""
-    import ssl
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
-    
-    async with aiohttp.ClientSession(headers=BROWSER_HEADERS, connector=connector) as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise HTTPException(
-                    status_code=response.status,
-                    detail=f"Failed to fetch URL. Status code: {response.status}"
-                )
-            html = await response.text()
-            soup = BeautifulSoup(html, 'lxml')
-            return html, soup, str(response.status)
+    response = await fetch('GET', url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Failed to fetch URL. Status code: {response.status_code}"
+        )
+    html = response.text
+    soup = BeautifulSoup(html, 'lxml')
+    return html, soup, str(response.status_code)
 
 async def analyze_single_url(url: str, keywords: str = None) -> MetaAnalysisResult:
     try:
-        import ssl
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
+        try:
+            response = await fetch('GET', url, verify=False, headers=BROWSER_HEADERS, timeout=30, follow_redirects=True)
+        except httpx.TimeoutException:
+            return MetaAnalysisResult(
+                url=url,
+                status="error",
+                error="Request timed out"
+            )
+        if response.status_code != 200:
+            return MetaAnalysisResult(
+                url=url,
+                status="error",
+                error=f"HTTP {response.status_code}"
+            )
+        
+        html = response.text
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # Extract existing meta tags
+        meta_title = soup.title.string if soup.title else None
+        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+        meta_description = meta_desc_tag.get('content') if meta_desc_tag else None
         
-        timeout = aiohttp.ClientTimeout(total=30)
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        async with aiohttp.ClientSession(timeout=timeout, headers=BROWSER_HEADERS, connector=connector) as session:
-            try:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return MetaAnalysisResult(
-                            url=url,
-                            status="error",
-                            error=f"HTTP {response.status}"
-                        )
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Extract existing meta tags
-                    meta_title = soup.title.string if soup.title else None
-                    meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-                    meta_description = meta_desc_tag.get('content') if meta_desc_tag else None
-                    
-                    # Generate new meta tags
-                    page_content = await extract_main_content(html)
-                    #generated_title, generated_description = await generate_meta_tags(
-                      #  url, 
-                     #   page_content,
-                     #   keywords
-                  #  )
-                    
-                    return MetaAnalysisResult(
-                        url=url,
-                        status="success",
-                        meta_title=meta_title,
-                        meta_description=meta_description,
-                        #generated_title=generated_title,
-                        #generated_description=generated_description,
-                        keywords=keywords
-                    )
-            except asyncio.TimeoutError:
-                return MetaAnalysisResult(
-                    url=url,
-                    status="error",
-                    error="Request timed out"
-                )
+        # Generate new meta tags
+        page_content = await extract_main_content(html)
+        #generated_title, generated_description = await generate_meta_tags(
+          #  url, 
+         #   page_content,
+         #   keywords
+      #  )
+        
+        return MetaAnalysisResult(
+            url=url,
+            status="success",
+            meta_title=meta_title,
+            meta_description=meta_description,
+            #generated_title=generated_title,
+            #generated_description=generated_description,
+            keywords=keywords
+        )
     except Exception as e:
         return MetaAnalysisResult(
             url=url,
@@ -118,21 +104,74 @@ async def analyze_batch_urls(urls: List[str]) -> List[MetaAnalysisResult]:
     tasks = [analyze_single_url(url) for url in urls]
     return await asyncio.gather(*tasks) 
 
+async def _iterate(urls: Iterable[str]) -> AsyncIterator[str]:
+    for url in urls:
+        yield url
+
+async def analyze_url_stream(urls: AsyncIterable[str], workers: int = None) -> AsyncIterator[MetaAnalysisResult]:
+    """
+    Analyze URLs with a fixed pool of workers, yielding each result as soon
+    as it is ready (completion order, not input order).
+
+    ``urls`` may still be producing while analysis runs, e.g. a sitemap that
+    is being discovered. Both queues are bounded, so neither a fast producer
+    nor a slow consumer makes pending URLs or finished results pile up. If
+    ``urls`` fails, its exception is raised after the URLs it already produced
+    have been analyzed.
+    """
+    workers = workers or Config.URL_ANALYSIS_WORKERS
+    pending: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    done = object()
+    source_error = None
+
+    async def produce():
+        nonlocal source_error
+        try:
+            async for url in urls:
+                await pending.put(url)
+        except Exception as e:
+            logger.error(f"URL source failed, analyzing URLs received so far: {str(e)}")
+            source_error = e
+        for _ in range(workers):
+            await pending.put(None)
+
+    async def work():
+        while True:
+            url = await pending.get()
+            if url is None:
+                return
+            await results.put(await analyze_single_url(url))
+
+    async def run():
+        producer = asyncio.ensure_future(produce())
+        try:
+            await asyncio.gather(*(work() for _ in range(workers)))
+            await producer
+        finally:
+            producer.cancel()
+        await results.put(done)
+        # Raised once the URLs received so far have been analyzed and yielded
+        if source_error is not None:
+            raise source_error
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while True:
+            result = await results.get()
+            if result is done:
+                break
+            yield result
+        await runner
+    finally:
+        runner.cancel()
+
 async def process_urls_in_batches(urls, batch_size=50):
     """
-    Processes URLs in smaller batches to prevent memory exhaustion.
+    Analyzes a list of URLs on the worker pipeline. ``batch_size`` is kept for
+    compatibility; concurrency is set by URL_ANALYSIS_WORKERS.
     """
-    results = []
-    for i in range(0, len(urls), batch_size):
-        batch = urls[i : i + batch_size]
-        async with semaphore:
-            logger.info(f"Processing batch {i//batch_size + 1}/{(len(urls)//batch_size) + 1}")
-            batch_results = await analyze_batch_urls(batch) 
-            results.extend(batch_results)
-
-        await asyncio.sleep(0.1)
-    
-    return results
+    return [result async for result in analyze_url_stream(_iterate(urls))]
 
 def scrape_page_content2(url):
     try:
@@ -0,0 +1,90 @@
+"""
+Benchmark URL fetching with a session per URL (the previous behaviour of
+url_analist) against the shared keep-alive client in app.core.http_client.
+
+Starts a local aiohttp test server, fetches the same set of pages both ways
+and prints URLs/sec.
+
+    cd backend_python
+    PYTHONPATH=. python benchmarks/bench_http_pool.py --urls 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import ssl
+import time
+
+import aiohttp
+from aiohttp import web
+
+from app.core.http_client import close_async_clients, fetch
+
+PAGE = (
+    "<html><head><title>Benchmark page {n}</title>"
+    "<meta name='description' content='Page {n}'></head>"
+    "<body><main><h1>Page {n}</h1>" + "<p>Lorem ipsum dolor sit amet.</p>" * 50 + "</main></body></html>"
+)
+
+
+async def handle_page(request: web.Request) -> web.Response:
+    return web.Response(text=PAGE.format(n=request.match_info["n"]), content_type="text/html")
+
+
+async def start_server(port: int) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get("/page/{n}", handle_page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def fetch_with_new_session(url: str) -> int:
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    connector = aiohttp.TCPConnector(ssl=ssl_context)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.get(url) as response:
+            return len(await response.text())
+
+
+async def fetch_with_pool(url: str) -> int:
+    response = await fetch('GET', url, verify=False)
+    return len(response.text)
+
+
+async def run(fetch, urls, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(url):
+        async with semaphore:
+            return await fetch(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(url) for url in urls))
+    return len(urls) / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    runner = await start_server(args.port)
+    urls = [f"http://127.0.0.1:{args.port}/page/{n}" for n in range(args.urls)]
+    try:
+        before = await run(fetch_with_new_session, urls, args.concurrency)
+        after = await run(fetch_with_pool, urls, args.concurrency)
+    finally:
+        await close_async_clients()
+        await runner.cleanup()
+
+    print(f"{args.urls} URLs, concurrency {args.concurrency}")
+    print(f"session per URL : {before:8.1f} URLs/sec")
+    print(f"shared pool     : {after:8.1f} URLs/sec ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
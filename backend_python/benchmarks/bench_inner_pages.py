@@ -0,0 +1,86 @@
+"""
+Replay a saved corpus through the bulk inner-page audit: pages are served by
+a local aiohttp server, fetched concurrently on the shared HTTP client and
+parsed either on threads (the previous behaviour) or in the analysis process
+pool with different worker counts. Prints pages/sec for each mode.
+
+    cd backend_python
+    PYTHONPATH=. python benchmarks/bench_inner_pages.py --corpus ~/saved-pages --pages 2000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from app.core.http_client import close_async_clients, fetch
+from app.core.process_pool import ProcessPool
+from app.seo_audit.helpers import _parse_inner_page_meta
+
+PORT = 8766
+
+
+def load_corpus(directory: Path):
+    paths = sorted(p for p in directory.rglob("*") if p.suffix.lower() in (".html", ".htm"))
+    return [p.read_bytes() for p in paths]
+
+
+async def start_server(pages):
+    async def handle(request: web.Request) -> web.Response:
+        body = pages[int(request.match_info["n"]) % len(pages)]
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/page/{n}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+    return runner
+
+
+async def crawl(pool: ProcessPool, page_count: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def audit(n: int):
+        url = f"http://127.0.0.1:{PORT}/page/{n}"
+        async with limit:
+            response = await fetch("GET", url, timeout=30)
+        return await pool.run(_parse_inner_page_meta, response.content, url, response.charset_encoding)
+
+    started = time.perf_counter()
+    records = await asyncio.gather(*(audit(n) for n in range(page_count)))
+    elapsed = time.perf_counter() - started
+    assert all(record is not None for record in records)
+    return page_count / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="directory of saved HTML pages")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        parser.error(f"no .html pages under {args.corpus}")
+    runner = await start_server(pages)
+    try:
+        print(f"{args.pages} page fetches over {len(pages)} saved pages, {args.concurrency} concurrent")
+        for workers in [0, *args.workers]:
+            pool = ProcessPool(workers)
+            # Start the worker processes before timing
+            await asyncio.gather(*(pool.run(_parse_inner_page_meta, b"<html></html>", "http://x/") for _ in range(workers)))
+            rate = await crawl(pool, args.pages, args.concurrency)
+            label = "threads" if workers == 0 else f"{workers} worker process(es)"
+            print(f"  {label:24}: {rate:8.1f} pages/s")
+            await pool.close()
+    finally:
+        await close_async_clients()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark the inner-page audit summary: the previous implementation, which
+rescans every page once per duplicate title and once per duplicate
+description, against the single-pass summarize_inner_pages.
+
+Generates a synthetic sitemap crawl with many duplicate title and
+description groups, missing values and internal links, checks that both
+implementations return the same summary and prints their run times. The
+previous implementation is quadratic, so it is only run up to
+``--legacy-max`` pages.
+
+    cd backend_python
+    PYTHONPATH=. python benchmarks/bench_inner_summary.py --sizes 1000 10000 100000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from app.seo_audit.inner_summary import summarize_inner_pages
+
+BASE_URL = "https://www.example.com/"
+
+
+def legacy_summary(inner_results, inner_link_map, url_list, base_url):
+    """The summary block trigger_audit used to compute inline."""
+    titles = [(row["Title"] or "").strip() for row in inner_results]
+    descs = [(row["Meta Description"] or "").strip() for row in inner_results]
+    missing_titles = sum(1 for t in titles if not t)
+    missing_titles_list = [row["URL"] for row in inner_results if not (row["Title"] or "").strip()]
+    missing_descriptions = sum(1 for d in descs if not d)
+    missing_descriptions_list = [
+        row["URL"] for row in inner_results if not (row["Meta Description"] or "").strip()
+    ]
+    title_counts = Counter(titles)
+    dup_titles = [t for t, c in title_counts.items() if t and c > 1]
+    duplicate_titles = []
+    for t in dup_titles:
+        duplicate_titles.extend([row["URL"] for row in inner_results if (row["Title"] or "").strip() == t])
+    desc_counts = Counter(descs)
+    dup_descs = [d for d, c in desc_counts.items() if d and c > 1]
+    duplicate_desc_groups = []
+    for d in dup_descs:
+        duplicate_desc_groups.extend(
+            [row["URL"] for row in inner_results if (row["Meta Description"] or "").strip() == d]
+        )
+    title_length_issues = [
+        row["URL"] for row in inner_results if row["Title Length"] < 50 or row["Title Length"] > 60
+    ]
+    desc_length_issues = [row["URL"] for row in inner_results if row["Description Length"] > 160]
+    inbound_counts = {u: 0 for u in url_list}
+    for src, targets in inner_link_map.items():
+        for target in targets:
+            if target in inbound_counts:
+                inbound_counts[target] += 1
+    root_norm = base_url.rstrip("/")
+    orphan_pages = [u for u, cnt in inbound_counts.items() if cnt == 0 and u.rstrip("/") != root_norm]
+    return {
+        "total_pages": len(inner_results),
+        "missing_titles": missing_titles,
+        "missing_titles_list": missing_titles_list,
+        "missing_descriptions": missing_descriptions,
+        "missing_descriptions_list": missing_descriptions_list,
+        "duplicate_groups": len(dup_titles),
+        "duplicate_titles": duplicate_titles,
+        "duplicate_pages": sum(title_counts[t] for t in dup_titles),
+        "duplicate_desc_groups_count": len(dup_descs),
+        "duplicate_desc_groups": duplicate_desc_groups,
+        "duplicate_desc_pages": sum(desc_counts[d] for d in dup_descs),
+        "title_length_issues": title_length_issues,
+        "desc_length_issues": desc_length_issues,
+        "orphan_pages": orphan_pages,
+        "orphan_count": len(orphan_pages),
+    }
+
+
+def make_crawl(size: int, seed: int):
+    rng = random.Random(seed)
+    url_list = [BASE_URL] + [f"{BASE_URL}page/{n}" for n in range(1, size)]
+    # About a third of the pages share a title or description with others
+    title_pool = [f"Product {n} | Example Store" for n in range(size // 6 or 1)]
+    desc_pool = [f"Buy product {n} online. " * rng.randint(1, 8) for n in range(size // 6 or 1)]
+    inner_results, inner_link_map = [], {}
+    for url in url_list:
+        roll = rng.random()
+        title = None if roll < 0.05 else rng.choice(title_pool) if roll < 0.35 else f"Page {url} title"
+        if title and rng.random() < 0.1:
+            title = f"  {title} "
+        desc = None if rng.random() < 0.08 else rng.choice(desc_pool) if rng.random() < 0.4 else f"About {url}"
+        inner_results.append({
+            "URL": url,
+            "Title": title,
+            "Title Length": len(title) if title else 0,
+            "Meta Description": desc,
+            "Description Length": len(desc) if desc else 0,
+        })
+        inner_link_map[url] = [rng.choice(url_list) for _ in range(rng.randint(0, 3))]
+    return inner_results, inner_link_map, url_list
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        crawl = make_crawl(size, args.seed)
+        summary, new_s = timed(summarize_inner_pages, *crawl, BASE_URL)
+        print(f"{size} pages: {summary['duplicate_groups']} duplicate title groups, "
+              f"{summary['duplicate_desc_groups_count']} duplicate description groups")
+        print(f"  single pass : {new_s * 1000:10.1f} ms")
+        if size > args.legacy_max:
+            print("  previous    :    skipped (--legacy-max)")
+            continue
+        expected, old_s = timed(legacy_summary, *crawl, BASE_URL)
+        print(f"  previous    : {old_s * 1000:10.1f} ms ({old_s / new_s:.0f}x)")
+        assert summary == expected, "summaries differ"
+        print("  summaries identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark the single-page audit analyzers: BeautifulSoup's html.parser with
+one find_all pass per analyzer (the previous behaviour of trigger_audit)
+against the parse-once lxml page model.
+
+Runs meta tags, headings, images, content, links and schema markup over
+every saved page of a corpus directory (``*.html`` / ``*.htm``, searched
+recursively) and reports CPU time per page for each approach, plus how many
+pages got identical analyzer output from both. A few hand-written edge
+cases (inline comments, processing instructions, script and template
+content) are checked for identical output before the corpus is timed.
+
+    cd backend_python
+    PYTHONPATH=. python benchmarks/bench_page_model.py --corpus ~/saved-pages --repeat 3
+"""
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from app.seo_audit.helpers import (
+    analyze_content,
+    analyze_headings,
+    analyze_images,
+    analyze_links,
+    analyze_meta_tags,
+    check_schema_markup,
+)
+from app.seo_audit.page_model import parse_page
+
+BASE_URL = "https://www.example.com/"
+
+
+# --- previous BeautifulSoup analyzers ----------------------------------------
+
+def soup_meta_tags(soup):
+    title = soup.title.string if soup.title else None
+    results = {'title': title, 'title_length': len(title) if title else 0,
+               'meta_description': None, 'meta_description_length': 0, 'has_viewport': False,
+               'has_robots': False, 'robots_content': None, 'has_canonical': False,
+               'canonical_url': None, 'has_hreflang': False, 'hreflang_tags': []}
+    for meta in soup.find_all('meta'):
+        name = meta.get('name', '').lower()
+        if name == 'description':
+            results['meta_description'] = meta.get('content', '')
+            results['meta_description_length'] = len(meta.get('content', ''))
+        elif name == 'viewport':
+            results['has_viewport'] = True
+        elif name == 'robots':
+            results['has_robots'] = True
+            results['robots_content'] = meta.get('content', '')
+    for link in soup.find_all('link'):
+        if link.get('rel') and 'canonical' in link.get('rel'):
+            results['has_canonical'] = True
+            results['canonical_url'] = link.get('href')
+        elif link.get('rel') and 'alternate' in link.get('rel') and link.get('hreflang'):
+            results['has_hreflang'] = True
+            results['hreflang_tags'].append({'hreflang': link.get('hreflang'), 'href': link.get('href')})
+    return results
+
+
+def soup_headings(soup):
+    headings = {f'h{level}': [] for level in range(1, 7)}
+    for level in range(1, 7):
+        for heading in soup.find_all(f'h{level}'):
+            if heading.text.strip():
+                headings[f'h{level}'].append(heading.text.strip())
+    return headings
+
+
+def soup_images(soup, base_url):
+    images = []
+    for img in soup.find_all('img'):
+        src = img.get('src', '')
+        if not src:
+            continue
+        if not src.startswith(('http://', 'https://')):
+            src = urljoin(base_url, src)
+        images.append({'src': src, 'alt': img.get('alt', ''), 'has_alt': bool(img.get('alt'))})
+    return images
+
+
+def soup_content(soup):
+    words = re.findall(r'\b\w+\b', soup.get_text(separator=' ', strip=True).lower())
+    word_freq = {}
+    for word in words:
+        if len(word) > 3:
+            word_freq[word] = word_freq.get(word, 0) + 1
+    return {'word_count': len(words),
+            'top_keywords': sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:20]}
+
+
+def soup_links(soup, base_url):
+    internal_links, external_links = [], []
+    base_domain = urlparse(base_url).netloc
+    for a in soup.find_all('a', href=True):
+        href = a.get('href')
+        if href.startswith('#') or not href:
+            continue
+        full_url = href if href.startswith(('http://', 'https://')) else urljoin(base_url, href)
+        link = {'url': full_url, 'text': a.text.strip() or "[No Text]", 'nofollow': 'nofollow' in a.get('rel', [])}
+        (internal_links if urlparse(full_url).netloc == base_domain else external_links).append(link)
+    return {'internal_links': internal_links, 'external_links': external_links}
+
+
+def soup_schema_counts(soup):
+    json_ld = [s.string for s in soup.find_all('script', {'type': 'application/ld+json'})]
+    itemtypes = [e.get('itemtype') for e in soup.find_all(itemscope=True)]
+    typeofs = [e.get('typeof') for e in soup.find_all(attrs={"typeof": True})]
+    return len(json_ld), len(itemtypes), len(typeofs)
+
+
+def analyze_with_soup(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return {
+        'meta_tags': soup_meta_tags(soup),
+        'headings': soup_headings(soup),
+        'images': soup_images(soup, BASE_URL),
+        'content': soup_content(soup),
+        'links': soup_links(soup, BASE_URL),
+        'schema': soup_schema_counts(soup),
+    }
+
+
+def analyze_with_page_model(html):
+    page = parse_page(html)
+    schema = check_schema_markup(html, page)
+    return {
+        'meta_tags': analyze_meta_tags(page),
+        'headings': analyze_headings(page),
+        'images': analyze_images(page, BASE_URL),
+        'content': analyze_content(page),
+        'links': analyze_links(page, BASE_URL),
+        'schema': (schema['json_ld_count'], schema['microdata_count'], schema['rdfa_count']),
+    }
+
+
+# Pages whose visible text is easy to get wrong; both approaches must agree
+EDGE_CASES = [
+    "<html><head><title>Deals</title></head><body><p>Intro <!-- ad --> Buy now and save</p></body></html>",
+    "<html><body><!-- top -->Lead <?php echo 1 ?> text<div>inner<!-- x --></div>after <b>bold</b><!--end--></body></html>",
+    "<html><body><h1>Head <!-- c --> line</h1><script>var a = 1;</script>kept"
+    "<template><p>hidden</p></template>tail <a href='/x'>link <!-- y --> text</a></body></html>",
+]
+
+
+def cpu_per_page(analyze, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        for html in pages:
+            analyze(html)
+        best = min(best, time.process_time() - started)
+    return best / len(pages) * 1000
+
+
+def normalized(result):
+    # Tuples and lists compare alike once serialized
+    return json.loads(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="directory of saved HTML pages")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n, html in enumerate(EDGE_CASES):
+        before, after = normalized(analyze_with_soup(html)), normalized(analyze_with_page_model(html))
+        assert before == after, f"edge case {n} differs: {before} != {after}"
+
+    paths = sorted(p for p in args.corpus.rglob("*") if p.suffix.lower() in (".html", ".htm"))[:args.limit]
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    if not pages:
+        parser.error(f"no .html pages under {args.corpus}")
+    size_kb = sum(len(html) for html in pages) / len(pages) / 1024
+
+    soup_ms = cpu_per_page(analyze_with_soup, pages, args.repeat)
+    model_ms = cpu_per_page(analyze_with_page_model, pages, args.repeat)
+
+    mismatched = {}
+    for path, html in zip(paths, pages):
+        before, after = normalized(analyze_with_soup(html)), normalized(analyze_with_page_model(html))
+        for key in before:
+            if before[key] != after[key]:
+                mismatched.setdefault(key, []).append(path.name)
+
+    print(f"{len(pages)} pages, {size_kb:.0f} KB average")
+    print(f"  BeautifulSoup + find_all : {soup_ms:8.2f} ms CPU/page")
+    print(f"  lxml page model          : {model_ms:8.2f} ms CPU/page ({soup_ms / model_ms:.1f}x)")
+    identical = len(pages) - len({name for names in mismatched.values() for name in names})
+    print(f"  identical output         : {identical}/{len(pages)} pages")
+    for key, names in sorted(mismatched.items()):
+        print(f"    {key:10} differs on {len(names)} page(s), e.g. {names[0]}")
+
+
+if __name__ == "__main__":
+    main()
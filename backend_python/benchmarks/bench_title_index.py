@@ -0,0 +1,116 @@
+"""
+Benchmark near-duplicate title lookups: the full fuzz.ratio scan
+``/get-titles`` used to run against every article, versus the per-project
+MinHash LSH title index.
+
+Builds a synthetic project of N titles, looks up a mix of edited copies of
+existing titles and unrelated titles, and reports index build time,
+per-lookup latency and recall against the full scan.
+
+    cd backend_python
+    PYTHONPATH=. python benchmarks/bench_title_index.py --sizes 10000 100000 --queries 40
+"""
+import argparse
+import random
+import time
+import warnings
+
+# fuzzywuzzy warns on import when python-Levenshtein is missing
+warnings.filterwarnings("ignore", message="Using slow pure-python SequenceMatcher")
+
+from fuzzywuzzy import fuzz  # noqa: E402
+
+from app.services.title_index import SIMILARITY_THRESHOLD, TitleIndex  # noqa: E402
+
+STOP_WORDS = ["how", "to", "the", "for", "a", "of", "in", "and", "your", "with", "best", "guide", "what", "is", "why"]
+
+
+def make_vocabulary(rng: random.Random, size: int = 5000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_title(rng: random.Random, words):
+    parts = []
+    for _ in range(rng.randint(5, 10)):
+        roll = rng.random()
+        if roll < 0.35:
+            parts.append(rng.choice(STOP_WORDS))
+        elif roll < 0.55:
+            # A few topical words recur across the project
+            parts.append(words[min(int(rng.paretovariate(1.1)), len(words) - 1)])
+        else:
+            parts.append(rng.choice(words))
+    return " ".join(parts).capitalize()
+
+
+def edit_title(rng: random.Random, title: str, words) -> str:
+    parts = title.split()
+    roll = rng.random()
+    if roll < 0.3:
+        parts[rng.randrange(len(parts))] = rng.choice(words)
+    elif roll < 0.5:
+        parts.insert(rng.randrange(len(parts)), rng.choice(STOP_WORDS))
+    elif roll < 0.7:
+        cut = rng.randrange(len(title))
+        return title[:cut] + title[cut + 1:]
+    elif roll < 0.85:
+        rng.shuffle(parts)
+    else:
+        return f"{title} in 2025"
+    return " ".join(parts)
+
+
+def full_scan(titles, query: str):
+    query = query.lower()
+    return {title.lower() for title in titles if fuzz.ratio(title.lower(), query) >= SIMILARITY_THRESHOLD}
+
+
+def run(size: int, query_count: int, seed: int):
+    rng = random.Random(seed)
+    words = make_vocabulary(rng)
+    titles = [make_title(rng, words) for _ in range(size)]
+    queries = [
+        edit_title(rng, rng.choice(titles), words) if n % 4 else make_title(rng, words)
+        for n in range(query_count)
+    ]
+
+    started = time.perf_counter()
+    index = TitleIndex.build((str(n), title) for n, title in enumerate(titles))
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [{match for match, _ in index.find_similar(query)} for query in queries]
+    index_ms = (time.perf_counter() - started) / query_count * 1000
+
+    started = time.perf_counter()
+    scanned = [full_scan(titles, query) for query in queries]
+    scan_ms = (time.perf_counter() - started) / query_count * 1000
+
+    expected = sum(len(s) for s in scanned)
+    found = sum(len(s & i) for s, i in zip(scanned, indexed))
+    false_positives = sum(len(i - s) for s, i in zip(scanned, indexed))
+    queries_with_match = sum(1 for s in scanned if s)
+    flagged = sum(1 for s, i in zip(scanned, indexed) if s and i)
+
+    print(f"{size} titles, {query_count} lookups")
+    print(f"  index build      : {build_s:8.2f} s")
+    print(f"  full scan        : {scan_ms:8.2f} ms/lookup")
+    print(f"  title index      : {index_ms:8.2f} ms/lookup ({scan_ms / index_ms:.0f}x)")
+    print(f"  matches found    : {found}/{expected} ({found / expected:.1%})" if expected else "  matches found    : none expected")
+    print(f"  duplicates caught: {flagged}/{queries_with_match} lookups with a match")
+    print(f"  false positives  : {false_positives}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
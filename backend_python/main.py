@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Request, Query, Body, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from app.models.schemas import (
     RequestData,
     RequestData2,
@@ -16,12 +17,12 @@ from app.models.schemas import (
     PdfData,
     outline,
     FindTitle,
+    CacheInvalidation,
 )
 from app.services.google_search import extract_content
 from app.services.scraper import (
     target_audience_generator,
     generate_target_audience,
-    get_sitemap_urls,
     target_audience_generator1,
     generates_previews,
     article_google_search_links2,
@@ -34,13 +35,11 @@ from dotenv import load_dotenv
 import logging
 import asyncio
 from openai import OpenAI
-from aiohttp import ClientSession
-from app.services.url_analist import analyze_batch_urls
+from app.services.url_analist import analyze_url_stream
 from app.services.sitemap_parser import SitemapParser
 from typing import List
 import google.generativeai as genai
-import requests
-from app.api.endpoints.company_business_summary import extract_content1
+from app.api.endpoints.company_business_summary import get_company_research_stats, research_company
 from app.core.database import get_database
 import json
 import base64
@@ -48,7 +47,6 @@ from fastapi import APIRouter
 import httpx
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
-from fuzzywuzzy import fuzz
 from fastapi import FastAPI, UploadFile, File
 import fitz
 from docx import Document
@@ -65,11 +63,32 @@ import asyncio
 import re
 from typing import List, Optional
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
-from playwright.async_api import async_playwright
-import aiohttp
 import anthropic
 from urllib.parse import urlparse
 from app.seo_audit.router import seo_audit_router
+from app.seo_audit.jobs import audit_jobs
+from app.seo_audit.scheduler import audit_scheduler
+from app.core.browser_pool import browser_pool
+from app.core.config import Config
+from app.core.content_cache import content_cache
+from app.core.http_client import close_async_clients, fetch
+from app.core.llm_cache import llm_cache
+from app.core.process_pool import analysis_pool
+from app.core.llm_gateway import llm_gateway
+from app.core.webhook_dispatcher import webhook_dispatcher
+from app.services.reference_scraper import get_scraper_stats, scrape_reference
+from app.services.search_client import search_client
+from app.services.sitemap_stream import SitemapParseError, stream_sitemap
+from app.services.title_generator import TitleGenerationError, generate_titles
+from app.services.project_documents import (
+    get_article_context,
+    get_document_cache_stats,
+    get_project,
+    get_title_prompts,
+    invalidate as invalidate_documents,
+)
+from app.services.title_index import project_title_indexes
+from app.seo_audit.helpers import get_pagespeed_cache_stats
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -107,7 +126,27 @@ genai.configure(api_key=GEMINI_API_KEY)
 model_name = "gemini-1.5-pro-latest"
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        logger.warning(f"Browser pool not warmed, browsers will launch on demand: {e}")
+    webhook_dispatcher.start()
+    audit_jobs.start()
+    if Config.AUDIT_SCHEDULER_ENABLED:
+        audit_scheduler.start()
+    yield
+    await audit_scheduler.close()
+    await audit_jobs.close()
+    await webhook_dispatcher.close()
+    await browser_pool.close()
+    await close_async_clients()
+    await llm_gateway.close()
+    await analysis_pool.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/seo-content-pyapi", app)
 
 origins = os.getenv("PY_PORT")
@@ -147,14 +186,48 @@ async def health_check():
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Expose in-process cache and pool counters."""
+    return {
+        "pagespeed_cache": get_pagespeed_cache_stats(),
+        "browser_pool": browser_pool.stats(),
+        "reference_scraper": get_scraper_stats(),
+        "content_cache": content_cache.stats(),
+        "google_search": search_client.stats(),
+        "webhooks": webhook_dispatcher.stats(),
+        "title_indexes": project_title_indexes.stats(),
+        "document_cache": get_document_cache_stats(),
+        "llm": llm_gateway.stats(),
+        "company_research": get_company_research_stats(),
+        "llm_cache": llm_cache.stats(),
+        "analysis_pool": analysis_pool.stats(),
+        "audit_jobs": audit_jobs.stats(),
+        "audit_scheduler": audit_scheduler.stats(),
+    }
+
+
+@app.post("/cache/invalidate")
+async def invalidate_cache(request: CacheInvalidation):
+    """Drop cached projects or prompts after they were changed."""
+    try:
+        invalidate_documents(request.kind, request.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"invalidated": request.kind, "id": request.id}
+
+
 @app.post("/company-business-summary")
-def scrape_company_details(request_data: RequestData2):
+async def scrape_company_details(
+    request_data: RequestData2,
+    force_refresh: bool = Query(False, description="Research and summarize again instead of using cached results"),
+):
     try:
         company_name = request_data.company_name
-        result = extract_content1(company_name, num=6)
+        result = await research_company(company_name, num=6, refresh=force_refresh)
 
         # Get the JSON response from the refactored function
-        company_overview_json = company_overview1(result)
+        company_overview_json = await company_overview1(result, force_refresh=force_refresh)
 
         # Extract individual fields from the JSON response
         company_details = company_overview_json.get("company_details", "")
@@ -186,9 +259,22 @@ def scrape_company_details(request_data: RequestData2):
 
 
 @app.post("/target-audience")
-def get_target_audience(request_data: CompanyDetails):
+async def get_target_audience(
+    request_data: CompanyDetails,
+    budget: Optional[float] = Query(None, gt=0, description="Latency budget in seconds when a title is given"),
+    force_refresh: bool = Query(False, description="Generate again instead of using the cached answer"),
+):
+    """
+    Primary target audience of a company. With an article title, the
+    audience for that article is asked from OpenAI and Gemini concurrently
+    and whatever is ready within ``budget`` seconds is returned.
+    """
     company_details = request_data.company_details
-    target_audience = generate_target_audience(company_details)
+    if request_data.title:
+        return await target_audience_generator(
+            request_data.title, company_details, budget=budget, force_refresh=force_refresh
+        )
+    target_audience = await generate_target_audience(company_details, force_refresh=force_refresh)
     return target_audience
 
 
@@ -300,14 +386,42 @@ async def generates_contents(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def count_urls_in_sitemaps(sitemap_urls):
-    """Count URLs in sitemaps."""
+async def count_urls_in_sitemaps(sitemap_url):
+    """
+    Count page URLs reachable from a sitemap. The sitemap and every child
+    sitemap are streamed, so only the counts are held in memory.
+    """
     total_count = 0
+    child_locs = []
+    # The parent stream is read to the end before any child is fetched, so
+    # it does not hold a per-host slot while the children wait for one
+    try:
+        async for kind, loc in stream_sitemap(sitemap_url):
+            if kind == "url":
+                total_count += 1
+            else:
+                child_locs.append(loc)
+    except (httpx.HTTPError, SitemapParseError) as e:
+        logger.warning(f"Error counting URLs in sitemap {sitemap_url}: {e}")
+        return 0, []
+
+    limit = asyncio.Semaphore(Config.SITEMAP_MAX_CONCURRENCY_PER_HOST)
+
+    async def count_child(loc):
+        count = 0
+        async with limit:
+            try:
+                async for child_kind, _ in stream_sitemap(loc):
+                    if child_kind == "url":
+                        count += 1
+            except (httpx.HTTPError, SitemapParseError) as e:
+                logger.warning(f"Error counting URLs in sitemap {loc}: {e}")
+        return count
+
+    counts = await asyncio.gather(*(count_child(loc) for loc in child_locs))
     details = []
-    for sitemap_url in sitemap_urls:
-        urls = get_sitemap_urls(sitemap_url)
-        count = len(urls)
-        match = re.search(r"/([^/]+?)-sitemap", sitemap_url)
+    for loc, count in zip(child_locs, counts):
+        match = re.search(r"/([^/]+?)-sitemap", loc)
         if match:
             sitemap_type = match.group(1)
             details.append({"type": sitemap_type, "count": count})
@@ -321,19 +435,18 @@ async def determine_sitemap(user_site):
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.90 Safari/537.36"
     }
-    async with ClientSession(headers=headers) as session:
-        try:
-            async with session.get(sitemap_index, timeout=20) as response:
-                if response.status == 200:
-                    return sitemap_index
-        except:
-            pass
-        try:
-            async with session.get(sitemap, timeout=20) as response:
-                if response.status == 200:
-                    return sitemap
-        except:
-            pass
+    try:
+        response = await fetch('GET', sitemap_index, headers=headers, timeout=20, follow_redirects=True)
+        if response.status_code == 200:
+            return sitemap_index
+    except:
+        pass
+    try:
+        response = await fetch('GET', sitemap, headers=headers, timeout=20, follow_redirects=True)
+        if response.status_code == 200:
+            return sitemap
+    except:
+        pass
     return None
 
 
@@ -343,7 +456,8 @@ async def fetch_sitemaps(request_data: Sitemap):
         company_name = request_data.company_name
         logger.info(f"Fetching sitemaps for company: {company_name}")
 
-        result = extract_content(company_name, num=6)
+        # Blocking search, scraping and cache I/O: keep it off the event loop
+        result = await asyncio.to_thread(extract_content, company_name, num=6)
         user_site = request_data.company_name
         sitemap_url = await determine_sitemap(user_site)
 
@@ -351,8 +465,7 @@ async def fetch_sitemaps(request_data: Sitemap):
             logger.error("No sitemap found for the given URL")
             raise HTTPException(status_code=404, detail="No sitemap found")
 
-        sitemap_urls = get_sitemap_urls(sitemap_url)
-        total_pages, details = await count_urls_in_sitemaps(sitemap_urls)
+        total_pages, details = await count_urls_in_sitemaps(sitemap_url)
 
         logger.info(f"Sitemap fetched successfully: {sitemap_url}")
         return {
@@ -366,51 +479,69 @@ async def fetch_sitemaps(request_data: Sitemap):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-async def process_urls_in_batches(urls, batch_size=50):
-    """
-    Processes URLs in smaller batches to prevent memory exhaustion.
-    """
-    results = []
-    for i in range(0, len(urls), batch_size):
-        batch = urls[i : i + batch_size]
-        async with semaphore:
-            logger.info(
-                f"Processing batch {i//batch_size + 1}/{(len(urls)//batch_size) + 1}"
-            )
-            batch_results = await analyze_batch_urls(batch)
-            results.extend(batch_results)
-
-        await asyncio.sleep(0.1)
-
-    return results
-
-
 @app.post("/sitemap", response_model=List[MetaAnalysisResult])
-async def fetch_and_analyze_sitemap(url_input: URLInput):
+async def fetch_and_analyze_sitemap(
+    url_input: URLInput,
+    stream: bool = Query(False, description="Stream results as NDJSON as they complete"),
+):
     """
-    Fetch all URLs from a sitemap and analyze them in batches.
-    This replaces `discover-urls` and `analyze-batch` by combining their logic.
+    Fetch all URLs from a sitemap and analyze them on a fixed worker pool.
+    Analysis starts while the sitemap is still being discovered. With
+    ``stream=true`` each result is sent as one NDJSON line as soon as it is
+    ready; otherwise the full list is returned as before.
     """
-    try:
-        logger.info(f"Fetching URLs from sitemap: {url_input.url}")
-        async with semaphore:
-            parser = SitemapParser(str(url_input.url))
+    logger.info(f"Fetching URLs from sitemap: {url_input.url}")
+    parser = SitemapParser(str(url_input.url))
 
-            try:
-                urls = await asyncio.wait_for(parser.get_all_urls(), timeout=300)
-                content_types = parser.content_types
-            except asyncio.TimeoutError:
-                logger.warning("URL discovery timed out, returning partial results")
-                urls = list(parser.discovered_urls)
-                content_types = parser.content_types
+    async def discovered_urls():
+        found: asyncio.Queue = asyncio.Queue()
+        end = object()
 
-        logger.info(f"Discovered {len(urls)} URLs from sitemap.")
+        async def discover():
+            # The global semaphore bounds concurrent sitemap discoveries only.
+            # Found URLs are buffered (the parser keeps them all anyway), so a
+            # slow analysis or NDJSON reader does not keep the slot.
+            try:
+                async with semaphore:
+                    async for url in parser.iter_urls(timeout=Config.SITEMAP_DISCOVERY_TIMEOUT):
+                        found.put_nowait(url)
+            finally:
+                found.put_nowait(end)
 
-        results = await process_urls_in_batches(urls, batch_size=100)
+        discovery = asyncio.ensure_future(discover())
+        try:
+            while True:
+                url = await found.get()
+                if url is end:
+                    break
+                yield url
+            # Surfaces a failed discovery to the analysis pipeline
+            await discovery
+        finally:
+            discovery.cancel()
+        logger.info(f"Discovered {len(parser.discovered_urls)} URLs from sitemap. Sitemap stats: {parser.stats}")
+
+    async def analyzed_results():
+        async for result in analyze_url_stream(discovered_urls()):
+            result.content_type = parser.content_types.get(result.url, "Unknown")
+            yield result
+
+    if stream:
+        async def ndjson_lines():
+            count = 0
+            try:
+                async for result in analyzed_results():
+                    count += 1
+                    yield result.model_dump_json() + "\n"
+                logger.info(f"Streamed analysis completed for {count} URLs.")
+            except Exception as e:
+                logger.error(f"Error processing sitemap: {str(e)}", exc_info=True)
+                yield json.dumps({"status": "error", "error": str(e)}) + "\n"
 
-        for result in results:
-            result.content_type = content_types.get(result.url, "Unknown")
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
+    try:
+        results = [result async for result in analyzed_results()]
         logger.info(f"Batch analysis completed for {len(results)} URLs.")
         return results
 
@@ -434,7 +565,7 @@ async def get_all_titles(request: TitlesRequest):
         database = get_database()
         
         # Fetch project details (no user filtering needed)
-        project = await database.solution_seo_projects.find_one({"_id": project_object_id})
+        project = await get_project(database, project_object_id)
 
         if not project:
             logger.error(f"Project not found for ID: {request.ProjectId}")
@@ -456,19 +587,16 @@ async def get_all_titles(request: TitlesRequest):
                     f"Failed to decode detailedsitemap JSON: {e} - Raw Data: {project['detailedsitemap']}"
                 )
 
-        # Fetch articles associated with the project (no user filtering needed)
-        articles_cursor = database.solution_seo_articles.find({"project": project_object_id})
-
-        articles = await articles_cursor.to_list(length=None)
+        # Titles of the articles associated with the project (no user filtering needed)
+        title_index = await project_title_indexes.get(database, project_object_id)
 
-        if not articles:
+        if not len(title_index):
             logger.warning(f"No articles found for project ID: {request.ProjectId}")
 
         # Extract keywords and promptTypeIds from request
         keywords_with_prompts = [(item.keyword, item.promptTypeId) for item in request.Keywords]
         keywords = [item.keyword for item in request.Keywords]
         logger.info(f"Extracted {len(keywords)} keywords from request: {keywords}")
-        final_titles = []
 
         # Define titles information
         titles_info = {
@@ -532,171 +660,53 @@ Generate 5-10 unique, engaging blog titles that:
 
 Format: Return only the titles, one per line, without numbering."""
         
-        keyword_prompt_pairs = []
-        
-        # Fetch system prompts for each keyword based on promptTypeId
+        # Resolve the promptTypeId of each keyword; keywords with an invalid
+        # promptTypeId are skipped
+        keyword_prompt_ids = []
         for keyword, prompt_type_id in keywords_with_prompts:
-            system_prompt_description = default_system_prompt
-            
+            prompt_object_id = None
             if prompt_type_id:
+                if not isinstance(prompt_type_id, str):
+                    continue
                 try:
-                    # Convert promptTypeId to ObjectId if it's a string
-
-                    if isinstance(prompt_type_id, str) and prompt_type_id:
-                        try:
-                            prompt_object_id = ObjectId(prompt_type_id)
-                        except Exception as e:
-
-                            continue # Skip to next keyword if ObjectId is invalid
-                    else:
-
-                        continue # Skip to next keyword if promptTypeId is invalid
-                    
-
-                    
-                    # Fetch system prompt from database (no user filtering needed for single-user mode)
-                    system_prompt = await database.solution_seo_prompt_types.find_one({"_id": prompt_object_id})
-                    
-
-                    if system_prompt and system_prompt.get("titlePrompt"):
-                        title_prompt_id = system_prompt["titlePrompt"]
-                        # Fetch the actual title prompt document
-                        title_prompt_doc = await database.solution_seo_system_prompts.find_one({"_id": title_prompt_id})
-
-
-                        if title_prompt_doc and title_prompt_doc.get("description"):
-                            system_prompt_description = title_prompt_doc["description"]
-
-                        else:
-                            pass
-
-                    else:
-                        pass
-
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching system prompt for promptTypeId {prompt_type_id}: {e}")
-                    # Continue with default prompt
-            
-            keyword_prompt_pairs.append({
-                "keyword": keyword,
-                "prompt_description": system_prompt_description
-            })
-
-        # Loop through keyword-prompt pairs and generate SEO titles
-        for pair in keyword_prompt_pairs:
-            keyword = pair["keyword"]
-            system_prompt_description = pair["prompt_description"]
-
-            prompt = generate_prompt(keyword, system_prompt_description, titles_info)
-
-            # Request OpenAI API for SEO-optimized blog titles
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": "Generate SEO-optimized blog titles."},
-            ]
-
+                    prompt_object_id = ObjectId(prompt_type_id)
+                except Exception:
+                    continue
+            keyword_prompt_ids.append((keyword, prompt_object_id))
+
+        # Fetch every title prompt the keywords need at once (no user filtering
+        # needed for single-user mode)
+        title_prompts = {}
+        prompt_object_ids = [pid for _, pid in keyword_prompt_ids if pid is not None]
+        if prompt_object_ids:
             try:
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    json={"model": "gpt-4o-mini", "messages": messages, "temperature": 0.8},
-                    headers={
-                        "Authorization": f"Bearer {OPENAI_API_KEY}",
-                        "Content-Type": "application/json",
-                    },
-                )
-                
-                # Check if the response was successful
-                if response.status_code != 200:
-                    logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"OpenAI API error: {response.status_code}",
-                    )
-
-                response_data = response.json()
-                generated_titles = (
-                    response_data.get("choices", [{}])[0]
-                    .get("message", {})
-                    .get("content", "")
-                    .strip()
-                    .split("\n")
-                )
+                title_prompts = await get_title_prompts(database, prompt_object_ids)
+            except Exception as e:
+                logger.error(f"Error fetching system prompts for promptTypeIds {prompt_object_ids}: {e}")
+                # Continue with default prompt
 
-                # Clean the generated titles
-                cleaned_titles = [
-                    re.sub(r"^[-\d\.]+\s*", "", title).strip()
-                    for title in generated_titles
-                    if title.strip()
-                ]
-
-                # Check for title similarity
-                matched_titles = []
-                for article in articles:
-                    original_title = article.get("name", "").strip() if article.get("name") else ""
-
-                    for gen_title in cleaned_titles:
-                        similarity_original = fuzz.ratio(
-                            original_title.lower(), gen_title.lower()
-                        )
-
-                        if similarity_original >= 80:
-                            logger.info(
-                                f"Generated title '{gen_title}' is too similar to existing titles."
-                            )
-                            unique_title_prompt = f"Generate a completely unique blog title that is different from '{gen_title}'."
-
-                            try:
-                                unique_response = requests.post(
-                                "https://api.openai.com/v1/chat/completions",
-                                json={
-                                    "model": "gpt-4o-mini",
-                                    "messages": [
-                                        {
-                                            "role": "user",
-                                            "content": unique_title_prompt,
-                                        }
-                                    ],
-                                    "temperature": 0.8,
-                                },
-                                headers={
-                                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                                    "Content-Type": "application/json",
-                                },
-                            )
-                                
-                                if unique_response.status_code == 200:
-                                    unique_data = unique_response.json()
-                                    new_title = (
-                                        unique_data.get("choices", [{}])[0]
-                                        .get("message", {})
-                                        .get("content", "")
-                                        .strip()
-                                    )
-                                    matched_titles.append(new_title)
-                                else:
-                                    logger.error(f"Failed to generate unique title: {unique_response.status_code}")
-
-                            except requests.exceptions.RequestException as e:
-                                logger.error(f"Error generating unique title: {e}")
-
-                # Add the best available title to final list
-                if matched_titles:
-                    # Use the unique title generated to replace similar ones
-                    final_titles.append(matched_titles[0])
-                elif cleaned_titles:
-                    # Use the first cleaned title if no similarity issues
-                    final_titles.append(cleaned_titles[0])
-                else:
-                    # Fallback if no titles were generated
-                    final_titles.append(f"SEO Title for {keyword}")
+        keyword_prompt_pairs = [
+            {
+                "keyword": keyword,
+                "prompt_description": (
+                    title_prompts.get(str(prompt_object_id)) if prompt_object_id else None
+                ) or default_system_prompt,
+            }
+            for keyword, prompt_object_id in keyword_prompt_ids
+        ]
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"OpenAI API request error: {e}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to generate titles due to API error.",
-                )
+        # Generate titles for all keywords concurrently
+        items = [
+            {
+                "keyword": pair["keyword"],
+                "prompt": generate_prompt(pair["keyword"], pair["prompt_description"], titles_info),
+            }
+            for pair in keyword_prompt_pairs
+        ]
+        try:
+            final_titles = await generate_titles(items, title_index)
+        except TitleGenerationError as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
         return final_titles
 
@@ -803,49 +813,15 @@ async def scrape_retries(
     Fetches search result URLs from the Google Custom Search API.
     Returns a list of result URLs.
     """
-    search_url = "https://www.googleapis.com/customsearch/v1"
-    params = {"key": api_key, "cx": cx, "q": query, "num": num_results}
-
-    # Create SSL context that doesn't verify certificates (for development)
-    import ssl
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        async with session.get(search_url, params=params) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                raise Exception(f"Google API error: {response.status} - {error_text}")
-
-            data = await response.json()
-            if "items" not in data:
-                return []
-
-            return [item.get("link") for item in data["items"]]
+    items = await search_client.asearch(query, api_key, cx, num=num_results)
+    return [item.get("link") for item in items]
 
 
 async def fetch_search_results(
     query: str, api_key: str, cx: str, num_results: int = 5
 ) -> List[str]:
-    search_url = "https://www.googleapis.com/customsearch/v1"
-    params = {"key": api_key, "cx": cx, "q": query, "num": num_results}
-
-    # Create SSL context that doesn't verify certificates (for development)
-    import ssl
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    
-    connector = aiohttp.TCPConnector(ssl=ssl_context)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        async with session.get(search_url, params=params) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                raise Exception(f"Google API error: {response.status} - {error_text}")
-            data = await response.json()
-            return [item.get("link") for item in data.get("items", [])]
+    items = await search_client.asearch(query, api_key, cx, num=num_results)
+    return [item.get("link") for item in items]
 
 
 async def extract_content_google(query: str, api_key: str, cx: str, num: int = 5):
@@ -864,80 +840,8 @@ async def extract_content_google(query: str, api_key: str, cx: str, num: int = 5
 
     links = valid_links
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.100 Safari/537.36"
-    }
-    semaphore = asyncio.Semaphore(5)
-
-    async def scrape_with_retries(url: str, max_attempts: int = 3) -> Optional[str]:
-        for attempt in range(max_attempts):
-            try:
-                async with semaphore:
-                    async with async_playwright() as p:
-                        browser = await p.chromium.launch(
-                            headless=True,
-                            args=[
-                                "--disable-gpu",
-                                "--no-sandbox",
-                                "--disable-dev-shm-usage",
-                            ],
-                        )
-                        context = await browser.new_context(
-                            user_agent=headers["User-Agent"],
-                            viewport={"width": 1920, "height": 1080},
-                        )
-
-                        # Enable request interception to block unnecessary resources
-                        await context.route(
-                            "**/*.{png,jpg,jpeg,gif,svg,css,font,woff,woff2,eot,ttf,otf}",
-                            lambda route: route.abort(),
-                        )
-
-                        page = await context.new_page()
-
-                        # Set longer timeout for initial page load
-                        await page.goto(
-                            url, timeout=60000, wait_until="domcontentloaded"
-                        )
-
-                        # Wait for main content to be available
-                        await page.wait_for_selector("body", timeout=10000)
-
-                        # Extract main content
-                        content = await page.evaluate(
-                            """() => {
-                            // Remove unwanted elements
-                            const elementsToRemove = document.querySelectorAll(
-                                'header, footer, nav, script, style, iframe, .ad, .advertisement, ' +
-                                '.banner, .popup, .modal, .cookie-banner, .newsletter, .social-share'
-                            );
-                            elementsToRemove.forEach(el => el.remove());
-                            
-                            // Get main content
-                            const mainContent = document.querySelector('main, article, .content, .post, .article') || document.body;
-                            return mainContent.innerText;
-                        }"""
-                        )
-
-                        await browser.close()
-
-                        if content and len(content.strip()) > 0:
-                            # Clean up the content
-                            cleaned_content = " ".join(content.split())
-                            footer = f"\n\nSource: {url}\n"
-                            return f"{cleaned_content}{footer}"
-                        else:
-                            raise Exception("No content extracted")
-
-            except Exception as e:
-                print(
-                    f"[Attempt {attempt+1}] Failed scraping {url}: {type(e).__name__}: {str(e)[:100]}..."
-                )
-                await asyncio.sleep(2**attempt)
-        return None
-
-    # Scrape pages concurrently
-    tasks = [scrape_with_retries(url) for url in links]
+    # Scrape pages concurrently: plain HTTP first, browser only when needed
+    tasks = [scrape_reference(url) for url in links]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Filter successful scrapes and get their URLs
@@ -1010,8 +914,8 @@ async def get_all_projects(request: ArticleRequest):
                 status_code=400, detail="Invalid ObjectId format for articleId"
             )
 
-        # Fetch article data from MongoDB
-        article = await database.solution_seo_articles.find_one({"_id": article_object_id})
+        # Fetch the article with its project and guideline in one round trip
+        article, project, guideline = await get_article_context(database, article_object_id)
 
         if not article:
             logger.error(f"Article not found for ID: {request.articleId}")
@@ -1023,24 +927,6 @@ async def get_all_projects(request: ArticleRequest):
                 "system_prompts": None,
             }
 
-        project = None
-        if article.get("project"):
-            try:
-                project_object_id = ObjectId(str(article["project"]))
-                project = await database.solution_seo_projects.find_one({"_id": project_object_id})
-            except Exception:
-                logger.error(f"Invalid ObjectId format for project: {article['project']}")
-
-        guideline = None
-        if project and project.get("guideline_id"):
-            try:
-                guideline_object_id = ObjectId(str(project["guideline_id"]))
-                guideline = await database.solution_seo_guidelines.find_one({"_id": guideline_object_id})
-            except Exception:
-                logger.error(
-                    f"Invalid ObjectId format for guideline_id: {project['guideline_id']}"
-                )
-
         # Article types are no longer supported
         logger.info("Processing article without prompt type")
 
@@ -1159,57 +1045,27 @@ async def get_all_projects(request: ArticleRequest):
             return final_prompt
 
         prompt = generate_prompt(article_info, reference_links)
-        summaries = {}
 
         if request.model in [None, ""]:
-            summaries["open_ai"] = get_openai_summary(prompt, reference_links)
-            summaries["gemini"] = get_gemini_summary(prompt, reference_links)
-            summaries["claude"] = get_claude_summary(prompt, reference_links)
-
-        elif request.model == "open_ai":
-            summaries["open_ai"] = get_openai_summary(prompt, reference_links)
-
-        elif request.model == "gemini":
-            summaries["gemini"] = get_gemini_summary(prompt, reference_links)
-
-        elif request.model == "claude":
-            summaries["claude"] = get_claude_summary(prompt, reference_links)
-
+            model_names = list(ARTICLE_PROVIDERS)
+        elif request.model in ARTICLE_PROVIDERS:
+            model_names = [request.model]
         else:
             raise HTTPException(status_code=400, detail="Invalid model specified")
-        # Calculate word counts and return summaries directly
-        webhook_responses = {}
-        word_counts = []
-
-        for model_name, summary in summaries.items():
-            word_count = len(summary.split())
-            webhook_url = f"{BASE_URL}/webhooks/{request.articleId}/content"
-            payload = {
-                "model": model_name,
-                "content": summary,
-                "avg_word_count": word_count,
-            }
-            logger.info(f"Average word count: {avg_word_count}")
-
-            try:
-                with httpx.Client(timeout=10) as client:
-                    response = client.post(
-                        webhook_url,
-                        json=payload,
-                        headers={"Authorization": f"Bearer {WEBHOOK_AUTH_TOKEN}"},
-                    )
 
-                if response.status_code not in [200, 202]:
-                    logger.error(
-                        f"Webhook failed for {model_name}: {response.status_code} - {response.text}"
-                    )
-                    webhook_responses[model_name] = summary
-                else:
-                    webhook_responses[model_name] = summary
+        webhook_url = f"{BASE_URL}/webhooks/{request.articleId}/content"
+        logger.info(f"Average word count: {avg_word_count}")
 
-            except Exception as e:
-                logger.error(f"Error sending {model_name} webhook: {e}")
-                webhook_responses[model_name] = summary
+        # Providers run concurrently and each webhook is queued as soon as its
+        # provider finishes. Leaving the request cancels whatever is pending.
+        results = await asyncio.gather(
+            *(
+                generate_and_post_article(model_name, prompt, reference_links, webhook_url)
+                for model_name in model_names
+            )
+        )
+        webhook_responses = dict(zip(model_names, results))
+        word_count = len(results[-1].split())
 
         return {"webhook_responses": webhook_responses, "avg_word_count": word_count}
 
@@ -1230,31 +1086,7 @@ def truncate_text(text, max_words=500):
     return " ".join(words)
 
 
-def get_claude_summary(prompt: str, formatted_references: list = None) -> str:
-    try:
-        response = claude_client.messages.create(
-            model="claude-3-5-sonnet-20241022",  # or other available modelAdd commentMore actions
-            max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}],
-            system="You are a helpful assistant.",
-        )
-        output = (
-            response.content[0].text
-            if hasattr(response, "content")
-            else response.get("completion", "")
-        )
-        # Append reference links, if provided
-        if formatted_references:
-            output += "\n\nReferences\n"
-            output += "\n".join(
-                [f"{i+1}. [{url}]({url})" for i, url in enumerate(formatted_references)]
-            )
-        return output
-    except Exception as e:
-        return f"Claude Error: {str(e)}"
-
-
-def get_gemini_summary(prompt: str, formatted_references: List[str]):
+async def get_gemini_summary(prompt: str, formatted_references: List[str]):
     """
     Call Gemini AI to summarize the article and embed reference URLs at the end.
     Removes any AI-generated opening lines like 'Okay, here's a blog article...'
@@ -1268,12 +1100,12 @@ def get_gemini_summary(prompt: str, formatted_references: List[str]):
         )
         logger.debug(f"Formatted References for Gemini: {formatted_references}")
 
-        # Initialize Gemini model
-        model = genai.GenerativeModel("gemini-1.5-pro")
-        response = model.generate_content(formatted_prompt)
+        response = await llm_gateway.gemini_generate(
+            [{"role": "user", "content": formatted_prompt}], model="gemini-1.5-pro"
+        )
 
         # Extract generated text
-        output = response.text if response else "Error: No response from Gemini AI."
+        output = response if response else "Error: No response from Gemini AI."
         word_count = len(output.split())
 
         print(f"Generated Word Count: {word_count}")
@@ -1320,19 +1152,18 @@ def get_gemini_summary(prompt: str, formatted_references: List[str]):
         return "Error generating content."
 
 
-def get_openai_summary(prompt: str, citations: list = None) -> str:
+async def get_openai_summary(prompt: str, citations: list = None) -> str:
     """
     Call OpenAI (GPT-4) to summarize the article and append reference URLs at the end.
     """
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
+        output = await llm_gateway.openai_chat(
+            [
                 {"role": "system", "content": "You are an AI assistant."},
                 {"role": "user", "content": prompt},
             ],
+            model="gpt-4.1",
         )
-        output = completion.choices[0].message.content
 
         # Append reference links, if provided
         if citations:
@@ -1346,18 +1177,15 @@ def get_openai_summary(prompt: str, citations: list = None) -> str:
         return f"OpenAI Error: {str(e)}"
 
 
-def get_claude_summary(prompt: str, formatted_references: list = None) -> str:
+async def get_claude_summary(prompt: str, formatted_references: list = None) -> str:
     try:
-        response = claude_client.messages.create(
+        output = await llm_gateway.claude_message(
+            [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt},
+            ],
             model="claude-3-5-sonnet-20241022",  # or other available model
             max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}],
-            system="You are a helpful assistant.",
-        )
-        output = (
-            response.content[0].text
-            if hasattr(response, "content")
-            else response.get("completion", "")
         )
         # Append reference links, if provided
         if formatted_references:
@@ -1370,6 +1198,41 @@ def get_claude_summary(prompt: str, formatted_references: list = None) -> str:
         return f"Claude Error: {str(e)}"
 
 
+# model name -> (generator, timeout in seconds, text returned on timeout)
+ARTICLE_PROVIDERS = {
+    "open_ai": (get_openai_summary, Config.LLM_TIMEOUT_OPENAI, "OpenAI Error: Request timed out."),
+    "gemini": (get_gemini_summary, Config.LLM_TIMEOUT_GEMINI, "Error generating content."),
+    "claude": (get_claude_summary, Config.LLM_TIMEOUT_CLAUDE, "Claude Error: Request timed out."),
+}
+
+
+async def generate_and_post_article(
+    model_name: str, prompt: str, reference_links: list, webhook_url: str
+) -> str:
+    """
+    Generate the article with one provider and queue it for the article
+    webhook straight away. Returns the generated text, or the provider's
+    error text when it failed or ran out of time.
+    """
+    generate, timeout, timeout_text = ARTICLE_PROVIDERS[model_name]
+    try:
+        summary = await asyncio.wait_for(generate(prompt, reference_links), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"{model_name} article generation timed out after {timeout}s")
+        summary = timeout_text
+
+    word_count = len(summary.split())
+    payload = {
+        "model": model_name,
+        "content": summary,
+        "avg_word_count": word_count,
+    }
+    webhook_dispatcher.enqueue(
+        webhook_url, payload, headers={"Authorization": f"Bearer {WEBHOOK_AUTH_TOKEN}"}
+    )
+    return summary
+
+
 def convert_doc_to_docx(doc_path: str) -> str:
     try:
         output_dir = os.path.dirname(doc_path)